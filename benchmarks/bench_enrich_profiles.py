@@ -0,0 +1,94 @@
+"""
+Benchmark: profile enrichment of a month of tweets, merge-based vs positional index.
+
+    python benchmarks/bench_enrich_profiles.py --tweets 250000 --profiles 700 --repeat 5
+
+Synthetic data is shaped like the loaded frames (categorical usernames, nullable Int32
+counters); both implementations must produce the same frame.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from xminer.utils.metrics_helpers import TWEET_COUNT_COLUMNS, ProfileIndex, _safe_div, enrich_with_profiles
+
+
+def enrich_by_merge(tweets_df: pd.DataFrame, prof_df: pd.DataFrame) -> pd.DataFrame:
+    """The previous implementation: left merge on username, then the derived columns one by one."""
+    use_cols = [c for c in ["username", "name", "followers_count", "following_count", "tweet_count", "listed_count", "verified", "protected"] if c in prof_df.columns]
+    out = tweets_df.merge(prof_df[use_cols].drop_duplicates("username"), on="username", how="left", suffixes=("", "_profile"))
+    out["engagement_total"] = out[["like_count", "reply_count", "retweet_count", "quote_count", "bookmark_count"]].sum(axis=1, min_count=1)
+    out["engagement_rate"] = _safe_div(out["engagement_total"], out["impression_count"])
+    out["like_to_reply"] = _safe_div(out["like_count"], out["reply_count"])
+    out["retweet_to_like"] = _safe_div(out["retweet_count"], out["like_count"])
+    followers_k = _safe_div(out["followers_count"], 1000.0)
+    out["likes_per_1k_followers"] = _safe_div(out["like_count"], followers_k)
+    out["engagement_per_1k_followers"] = _safe_div(out["engagement_total"], followers_k)
+    return out
+
+
+def synthetic_month(n_tweets: int, n_profiles: int, seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    names = np.array([f"user{i}" for i in range(n_profiles)], dtype=object)
+    profiles = pd.DataFrame({
+        "username": names,
+        "name": [f"Politician {i}" for i in range(n_profiles)],
+        "followers_count": pd.array(rng.integers(0, 2_000_000, n_profiles), dtype="Int32"),
+        "following_count": pd.array(rng.integers(0, 5_000, n_profiles), dtype="Int32"),
+        "tweet_count": pd.array(rng.integers(0, 50_000, n_profiles), dtype="Int32"),
+        "listed_count": pd.array(rng.integers(0, 3_000, n_profiles), dtype="Int32"),
+        "verified": rng.random(n_profiles) < 0.3,
+        "protected": rng.random(n_profiles) < 0.01,
+    })
+    # a few authors without a profile row, as in real months
+    authors = np.append(names, ["unprofiled1", "unprofiled2"])
+    tweets = pd.DataFrame({
+        "tweet_id": np.arange(n_tweets).astype(str),
+        "author_id": rng.integers(1, 10**12, n_tweets),
+        "username": pd.Series(rng.choice(authors, n_tweets)).astype(pd.CategoricalDtype(sorted(authors))),
+        "created_at": pd.Timestamp("2025-10-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 31 * 86400, n_tweets), unit="s"),
+    })
+    for c in TWEET_COUNT_COLUMNS:
+        values = pd.array(rng.negative_binomial(1, 0.01, n_tweets), dtype="Int32")
+        values[rng.random(n_tweets) < 0.02] = pd.NA
+        tweets[c] = values
+    return tweets, profiles
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tweets", type=int, default=250_000)
+    parser.add_argument("--profiles", type=int, default=700)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tweets, profiles = synthetic_month(args.tweets, args.profiles)
+    merged, indexed = enrich_by_merge(tweets, profiles), enrich_with_profiles(tweets, profiles)
+    pd.testing.assert_frame_equal(merged.astype(str), indexed.astype(str))
+
+    index = ProfileIndex(profiles)
+    results = {
+        "merge": best_of(lambda: enrich_by_merge(tweets, profiles), args.repeat),
+        "index (built per call)": best_of(lambda: enrich_with_profiles(tweets, profiles), args.repeat),
+        "index (prebuilt)": best_of(lambda: enrich_with_profiles(tweets, index), args.repeat),
+    }
+    print(f"{args.tweets} tweets x {args.profiles} profiles, best of {args.repeat}")
+    for name, seconds in results.items():
+        print(f"  {name:<24} {seconds * 1000:8.1f} ms  ({results['merge'] / seconds:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
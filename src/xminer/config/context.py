@@ -0,0 +1,77 @@
+# src/xminer/config/context.py
+from __future__ import annotations
+
+from dataclasses import dataclass, fields, replace
+from datetime import datetime
+
+from .params import Params
+from ..utils.global_helpers import politicians_table_name
+
+
+@dataclass(frozen=True)
+class RunContext:
+    """
+    Immutable settings of one task or pipeline run, passed to every task entry point.
+    Params (parameters.yml) is only the default source: build variants with for_month()
+    or dataclasses.replace() to run several months or configurations side by side.
+    """
+    # ----- period / output -----
+    year: int
+    month: int
+    outdir: str = "output"
+    top_n: int = 10
+    schema: str = "public"
+    metrics_engine: str = "pandas"
+    metrics_workers: int = 1
+    pipeline_workers: int = 1
+    loader_backend: str = "pandas"
+    leaderboard_group_by: tuple = ()
+    windows: tuple = ()
+    profile_comparisons: tuple = ()
+    cube_sets: tuple = ()
+
+    # ----- fetch_x_profiles -----
+    sample_limit: int = 50
+    chunk_size: int = 100
+    load_to_db: bool = False
+    store_csv: bool = False
+
+    # ----- fetch_tweets -----
+    tweets_sample_limit: int = -1
+    sample_seed: int | None = None
+    tweets_since: str | None = None
+    tweet_fields: tuple = ()
+    rate_limit_fallback_sleep: int = 901
+    skip_fetch_date: datetime | None = None
+
+    # ----- trends -----
+    trends_woeid: int = 23424829
+    trends_place_name: str = "Germany"
+
+    def __post_init__(self):
+        if not (1 <= int(self.month) <= 12):
+            raise ValueError(f"Month must be in 1..12, got {self.month!r}")
+
+    @classmethod
+    def from_params(cls, **overrides) -> "RunContext":
+        """Context from the current Params values; keyword arguments override single fields."""
+        values = {}
+        for f in fields(cls):
+            if hasattr(Params, f.name):
+                v = getattr(Params, f.name)
+                values[f.name] = tuple(v) if isinstance(v, list) else v
+        values.update(overrides)
+        return cls(**values)
+
+    def for_month(self, year: int, month: int) -> "RunContext":
+        return replace(self, year=int(year), month=int(month))
+
+    @property
+    def politicians(self) -> str:
+        """Roster table of the context month, e.g. politicians_10_2025."""
+        return politicians_table_name(self.month, self.year)
+
+
+def resolve_context(ctx: RunContext | None = None) -> RunContext:
+    """The given context, or one built from Params (the default for direct task runs)."""
+    return ctx if ctx is not None else RunContext.from_params()
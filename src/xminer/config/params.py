@@ -70,6 +70,23 @@ class Params:
     month  = _get_int("common.month", "month", default=9)
     outdir = _get("common.outdir", "outdir", default="output")
     top_n  = _get_int("common.top_n", "top_n", default=10)
+    # "pandas" loads rows and aggregates locally; "sql" pushes aggregate metrics down to Postgres;
+    # "rollup" computes the monthly tweet aggregates from the daily per-author rollup table
+    metrics_engine = _get("common.metrics_engine", "metrics_engine", default="pandas")
+    # threads per metrics task for independent metric specs / leaderboards (1 = serial)
+    metrics_workers = _get_int("common.metrics_workers", "metrics_workers", default=1)
+    # threads per pipeline run for steps that do not depend on each other (1 = one step after another)
+    pipeline_workers = _get_int("common.pipeline_workers", "pipeline_workers", default=1)
+    # how the metrics loaders read Postgres: "pandas" (pd.read_sql) or "arrow" (COPY into Arrow batches)
+    loader_backend = _get("common.loader_backend", "loader_backend", default="pandas")
+    # extra per-group variants of every tweet leaderboard: partei_kurz | iso_week | lang
+    leaderboard_group_by = _get_list("common.leaderboard_group_by", "leaderboard_group_by", default=[])
+    # extra tweet metric windows from the daily rollup: week | month | quarter | rollingN
+    windows = _get_list("common.windows", "windows", default=[])
+    # extra follower comparisons against the month-end profiles: week | <N>d | YYYY-MM-DD (since that day)
+    profile_comparisons = _get_list("common.profile_comparisons", "profile_comparisons", default=[])
+    # grouping sets of the politician cube (dimensions joined by "+", "all" = grand total); empty = defaults
+    cube_sets = _get_list("common.cube_sets", "cube_sets", default=[])
 
     # ----- fetch_x_profiles -----
     sample_limit = _get_int("fetch_x_profiles.sample_limit", "sample_limit", default=50)
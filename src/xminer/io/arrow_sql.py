@@ -0,0 +1,103 @@
+# src/xminer/io/arrow_sql.py
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from typing import Mapping
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# Arrow-native query reads (COPY ... TO STDOUT -> Arrow record batches)
+# -------------------------------
+# Postgres type OIDs -> Arrow types; anything else (json/jsonb, arrays, ...) arrives as text
+PG_ARROW_TYPES = {
+    16: pa.bool_(),                      # bool
+    20: pa.int64(),                      # int8
+    21: pa.int16(),                      # int2
+    23: pa.int32(),                      # int4
+    700: pa.float32(),                   # float4
+    701: pa.float64(),                   # float8
+    1700: pa.float64(),                  # numeric
+    1082: pa.date32(),                   # date
+    1114: pa.timestamp("us"),            # timestamp
+    1184: pa.timestamp("us", tz="UTC"),  # timestamptz (session TimeZone is set to UTC)
+}
+COPY_BLOCK_SIZE = 4 << 20
+
+# :name bind parameters of the SQL templates (not :: casts)
+_BIND_PARAM = re.compile(r"(?<![:\w]):(\w+)")
+
+
+def _pyformat(sql: str) -> str:
+    """Rewrite text()-style :name parameters into psycopg2's %(name)s style."""
+    return _BIND_PARAM.sub(r"%(\1)s", sql.replace("%", "%%"))
+
+
+def _arrow_schema(cur, query: str) -> list:
+    """(column, Arrow type) pairs of a query, from a zero-row execution."""
+    cur.execute(f"SELECT * FROM ({query}) AS _q LIMIT 0")
+    return [(d.name, PG_ARROW_TYPES.get(d.type_code, pa.string())) for d in cur.description]
+
+
+def read_sql_arrow(sql: str, conn, params: Mapping | None = None) -> pd.DataFrame:
+    """
+    Run `sql` (text()-style :name parameters) on a SQLAlchemy connection and return a
+    DataFrame with pyarrow-backed dtypes. Rows are streamed from COPY (CSV) into Arrow
+    record batches while the server is still sending, so no Python row tuples are built
+    and timestamps / numbers arrive typed.
+    """
+    cur = conn.connection.dbapi_connection.cursor()
+    try:
+        cur.execute("SET LOCAL TimeZone = 'UTC'")
+        cur.execute("SET LOCAL DateStyle = 'ISO'")
+        query = cur.mogrify(_pyformat(sql).strip().rstrip(";"), params or {}).decode()
+        schema = _arrow_schema(cur, query)
+        names = [name for name, _ in schema]
+
+        read_fd, write_fd = os.pipe()
+        errors = []
+
+        def _copy():
+            with os.fdopen(write_fd, "wb") as sink:
+                try:
+                    cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv)", sink, size=COPY_BLOCK_SIZE)
+                except BaseException as e:  # surfaced by the reader below
+                    errors.append(e)
+
+        producer = threading.Thread(target=_copy, name="copy-to-arrow", daemon=True)
+        producer.start()
+        batches, parse_error = [], None
+        with os.fdopen(read_fd, "rb") as source:
+            try:
+                reader = pa_csv.open_csv(
+                    source,
+                    read_options=pa_csv.ReadOptions(column_names=names, block_size=COPY_BLOCK_SIZE),
+                    convert_options=pa_csv.ConvertOptions(
+                        column_types=dict(schema),
+                        true_values=["t"], false_values=["f"], null_values=[""],
+                        strings_can_be_null=True, quoted_strings_can_be_null=False,
+                    ),
+                )
+                batches = list(reader)
+            except pa.ArrowInvalid as e:
+                parse_error = e
+        # the read end is closed here, so a producer blocked on a full pipe fails instead of hanging
+        producer.join()
+        # an empty result has no first block to open; anything else is a real parse error
+        if parse_error is not None and "Empty CSV" not in str(parse_error):
+            raise parse_error
+        if errors:
+            raise errors[0]
+    finally:
+        cur.close()
+
+    table = pa.Table.from_batches(batches, schema=pa.schema(schema))
+    logger.debug("Arrow read: %d rows x %d cols (%d batches)", table.num_rows, table.num_columns, len(batches))
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
@@ -0,0 +1,126 @@
+# src/xminer/io/cache.py
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, FrozenSet, Hashable, Iterable, Iterator, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetCache:
+    """
+    Run-scoped store of loaded DataFrames.
+
+    Keys are built by the loaders as (query template, tables, year, month), so a
+    dataset pulled by one metrics task is reused by every later task of the same run.
+    Frames are handed out as shallow copies: callers may add columns freely but must
+    not modify loaded values in place.
+    """
+
+    def __init__(self):
+        self._frames: Dict[Hashable, pd.DataFrame] = {}
+        self._columns: Dict[Hashable, Optional[FrozenSet[str]]] = {}
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, key: Hashable, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        # one lock per key: concurrent callers of the same dataset wait for a single load
+        with self._key_lock(key):
+            df = self._frames.get(key)
+            if df is None:
+                self.misses += 1
+                df = loader()
+                self._frames[key] = df
+                self._columns[key] = None
+            else:
+                self.hits += 1
+                logger.info("Dataset cache hit: %s", _describe(key))
+        return df.copy(deep=False)
+
+    def get_projected(
+        self,
+        key: Hashable,
+        loader: Callable[[Optional[list]], pd.DataFrame],
+        columns: Iterable[str] | None,
+    ) -> pd.DataFrame:
+        """
+        Like get(), for loaders that accept a column projection (None = all columns).
+        A cached frame is reused when it was loaded with a superset of `columns`;
+        otherwise the union of both column sets is loaded and replaces it.
+        """
+        want = None if columns is None else frozenset(columns)
+        with self._key_lock(key):
+            df = self._frames.get(key)
+            have = self._columns.get(key)
+            if df is not None and (have is None or (want is not None and want <= have)):
+                self.hits += 1
+                logger.info("Dataset cache hit: %s", _describe(key))
+            else:
+                self.misses += 1
+                load = None if want is None else want | (have or frozenset())
+                df = loader(None if load is None else sorted(load))
+                self._frames[key] = df
+                self._columns[key] = load
+        return df.copy(deep=False)
+
+    def put(self, key: Hashable, df: pd.DataFrame, columns: Iterable[str] | None = None):
+        with self._key_lock(key):
+            self._frames[key] = df
+            self._columns[key] = None if columns is None else frozenset(columns)
+
+    def clear(self):
+        with self._guard:
+            self._frames.clear()
+            self._columns.clear()
+            self._locks.clear()
+
+
+def _describe(key: Hashable) -> str:
+    # templates are long SQL strings; log only the table/period part of the key
+    if isinstance(key, tuple) and len(key) > 1:
+        return repr(key[1:])
+    return repr(key)
+
+
+_active: Optional[DatasetCache] = None
+
+
+def active_cache() -> Optional[DatasetCache]:
+    return _active
+
+
+@contextmanager
+def dataset_cache(cache: DatasetCache | None = None) -> Iterator[DatasetCache]:
+    """Activate a dataset cache for the duration of a pipeline run."""
+    global _active
+    prev = _active
+    _active = cache or DatasetCache()
+    try:
+        yield _active
+    finally:
+        logger.info("Dataset cache: %d hits, %d loads", _active.hits, _active.misses)
+        _active = prev
+
+
+def cached(key: Hashable, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """Load through the active cache; without one, just call the loader."""
+    if _active is None:
+        return loader()
+    return _active.get(key, loader)
+
+
+def cached_projected(key: Hashable, loader: Callable[[Optional[list]], pd.DataFrame], columns: Iterable[str] | None) -> pd.DataFrame:
+    """Column-projected variant of cached()."""
+    if _active is None:
+        return loader(None if columns is None else list(columns))
+    return _active.get_projected(key, loader, columns)
@@ -0,0 +1,64 @@
+# src/xminer/io/dtypes.py
+from __future__ import annotations
+
+import logging
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# Compact dtypes for loaded frames
+# -------------------------------
+# low-cardinality keys stored as categoricals (only when repeated enough to pay off)
+CATEGORY_COLUMNS = ("partei_kurz", "username", "lang", "source")
+CATEGORY_MAX_UNIQUE_SHARE = 0.5
+_INT32_MAX = np.iinfo(np.int32).max
+
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def to_nullable_int(values: pd.Series) -> pd.Series:
+    """
+    Numeric coercion into Int32 (Int64 when out of range); non-integral floats stay float.
+    pyarrow-backed integer columns (Arrow loader backend) stay pyarrow-backed as int32[pyarrow].
+    """
+    arrow = isinstance(values.dtype, pd.ArrowDtype)
+    num = values if arrow and values.dtype.kind == "i" else pd.to_numeric(values, errors="coerce")
+    if num.dtype.kind == "f":
+        finite = num.dropna()
+        if not (finite == np.floor(finite)).all():
+            return num
+    big = num.notna().any() and max(abs(num.max()), abs(num.min())) > _INT32_MAX
+    if arrow:
+        return num.astype(pd.ArrowDtype(pa.int64() if big else pa.int32()))
+    return num.astype("Int64" if big else "Int32")
+
+
+def to_category(values: pd.Series) -> pd.Series:
+    """Categorical with lexically sorted categories (keeps sort/groupby order of the object column)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values
+    return values.astype(pd.CategoricalDtype(sorted(values.dropna().unique())))
+
+
+def compact_frame(df: pd.DataFrame, name: str = "frame", ints: Iterable[str] = (),
+                  categories: Iterable[str] = CATEGORY_COLUMNS) -> pd.DataFrame:
+    """
+    Convert counters (`ints`) to nullable Int32 and low-cardinality keys to categoricals,
+    in place; logs the frame's memory before and after.
+    """
+    before = frame_memory_mb(df)
+    for c in ints:
+        if c in df.columns:
+            df[c] = to_nullable_int(df[c])
+    for c in categories:
+        if c in df.columns and len(df) and df[c].nunique(dropna=True) <= CATEGORY_MAX_UNIQUE_SHARE * len(df):
+            df[c] = to_category(df[c])
+    logger.info("Compacted %s (%d rows): %.1f MB -> %.1f MB", name, len(df), before, frame_memory_mb(df))
+    return df
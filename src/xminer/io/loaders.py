@@ -0,0 +1,331 @@
+# src/xminer/io/loaders.py
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Iterator, Sequence
+
+import pandas as pd
+from sqlalchemy import text
+
+from .db import engine
+from .arrow_sql import read_sql_arrow
+from .cache import active_cache, cached, cached_projected
+from .dtypes import compact_frame
+from ..utils.global_helpers import politicians_table_name, normalize_party, strip_usernames, month_bounds
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# SQL templates shared by the metrics tasks
+# -------------------------------
+# latest x_profile per username fetched before :ub (the month's upper bound, see month_bounds)
+# joined with politician attributes (for followers etc.)
+POSTGRES_LATEST_PROFILES_TMPL = r"""
+WITH joined AS (
+  SELECT
+    xp.username,
+    xp.x_user_id,
+    xp.name,
+    xp.created_at,
+    xp.verified,
+    xp.protected,
+    xp.followers_count,
+    xp.following_count,
+    xp.tweet_count,
+    xp.listed_count,
+    xp.location,
+    xp.description,
+    xp.retrieved_at,
+    p.partei_kurz,
+    p.geschlecht,
+    p.geburtsdatum,
+    ROW_NUMBER() OVER (PARTITION BY lower(xp.username) ORDER BY xp.retrieved_at DESC) AS rn
+  FROM {schema}.{x_profiles} xp
+  JOIN {schema}.{politicians} p
+    ON lower(xp.username) = lower(p.username)
+  WHERE xp.retrieved_at < :ub
+)
+SELECT *
+FROM joined
+WHERE rn = 1
+"""
+
+# tweets for a given month joined to politicians (party) by username;
+# {columns} is the projected select list (see tweet_select_list)
+POSTGRES_TWEETS_MONTH_TMPL = r"""
+SELECT
+  {columns},
+  p.partei_kurz
+FROM {schema}.{tweets} t
+JOIN {schema}.{politicians} p
+  ON lower(t.username) = lower(p.username)
+WHERE t.created_at >= :start_ts
+  AND t.created_at < :end_ts
+"""
+
+# wide per-tweet columns fetched lazily for the handful of rows that reach an output
+POSTGRES_TWEET_COLUMNS_BY_ID_TMPL = r"""
+SELECT
+  t.tweet_id,
+  {columns}
+FROM {schema}.{tweets} t
+WHERE t.tweet_id = ANY(:tweet_ids)
+"""
+
+# raw tweets of a UTC time range (multi-month backfills); joined to each month's roster in pandas
+POSTGRES_TWEETS_RANGE_TMPL = r"""
+SELECT
+  {columns}
+FROM {schema}.{tweets} t
+WHERE t.created_at >= :start_ts
+  AND t.created_at < :end_ts
+"""
+
+# roster columns the month loads join on
+POSTGRES_ROSTER_TMPL = r"""
+SELECT p.username, p.partei_kurz
+FROM {schema}.{politicians} p
+WHERE p.username IS NOT NULL
+"""
+
+# daily per-author rollup rows (tasks/tweets_daily_rollup.py) for [start_day, end_day) joined to the roster
+POSTGRES_DAILY_ROLLUP_TMPL = r"""
+SELECT
+  r.author_id, r.username, r.day, r.n_tweets,
+  r.like_count_sum, r.like_count_n, r.reply_count_sum, r.reply_count_n,
+  r.retweet_count_sum, r.retweet_count_n, r.quote_count_sum, r.quote_count_n,
+  r.bookmark_count_sum, r.bookmark_count_n, r.impression_count_sum, r.impression_count_n,
+  r.engagement_total_sum, r.engagement_total_n, r.engagement_rate_sum, r.engagement_rate_n,
+  r.like_to_reply_sum, r.like_to_reply_n, r.retweet_to_like_sum, r.retweet_to_like_n,
+  p.partei_kurz
+FROM {schema}.{rollup} r
+JOIN {schema}.{politicians} p
+  ON lower(r.username) = lower(p.username)
+WHERE r.day >= :start_day
+  AND r.day < :end_day
+"""
+
+# politician attributes of the month's roster, one row per lower-cased username
+POSTGRES_ROSTER_ATTRIBUTES_TMPL = r"""
+SELECT DISTINCT ON (lower(btrim(username)))
+  lower(btrim(username)) AS user_key, geschlecht, geburtsdatum, wp_wkr_land, wp_mandatsart, wp_liste
+FROM {schema}.{politicians}
+ORDER BY lower(btrim(username))
+"""
+
+TWEET_COLUMNS = [
+    "tweet_id", "author_id", "username", "created_at", "text", "lang",
+    "conversation_id", "in_reply_to_user_id", "possibly_sensitive",
+    "like_count", "reply_count", "retweet_count", "quote_count", "bookmark_count", "impression_count",
+    "source", "entities", "referenced_tweets", "retrieved_at",
+]
+# always selected: join/grouping keys
+TWEET_KEY_COLUMNS = ["tweet_id", "author_id", "username", "created_at"]
+
+# how query results become DataFrames: "pandas" (pd.read_sql over DB-API rows) or
+# "arrow" (COPY streamed into Arrow record batches; pyarrow-backed dtypes, see io/arrow_sql.py)
+LOADER_BACKENDS = ("pandas", "arrow")
+
+COUNT_COLS = ["like_count", "reply_count", "retweet_count", "quote_count", "bookmark_count", "impression_count"]
+PROFILE_COUNT_COLS = ["followers_count", "following_count", "tweet_count", "listed_count"]
+
+
+# -------------------------------
+# Reading / typing / cleanup
+# -------------------------------
+def read_frame(sql: str, conn, params: dict | None = None, backend: str = "pandas") -> pd.DataFrame:
+    """Run a SQL template (text()-style :name parameters) with the selected loader backend."""
+    if backend == "arrow":
+        return read_sql_arrow(sql, conn, params)
+    if backend != "pandas":
+        raise ValueError(f"Unknown loader backend {backend!r}; expected one of {LOADER_BACKENDS}")
+    return pd.read_sql(text(sql), conn, params=params)
+
+
+def _is_typed(values: pd.Series) -> bool:
+    # Arrow reads arrive typed from Postgres; only DB-API object columns need parsing
+    return isinstance(values.dtype, pd.ArrowDtype)
+
+
+def _to_utc(values: pd.Series) -> pd.Series:
+    return values if _is_typed(values) else pd.to_datetime(values, utc=True, errors="coerce")
+
+
+def type_profiles(df: pd.DataFrame) -> pd.DataFrame:
+    if "created_at" in df:
+        df["created_at"] = _to_utc(df["created_at"])
+    if "retrieved_at" in df:
+        df["retrieved_at"] = _to_utc(df["retrieved_at"])
+    if "geburtsdatum" in df and not _is_typed(df["geburtsdatum"]):
+        df["geburtsdatum"] = pd.to_datetime(df["geburtsdatum"], utc=True, errors="coerce").dt.date
+    # categoricals / nullable ints first, so the string cleanup runs once per category
+    compact_frame(df, "profiles", ints=PROFILE_COUNT_COLS)
+    strip_usernames(df)
+    # normalize CDU/CSU union
+    return normalize_party(df)
+
+
+def type_tweets(df: pd.DataFrame) -> pd.DataFrame:
+    if "created_at" in df:
+        df["created_at"] = _to_utc(df["created_at"])
+    if "retrieved_at" in df:
+        df["retrieved_at"] = _to_utc(df["retrieved_at"])
+    compact_frame(df, "tweets", ints=COUNT_COLS)
+    strip_usernames(df)
+    return normalize_party(df)
+
+
+# -------------------------------
+# Loaders (cached per run when a dataset cache is active)
+# -------------------------------
+def profiles_params(year: int, month: int) -> dict:
+    """Bind parameters of POSTGRES_LATEST_PROFILES_TMPL for a month."""
+    return {"ub": month_bounds(year, month)[1].to_pydatetime()}
+
+
+def latest_profiles_key(schema: str, x_profiles: str, month: int, year: int) -> tuple:
+    politicians = politicians_table_name(month, year)
+    return (POSTGRES_LATEST_PROFILES_TMPL, (schema, x_profiles, politicians), year, month)
+
+
+def tweets_month_key(schema: str, tweets: str, month: int, year: int) -> tuple:
+    politicians = politicians_table_name(month, year)
+    return (POSTGRES_TWEETS_MONTH_TMPL, (schema, tweets, politicians), year, month)
+
+
+def load_latest_profiles(schema: str, x_profiles: str, month: int, year: int, backend: str = "pandas") -> pd.DataFrame:
+    """Return one latest row per username (fetched by the month's end) joined with politician attributes."""
+    politicians = politicians_table_name(month, year)
+
+    def _load() -> pd.DataFrame:
+        logger.info("Joining x_profiles with table: %s.%s", schema, politicians)
+        sql = POSTGRES_LATEST_PROFILES_TMPL.format(schema=schema, x_profiles=x_profiles, politicians=politicians)
+        with engine.begin() as conn:
+            df = read_frame(sql, conn, params=profiles_params(year, month), backend=backend)
+        return type_profiles(df)
+
+    return cached(latest_profiles_key(schema, x_profiles, month, year), _load)
+
+
+def tweet_select_list(columns: Iterable[str] | None = None) -> str:
+    """Select list for POSTGRES_TWEETS_MONTH_TMPL in canonical column order; None = all columns."""
+    wanted = set(TWEET_COLUMNS) if columns is None else set(columns) | set(TWEET_KEY_COLUMNS)
+    unknown = wanted - set(TWEET_COLUMNS) - {"partei_kurz"}
+    if unknown:
+        raise ValueError(f"Unknown tweet columns: {sorted(unknown)}")
+    return ",\n  ".join(f"t.{c}" for c in TWEET_COLUMNS if c in wanted)
+
+
+def load_tweets_month(schema: str, tweets: str, month: int, year: int, columns: Iterable[str] | None = None,
+                      backend: str = "pandas") -> pd.DataFrame:
+    """
+    Return the month's tweets (UTC month bounds) joined with the month's roster.
+    `columns` projects the tweet columns (keys are always included); None loads all of them.
+    """
+    politicians = politicians_table_name(month, year)
+
+    def _load(cols) -> pd.DataFrame:
+        start_ts, end_ts = month_bounds(year, month)
+        sql = POSTGRES_TWEETS_MONTH_TMPL.format(
+            schema=schema, tweets=tweets, politicians=politicians, columns=tweet_select_list(cols)
+        )
+        with engine.begin() as conn:
+            df = read_frame(sql, conn, {"start_ts": start_ts, "end_ts": end_ts}, backend)
+        logger.info("Loaded tweets for %04d-%02d: %d rows x %d cols", year, month, len(df), df.shape[1])
+        return type_tweets(df)
+
+    return cached_projected(tweets_month_key(schema, tweets, month, year), _load, columns)
+
+
+def preload_tweets_months(schema: str, tweets: str, year_months: Sequence[tuple], columns: Iterable[str] | None = None,
+                          backend: str = "pandas") -> int:
+    """
+    Load the tweets of several (year, month) periods with one range query and seed the active
+    dataset cache with one frame per month, as load_tweets_month() would return it (same UTC
+    bounds, inner join to that month's roster on lower(username)). Returns the rows loaded.
+    """
+    cache = active_cache()
+    if cache is None or not year_months:
+        return 0
+    bounds = {ym: month_bounds(*ym) for ym in year_months}
+    start_ts = min(b[0] for b in bounds.values())
+    end_ts = max(b[1] for b in bounds.values())
+    sql = POSTGRES_TWEETS_RANGE_TMPL.format(schema=schema, tweets=tweets, columns=tweet_select_list(columns))
+    with engine.begin() as conn:
+        raw = read_frame(sql, conn, {"start_ts": start_ts, "end_ts": end_ts}, backend)
+    logger.info("Loaded tweets %s..%s for %d months: %d rows", start_ts.date(), end_ts.date(), len(year_months), len(raw))
+    raw["created_at"] = _to_utc(raw["created_at"])
+    raw = raw[raw["username"].notna()]
+    raw_key = raw["username"].str.lower()
+
+    cached_cols = None if columns is None else set(columns) | set(TWEET_KEY_COLUMNS)
+    for (year, month), (start, end) in bounds.items():
+        politicians = politicians_table_name(month, year)
+        with engine.begin() as conn:
+            roster = read_frame(POSTGRES_ROSTER_TMPL.format(schema=schema, politicians=politicians), conn, backend=backend)
+        roster = pd.DataFrame({"_key": roster["username"].str.lower(), "partei_kurz": roster["partei_kurz"]})
+        in_month = (raw["created_at"] >= start) & (raw["created_at"] < end)
+        df = raw[in_month].assign(_key=raw_key[in_month]).merge(roster, on="_key", how="inner").drop(columns="_key")
+        cache.put(tweets_month_key(schema, tweets, month, year), type_tweets(df), cached_cols)
+        logger.info("Seeded tweets for %04d-%02d: %d rows", year, month, len(df))
+    return len(raw)
+
+
+def iter_tweets_month_chunks(schema: str, tweets: str, month: int, year: int, start_ts, end_ts,
+                             columns: Iterable[str] | None = None, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+    """
+    Yield the tweets in [start_ts, end_ts) joined with the (month, year) roster in typed chunks of
+    at most `chunksize` rows, read through a server-side cursor (memory bounded by the chunk size).
+    """
+    politicians = politicians_table_name(month, year)
+    sql = POSTGRES_TWEETS_MONTH_TMPL.format(schema=schema, tweets=tweets, politicians=politicians,
+                                            columns=tweet_select_list(columns))
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=chunksize)
+        for chunk in pd.read_sql(text(sql), conn, params={"start_ts": start_ts, "end_ts": end_ts}, chunksize=chunksize):
+            yield type_tweets(chunk)
+
+
+def load_daily_rollup(schema: str, rollup: str, month: int, year: int, start_day, end_day,
+                      backend: str = "pandas") -> pd.DataFrame:
+    """Return rollup rows for days in [start_day, end_day) joined with the (month, year) roster."""
+    politicians = politicians_table_name(month, year)
+
+    def _load() -> pd.DataFrame:
+        sql = POSTGRES_DAILY_ROLLUP_TMPL.format(schema=schema, rollup=rollup, politicians=politicians)
+        with engine.begin() as conn:
+            df = read_frame(sql, conn, {"start_day": start_day, "end_day": end_day}, backend)
+        logger.info("Loaded daily rollup %s..%s: %d rows", start_day, end_day, len(df))
+        return normalize_party(strip_usernames(df))
+
+    key = (POSTGRES_DAILY_ROLLUP_TMPL, (schema, rollup, politicians), str(start_day), str(end_day))
+    return cached(key, _load)
+
+
+def load_roster_attributes(schema: str, month: int, year: int, backend: str = "pandas") -> pd.DataFrame:
+    """Return the (month, year) roster's attributes keyed by user_key (lower-cased username)."""
+    politicians = politicians_table_name(month, year)
+
+    def _load() -> pd.DataFrame:
+        sql = POSTGRES_ROSTER_ATTRIBUTES_TMPL.format(schema=schema, politicians=politicians)
+        with engine.begin() as conn:
+            df = read_frame(sql, conn, backend=backend)
+        return type_profiles(df)
+
+    return cached((POSTGRES_ROSTER_ATTRIBUTES_TMPL, (schema, politicians), year, month), _load)
+
+
+def load_tweet_columns(schema: str, tweets: str, tweet_ids: Iterable[str], columns: Sequence[str] = ("text",),
+                       backend: str = "pandas") -> pd.DataFrame:
+    """Fetch wide columns (text, JSONB, ...) for specific tweets only. Returns tweet_id + columns."""
+    ids = sorted({str(t) for t in tweet_ids if t is not None and not pd.isna(t)})
+    if not ids:
+        return pd.DataFrame(columns=["tweet_id", *columns])
+    sql = POSTGRES_TWEET_COLUMNS_BY_ID_TMPL.format(
+        schema=schema, tweets=tweets, columns=",\n  ".join(f"t.{c}" for c in columns)
+    )
+    with engine.begin() as conn:
+        df = read_frame(sql, conn, {"tweet_ids": ids}, backend)
+    df["tweet_id"] = df["tweet_id"].astype(str)
+    logger.info("Fetched %s for %d tweets", ", ".join(columns), len(df))
+    return df
@@ -2,7 +2,7 @@
 from __future__ import annotations
 import logging
 import typer
-from .flows import pipeline_fetch, pipeline_metrics, pipeline_all
+from .flows import pipeline_fetch, pipeline_metrics, pipeline_all, metrics_range
 
 app = typer.Typer(add_completion=False)
 
@@ -13,7 +13,10 @@ def _setup_logging():
     )
 
 @app.command()
-def run(name: str = typer.Argument(..., help="fetch | metrics | all")):
+def run(
+    name: str = typer.Argument(..., help="fetch | metrics | all"),
+    force: bool = typer.Option(False, "--force", help="Recompute metrics steps even when their inputs are unchanged"),
+):
     _setup_logging()
     name = name.lower()
     if name == "fetch":
@@ -24,7 +27,30 @@ def run(name: str = typer.Argument(..., help="fetch | metrics | all")):
         p = pipeline_all()
     else:
         raise typer.BadParameter("Unknown pipeline. Use: fetch, metrics, all")
-    p.run()
+    p.run(force=force)
+
+def _parse_ym(s: str) -> tuple:
+    try:
+        year, month = (int(x) for x in s.split("-"))
+    except ValueError:
+        raise typer.BadParameter(f"Expected YYYY-MM, got {s!r}")
+    if not (1 <= month <= 12):
+        raise typer.BadParameter(f"Month must be in 1..12, got {s!r}")
+    return year, month
+
+@app.command()
+def metrics(
+    start: str = typer.Option(None, "--from", help="First month (YYYY-MM); default: parameters.yml year/month"),
+    end: str = typer.Option(None, "--to", help="Last month, inclusive (YYYY-MM); default: --from"),
+    jobs: int = typer.Option(1, "--jobs", help="Worker processes for multi-month runs"),
+    force: bool = typer.Option(False, "--force", help="Recompute steps even when their inputs are unchanged"),
+):
+    """Compute the metrics pipeline for one month or recompute a range of months."""
+    _setup_logging()
+    if start is None:
+        pipeline_metrics().run(force=force)
+        return
+    metrics_range(_parse_ym(start), _parse_ym(end or start), jobs=jobs, force=force)
 
 if __name__ == "__main__":
     app()
@@ -0,0 +1,232 @@
+# src/xminer/pipelines/fingerprint.py
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from importlib import metadata
+from typing import Callable, Iterable
+
+from sqlalchemy import text
+
+from ..config.context import RunContext
+from ..io.db import engine
+from ..tasks.tweets_daily_rollup import ROLLUP_TABLE
+from ..tasks.tweet_metrics_history import HISTORY_TABLE
+from ..tasks.x_profiles_monthly_snapshot import SNAPSHOT_TABLE, year_month_key
+from ..utils.global_helpers import month_bounds, politicians_table_name, prev_year_month, window_bounds
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# Step fingerprints (skip steps whose inputs did not change)
+# -------------------------------
+# A fingerprint is a JSON document of everything a step's outputs depend on: source table
+# watermarks (row count and latest change stamp, optionally for a time window), roster tables,
+# the run parameters and the code version. It is stored next to the outputs of the month after
+# the step ran, together with the files the step wrote.
+STAMP_DIR = ".fingerprints"
+
+POSTGRES_TABLE_EXISTS_SQL = "SELECT to_regclass(:qualified) IS NOT NULL"
+
+# {stamp}: column marking the latest change (or NULL); {where}: optional time window on {time_col}
+POSTGRES_WATERMARK_TMPL = r"""
+SELECT COUNT(*) AS n_rows, MAX({stamp}) AS max_stamp
+FROM {schema}.{table}
+{where}
+"""
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Installed package version plus a hash of the package sources (changes with any code edit)."""
+    try:
+        version = metadata.version("xminer")
+    except metadata.PackageNotFoundError:
+        version = "dev"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha256()
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(f for f in files if f.endswith(".py")):
+            path = os.path.join(folder, name)
+            digest.update(os.path.relpath(path, root).encode())
+            with open(path, "rb") as fh:
+                digest.update(fh.read())
+    return f"{version}+{digest.hexdigest()[:12]}"
+
+
+def table_watermark(schema: str, table: str, stamp: str | None = None, time_col: str | None = None,
+                    start=None, end=None) -> dict:
+    """Row count and max(`stamp`) of a table, restricted to start <= time_col < end (either bound optional)."""
+    mark = {"table": f"{schema}.{table}"}
+    conds, params = [], {}
+    if time_col is not None and start is not None:
+        conds.append(f"{time_col} >= :start")
+        params["start"] = start
+    if time_col is not None and end is not None:
+        conds.append(f"{time_col} < :end")
+        params["end"] = end
+    if conds:
+        mark["window"] = [time_col, None if start is None else str(start), None if end is None else str(end)]
+    where = f"WHERE {' AND '.join(conds)}" if conds else ""
+    sql = POSTGRES_WATERMARK_TMPL.format(schema=schema, table=table, stamp=stamp or "NULL", where=where)
+    with engine.begin() as conn:
+        if not conn.execute(text(POSTGRES_TABLE_EXISTS_SQL), {"qualified": f"{schema}.{table}"}).scalar():
+            mark["missing"] = True
+            return mark
+        n_rows, max_stamp = conn.execute(text(sql), params).fetchone()
+    mark["rows"] = int(n_rows)
+    if stamp is not None:
+        mark["max"] = None if max_stamp is None else str(max_stamp)
+    return mark
+
+
+def tweets_month_watermark(schema: str, tweets: str, year: int, month: int) -> dict:
+    """Tweets of the month window the loaders read (see month_bounds), by fetch time."""
+    start, end = month_bounds(year, month)
+    return table_watermark(schema, tweets, "retrieved_at", "created_at", start.to_pydatetime(), end.to_pydatetime())
+
+
+def context_params(ctx, names: Iterable[str] | None = None) -> dict:
+    """JSON-able view of (some fields of) a RunContext: the parameters a step's outputs depend on."""
+    out = {}
+    for f in fields(ctx):
+        if names is not None and f.name not in names:
+            continue
+        v = getattr(ctx, f.name)
+        out[f.name] = list(v) if isinstance(v, tuple) else v if isinstance(v, (int, float, str, bool, type(None))) else str(v)
+    return out
+
+
+def digest(fingerprint: dict) -> str:
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def file_mtimes(root: str) -> dict:
+    """{path: mtime_ns} of the files under `root` (stamps excluded)."""
+    out = {}
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d != STAMP_DIR]
+        for f in files:
+            path = os.path.join(folder, f)
+            out[path] = os.stat(path).st_mtime_ns
+    return out
+
+
+@dataclass
+class StepFingerprint:
+    """How to fingerprint one pipeline step and where to keep its stamp."""
+    sources: Callable[[], Iterable[dict]]  # watermarks, evaluated right before the step would run
+    params: dict  # run parameters (e.g. context_params(ctx))
+    stamp_dir: str  # e.g. output/202510/.fingerprints
+    outdir: str  # tree searched for the files the step wrote
+
+    def compute(self, step: str) -> dict:
+        return {"step": step, "code": code_version(), "params": self.params, "sources": list(self.sources())}
+
+    def _path(self, step: str) -> str:
+        return os.path.join(self.stamp_dir, f"{step}.json")
+
+    def matches(self, step: str, fingerprint: dict) -> bool:
+        """True when the stored stamp has the same fingerprint and all its outputs still exist."""
+        try:
+            with open(self._path(step), encoding="utf-8") as fh:
+                stamp = json.load(fh)
+        except (OSError, ValueError):
+            return False
+        return stamp.get("digest") == digest(fingerprint) and all(os.path.exists(p) for p in stamp.get("outputs", []))
+
+    def fresh(self, step: str) -> bool:
+        """True when the step's last outputs are still valid for the current sources (evaluates the watermarks)."""
+        return self.matches(step, self.compute(step))
+
+    def snapshot(self) -> dict:
+        """File state of the output tree before the step runs (see record)."""
+        return file_mtimes(self.outdir)
+
+    def record(self, step: str, fingerprint: dict, before: dict) -> None:
+        """Store the fingerprint with the files the step created or rewrote since `before`."""
+        os.makedirs(self.stamp_dir, exist_ok=True)
+        stamp = {
+            "digest": digest(fingerprint),
+            "fingerprint": fingerprint,
+            "outputs": sorted(p for p, mtime in file_mtimes(self.outdir).items() if before.get(p) != mtime),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+        }
+        tmp = self._path(step) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(stamp, fh, indent=2, sort_keys=True, default=str)
+        os.replace(tmp, self._path(step))
+
+
+# -------------------------------
+# Metrics steps
+# -------------------------------
+# RunContext fields the metrics outputs depend on (workers / loader backend only change how they are computed)
+METRICS_OUTPUT_PARAMS = ("year", "month", "outdir", "top_n", "schema", "metrics_engine", "leaderboard_group_by", "windows",
+                         "profile_comparisons", "cube_sets")
+
+
+def month_fingerprint(ctx: RunContext, sources) -> StepFingerprint:
+    """Fingerprint kept under output/YYYYMM/.fingerprints; the step's outputs are looked up in output/YYYYMM."""
+    month_dir = os.path.join(ctx.outdir, f"{ctx.year:04d}{ctx.month:02d}")
+    return StepFingerprint(sources=sources, params=context_params(ctx, METRICS_OUTPUT_PARAMS),
+                           stamp_dir=os.path.join(month_dir, STAMP_DIR), outdir=month_dir)
+
+
+def metrics_sources(ctx: RunContext) -> dict:
+    """Per metrics step: a callable returning the watermarks of the sources it reads for the context month."""
+    schema = ctx.schema
+    prev, curr = prev_year_month(ctx.year, ctx.month), (ctx.year, ctx.month)
+
+    def roster(y: int, m: int) -> dict:
+        return table_watermark(schema, politicians_table_name(m, y))
+
+    def profiles(y: int, m: int) -> dict:
+        # the monthly tasks join the latest profile per username fetched before the month's upper bound
+        return table_watermark(schema, "x_profiles", "retrieved_at", "retrieved_at", end=month_bounds(y, m)[1].to_pydatetime())
+
+    def rollup(*months) -> list:
+        # only read by the rollup engine; without months: the whole table (windows)
+        if not months:
+            return [table_watermark(schema, ROLLUP_TABLE, "updated_at")]
+        if ctx.metrics_engine != "rollup":
+            return []
+        return [table_watermark(schema, ROLLUP_TABLE, "updated_at", "day", *(b.date() for b in month_bounds(y, m)))
+                for y, m in months]
+
+    return {
+        "x_profile_metrics_monthly": lambda: [profiles(*curr), roster(*curr)],
+        # month-end snapshots: profiles fetched before the current month's upper bound
+        "x_profile_metrics_delta": lambda: [
+            table_watermark(schema, "x_profiles", "retrieved_at", "retrieved_at", end=month_bounds(*curr)[1].to_pydatetime()),
+            table_watermark(schema, SNAPSHOT_TABLE, "materialized_at", "year_month",
+                            year_month_key(*prev), year_month_key(*curr) + 1),
+            roster(*prev), roster(*curr),
+        ],
+        # daily grid of the calendar month
+        "x_profile_followers_daily": lambda: [
+            table_watermark(schema, "x_profiles", "retrieved_at", "retrieved_at",
+                            end=window_bounds("month", date(*curr, 1))[1]),
+            roster(*curr),
+        ],
+        "tweets_metrics_monthly": lambda: [
+            tweets_month_watermark(schema, "tweets", *curr), profiles(*curr), roster(*curr), *rollup(curr),
+        ],
+        "tweets_metrics_delta": lambda: [
+            tweets_month_watermark(schema, "tweets", *prev), tweets_month_watermark(schema, "tweets", *curr),
+            profiles(*prev), profiles(*curr), roster(*prev), roster(*curr), *rollup(prev, curr),
+        ],
+        # change history of the month's tweets (appended by every fetch)
+        "tweets_metrics_velocity": lambda: [
+            tweets_month_watermark(schema, "tweets", *curr), table_watermark(schema, HISTORY_TABLE, "retrieved_at"),
+            roster(*curr),
+        ],
+        "metrics_cube": lambda: [tweets_month_watermark(schema, "tweets", *curr), profiles(*curr), roster(*curr)],
+        "tweets_metrics_window": lambda: [*rollup(), profiles(*curr), roster(*curr)],
+    }
@@ -1,59 +1,139 @@
 # src/xminer/pipelines/flows.py
 from __future__ import annotations
 import logging
-from ..config.params import Params
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from ..config.context import RunContext, resolve_context
+from ..io.cache import dataset_cache
+from ..io.db import engine
+from ..io.loaders import preload_tweets_months
+from ..utils.global_helpers import window_bounds, prev_year_month
+from ..utils.metrics_helpers import TWEET_LEADERBOARD_COLUMNS
 from ..tasks import (
     fetch_x_profiles as T_fetch_x_profiles,
     fetch_tweets as T_fetch_tweets,
+    fetch_x_trends as T_fetch_x_trends,
     x_profile_metrics_monthly as T_prof_month,
     x_profile_metrics_delta as T_prof_delta,
+    x_profile_followers_daily as T_prof_daily,
+    x_profiles_monthly_snapshot as T_prof_snap,
     tweets_metrics_monthly as T_tweets_month,
     tweets_metrics_delta as T_tweets_delta,
+    tweets_metrics_window as T_tweets_window,
+    tweets_metrics_velocity as T_tweets_velocity,
+    tweet_metrics_history as T_history,
+    metrics_cube as T_cube,
 )
 from .runner import Pipeline, Step
+from .fingerprint import StepFingerprint, metrics_sources, month_fingerprint
 
 logger = logging.getLogger(__name__)
 
-def _common():
-    year  = int(getattr(Params, "year"))
-    month = int(getattr(Params, "month"))
-    outdir = getattr(Params, "outdir", "output")
-    top_n = int(getattr(Params, "top_n", 50))
-    schema = "public"
-    return year, month, outdir, top_n, schema
+# at most this many running steps hold each resource; "db" steps of the metrics pipeline use up to
+# metrics_workers connections each, which keeps them within the engine's default pool (5 + 10 overflow)
+RESOURCE_LIMITS = {"db": 3, "x_api": 2}
 
-def pipeline_fetch() -> Pipeline:
-    # uses tasks with main()
+def pipeline_fetch(ctx: RunContext | None = None) -> Pipeline:
+    ctx = resolve_context(ctx)
+    # uses tasks with main(ctx); tweets are fetched for the profiles stored by fetch_x_profiles
     steps = [
-        Step("fetch_x_profiles", T_fetch_x_profiles.main),
-        Step("fetch_tweets",     T_fetch_tweets.main),
+        Step("fetch_x_profiles", T_fetch_x_profiles.main, dict(ctx=ctx), resources=("x_api", "db")),
+        Step("fetch_tweets",     T_fetch_tweets.main, dict(ctx=ctx),
+             depends_on=("fetch_x_profiles",), resources=("x_api", "db")),
+        Step("fetch_x_trends",   T_fetch_x_trends.main, dict(ctx=ctx), resources=("x_api", "db")),
     ]
-    return Pipeline("fetch", steps)
+    return Pipeline("fetch", steps, workers=ctx.pipeline_workers, limits=RESOURCE_LIMITS)
 
-def pipeline_metrics() -> Pipeline:
-    year, month, outdir, top_n, schema = _common()
+def pipeline_metrics(ctx: RunContext | None = None) -> Pipeline:
+    ctx = resolve_context(ctx)  # metrics_engine: pandas | sql | rollup
+    # steps writing under output/YYYYMM are skipped when their source watermarks, parameters and
+    # code are unchanged since their last run (Pipeline.run(force=True) recomputes everything)
+    sources = metrics_sources(ctx)
+
+    def stamp(name: str) -> StepFingerprint:
+        return month_fingerprint(ctx, sources[name])
+
+    # every step reads Postgres; only the profile delta needs another step's output (the snapshots)
+    db = ("db",)
     steps = [
-        Step("x_profile_metrics_monthly",
-             T_prof_month.run,
-             dict(year=year, month=month, outdir=outdir,
-                  schema=schema, x_profiles="x_profiles", top_n=top_n)),
-        Step("x_profile_metrics_delta",
-             T_prof_delta.run,
-             dict(year=year, month=month, outdir=outdir,
-                  schema=schema, x_profiles="x_profiles", politicians="politicians", top_n=top_n)),
-        Step("tweets_metrics_monthly",
-             T_tweets_month.run,
-             dict(year=year, month=month, outdir=outdir,
-                  schema=schema, tweets_tbl="tweets", x_profiles_tbl="x_profiles", top_n=top_n)),
-        Step("tweets_metrics_delta",
-             T_tweets_delta.run,
-             dict(year=year, month=month, outdir=outdir,
-                  schema=schema, tweets_tbl="tweets", x_profiles_tbl="x_profiles")),
+        Step("x_profile_metrics_monthly", T_prof_month.main, dict(ctx=ctx), stamp("x_profile_metrics_monthly"),
+             resources=db),
+        # materializes closed months once by itself; cheap to re-check
+        Step("x_profiles_monthly_snapshot", T_prof_snap.main, dict(argv=[], ctx=ctx), resources=db),
+        Step("x_profile_metrics_delta",   T_prof_delta.main, dict(ctx=ctx), stamp("x_profile_metrics_delta"),
+             depends_on=("x_profiles_monthly_snapshot",), resources=db),
+        Step("x_profile_followers_daily", T_prof_daily.main, dict(ctx=ctx), stamp("x_profile_followers_daily"),
+             resources=db),
+        Step("tweets_metrics_monthly",    T_tweets_month.main, dict(ctx=ctx), stamp("tweets_metrics_monthly"),
+             resources=db),
+        Step("tweets_metrics_delta",      T_tweets_delta.main, dict(ctx=ctx), stamp("tweets_metrics_delta"),
+             resources=db),
+        Step("tweets_metrics_velocity",   T_tweets_velocity.main, dict(ctx=ctx), stamp("tweets_metrics_velocity"),
+             resources=db),
     ]
-    return Pipeline("metrics", steps)
+    if ctx.windows:
+        # week / quarter / rolling windows from the daily rollup, anchored on the month's last day
+        last_day = window_bounds("month", date(ctx.year, ctx.month, 1))[1] - timedelta(days=1)
+        steps.append(Step("tweets_metrics_window", T_tweets_window.main,
+                          dict(argv=["--date", last_day.isoformat()], ctx=ctx),
+                          stamp("tweets_metrics_window"), resources=db))
+    if ctx.cube_sets:
+        # engagement / follower aggregates over grouping sets of politician attributes
+        steps.append(Step("metrics_cube", T_cube.main, dict(ctx=ctx), stamp("metrics_cube"), resources=db))
+    # one dataset cache per run: each month/profile set is fetched and typed once (shared by concurrent steps)
+    return Pipeline("metrics", steps, scope=dataset_cache, workers=ctx.pipeline_workers, limits=RESOURCE_LIMITS)
+
+def _metrics_months_worker(contexts: list, preload: list, force: bool = False) -> int:
+    """Run the metrics steps for consecutive months in one process, sharing one dataset cache."""
+    # connections must not be shared with the parent process
+    engine.dispose(close=False)
+    with dataset_cache():
+        preload_tweets_months(contexts[0].schema, "tweets", preload, columns=TWEET_LEADERBOARD_COLUMNS,
+                              backend=contexts[0].loader_backend)
+        for ctx in contexts:
+            # steps run inside this worker's cache instead of a fresh per-pipeline one
+            p = pipeline_metrics(ctx)
+            Pipeline(f"metrics {ctx.year:04d}-{ctx.month:02d}", p.steps, workers=p.workers, limits=p.limits).run(force=force)
+    return len(contexts)
+
+
+def metrics_range(start: tuple, end: tuple, jobs: int = 1, ctx: RunContext | None = None, force: bool = False) -> int:
+    """
+    Recompute the metrics pipeline for every month in [start, end] (inclusive (year, month) pairs).
+    Months are split into `jobs` contiguous chunks run in worker processes; each chunk loads its
+    tweets (plus the previous month, needed by the deltas) with one range query. Every month runs
+    with its own RunContext derived from `ctx` (default: Params); steps whose inputs are unchanged
+    are skipped unless `force` is set.
+    """
+    ctx = resolve_context(ctx)
+    months = T_prof_snap.iter_year_months(start, end)
+    if not months:
+        return 0
+    jobs = max(1, min(int(jobs), len(months)))
+    size = -(-len(months) // jobs)
+    chunks = [months[i:i + size] for i in range(0, len(months), size)]
+    preloads = [[prev_year_month(*chunk[0]), *chunk] for chunk in chunks]
+    contexts = [[ctx.for_month(y, m) for y, m in chunk] for chunk in chunks]
+    logger.info("Metrics backfill %04d-%02d..%04d-%02d: %d months in %d chunks",
+                *start, *end, len(months), len(chunks))
+
+    # create shared tables once so workers do not race on DDL
+    T_prof_snap.ensure_table(ctx.schema)
+    T_history.ensure_table(ctx.schema)
+    if jobs == 1:
+        return _metrics_months_worker(contexts[0], preloads[0], force)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return sum(pool.map(_metrics_months_worker, contexts, preloads, [force] * len(contexts)))
+
 
-def pipeline_all() -> Pipeline:
-    # fetch -> metrics
-    f = pipeline_fetch().steps
-    m = pipeline_metrics().steps
-    return Pipeline("all", [*f, *m])
+def pipeline_all(ctx: RunContext | None = None) -> Pipeline:
+    ctx = resolve_context(ctx)
+    # fetch -> metrics: metrics steps without dependencies wait for the profile and tweet fetches;
+    # trends are not read by any metric and run alongside everything else
+    f = pipeline_fetch(ctx).steps
+    m = pipeline_metrics(ctx).steps
+    fetched = ("fetch_x_profiles", "fetch_tweets")
+    for s in m:
+        s.depends_on = s.depends_on or fetched
+    return Pipeline("all", [*f, *m], scope=dataset_cache, workers=ctx.pipeline_workers, limits=RESOURCE_LIMITS)
@@ -1,27 +1,148 @@
 # src/xminer/pipelines/runner.py
 from __future__ import annotations
 import logging
-from typing import Callable, Iterable
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Iterable
+
+from .fingerprint import StepFingerprint
 
 logger = logging.getLogger(__name__)
 
 class Step:
-    def __init__(self, name: str, fn: Callable, kwargs: dict | None = None):
+    def __init__(self, name: str, fn: Callable, kwargs: dict | None = None, fingerprint: StepFingerprint | None = None,
+                 depends_on: Iterable[str] = (), resources: Iterable[str] = ()):
         self.name = name
         self.fn = fn
         self.kwargs = kwargs or {}
+        # optional: skip the step when its inputs are unchanged since the last run
+        self.fingerprint = fingerprint
+        # steps (by name) that must have finished before this one starts
+        self.depends_on = tuple(depends_on)
+        # shared resources held while running (e.g. "db", "x_api"); see Pipeline.limits
+        self.resources = tuple(resources)
 
-    def run(self):
+    def run(self, force: bool = False):
+        if self.fingerprint is None:
+            logger.info("▶️  Step: %s", self.name)
+            return self.fn(**self.kwargs)
+        fp = self.fingerprint.compute(self.name)
+        if not force and self.fingerprint.matches(self.name, fp):
+            logger.info("⏭️  Step: %s (inputs unchanged; use --force to recompute)", self.name)
+            return None
         logger.info("▶️  Step: %s", self.name)
-        return self.fn(**self.kwargs)
+        # steps running side by side in the same output tree may list each other's files as
+        # outputs; that can only cause an extra rerun, never a missed one
+        before = self.fingerprint.snapshot()
+        result = self.fn(**self.kwargs)
+        self.fingerprint.record(self.name, fp, before)
+        return result
 
 class Pipeline:
-    def __init__(self, name: str, steps: Iterable[Step]):
+    """
+    Steps run as a DAG: a step starts once all steps it depends on have finished. With
+    workers > 1, independent steps run side by side in threads, at most limits[r] of them
+    holding resource r at a time. A failed step stops the scheduling of further steps; the
+    running ones finish and the first error is raised.
+    """
+    def __init__(self, name: str, steps: Iterable[Step], scope: Callable[[], ContextManager] | None = None,
+                 workers: int = 1, limits: dict | None = None):
         self.name = name
         self.steps = list(steps)
+        # optional context entered around all steps (e.g. the run-scoped dataset cache)
+        self.scope = scope
+        self.workers = max(1, int(workers))
+        self.limits = dict(limits or {})
+        bad = {r: n for r, n in self.limits.items() if int(n) < 1}
+        if bad:
+            raise ValueError(f"Resource limits must be at least 1, got {bad}")
 
-    def run(self):
-        logger.info("🚀 Pipeline: %s (steps=%d)", self.name, len(self.steps))
+    def order(self) -> list:
+        """Steps in a dependency-respecting order (declaration order among ready steps)."""
+        names = [s.name for s in self.steps]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate step names in pipeline {self.name!r}: {names}")
+        known = set(names)
         for s in self.steps:
-            s.run()
-        logger.info("✅ Pipeline finished: %s", self.name)
+            unknown = [d for d in s.depends_on if d not in known]
+            if unknown:
+                raise ValueError(f"Step {s.name!r} depends on unknown step(s) {unknown}")
+        done, out = set(), []
+        while len(out) < len(self.steps):
+            ready = [s for s in self.steps if s.name not in done and set(s.depends_on) <= done]
+            if not ready:
+                cycle = [s.name for s in self.steps if s.name not in done]
+                raise ValueError(f"Dependency cycle among steps {cycle}")
+            out.append(ready[0])
+            done.add(ready[0].name)
+        return out
+
+    def critical_path(self, durations: dict) -> tuple:
+        """(step names, seconds) of the longest dependency chain by the given step durations."""
+        best: dict = {}
+        for s in self.order():
+            prev = max(((best[d][0], best[d][1]) for d in s.depends_on), default=(0.0, ()))
+            best[s.name] = (prev[0] + durations.get(s.name, 0.0), (*prev[1], s.name))
+        if not best:
+            return (), 0.0
+        total, path = max(best.values())
+        return path, total
+
+    def run(self, force: bool = False):
+        order = self.order()
+        logger.info("🚀 Pipeline: %s (steps=%d, workers=%d)", self.name, len(self.steps), self.workers)
+        started = time.perf_counter()
+        with (self.scope() if self.scope else nullcontext()):
+            if self.workers == 1:
+                durations = {}
+                for s in order:
+                    t0 = time.perf_counter()
+                    s.run(force=force)
+                    durations[s.name] = time.perf_counter() - t0
+            else:
+                durations = self._run_parallel(order, force)
+        path, length = self.critical_path(durations)
+        logger.info("✅ Pipeline finished: %s (%.1fs; critical path %.1fs: %s)",
+                    self.name, time.perf_counter() - started, length, " -> ".join(path))
+
+    def _fits(self, step: Step, held: dict) -> bool:
+        return all(held.get(r, 0) < self.limits[r] for r in step.resources if r in self.limits)
+
+    def _run_parallel(self, order: list, force: bool) -> dict:
+        def timed(s: Step) -> float:
+            t0 = time.perf_counter()
+            s.run(force=force)
+            return time.perf_counter() - t0
+
+        pending, done, held, running, durations = list(order), set(), {}, {}, {}
+        error = None
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"pipeline-{self.name}") as pool:
+            while running or (pending and error is None):
+                # resources are taken here, on the scheduling thread, so a step never waits while holding any
+                for s in list(pending) if error is None else []:
+                    if len(running) >= self.workers:
+                        break
+                    if set(s.depends_on) <= done and self._fits(s, held):
+                        for r in s.resources:
+                            held[r] = held.get(r, 0) + 1
+                        pending.remove(s)
+                        running[pool.submit(timed, s)] = s
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    s = running.pop(fut)
+                    for r in s.resources:
+                        held[r] -= 1
+                    try:
+                        durations[s.name] = fut.result()
+                        done.add(s.name)
+                    except BaseException as exc:
+                        logger.error("❌ Step failed: %s (%s)", s.name, exc)
+                        error = error or exc
+        if error is not None:
+            if pending:
+                logger.warning("Skipped after failure: %s", ", ".join(s.name for s in pending))
+            raise error
+        return durations
@@ -6,10 +6,12 @@ from typing import Dict, List, Optional
 import tweepy
 from sqlalchemy import text
 
-from ..config.params import Params
+from ..config.context import RunContext, resolve_context
 from ..io.db import engine
 from ..io.x_api import client
-from ..utils.global_helpers import sanitize_rows, politicians_table_name, INSERT_TWEETS_STMT
+from ..utils.global_helpers import sanitize_rows, INSERT_TWEETS_STMT
+from .tweets_daily_rollup import refresh_for_records
+from .tweet_metrics_history import record_changes
 
 # ---------- logging ----------
 os.makedirs("logs", exist_ok=True)
@@ -21,16 +23,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def _start_time():
-    val = getattr(Params, "tweets_since", None)
+def _start_time(ctx: RunContext):
+    val = ctx.tweets_since
     if not val:
         return None
     # assume isoformat with Z/offset provided upstream; tweepy wants aware dt
     return datetime.fromisoformat(val.replace("Z","+00:00"))
 
 # ---------- db ----------
-def get_all_profiles() -> list[dict]:
-    tbl = politicians_table_name(Params.month, Params.year)
+def get_all_profiles(ctx: RunContext | None = None) -> list[dict]:
+    tbl = resolve_context(ctx).politicians
     logger.info("Filtering x_profiles using table: %s", tbl)
 
     sql = text(f"""
@@ -59,8 +61,7 @@ def get_latest_tweet_id(author_id: int) -> Optional[str]:
         row = conn.execute(sql, {"aid": author_id}).fetchone()
         return str(row[0]) if row else None
 
-def author_already_fetched_on(author_id: int) -> bool:
-    day_start = Params.skip_fetch_date
+def author_already_fetched_on(author_id: int, day_start: datetime | None) -> bool:
     if not day_start:
         return False
     day_end = day_start + timedelta(days=1)
@@ -76,18 +77,18 @@ def author_already_fetched_on(author_id: int) -> bool:
         return row is not None
 
 # ---------- rate-limit ----------
-def sleep_from_headers(response) -> None:
+def sleep_from_headers(response, fallback_sleep: int = 901) -> None:
     try:
         hdrs = response.headers if response is not None else {}
         reset = hdrs.get("x-rate-limit-reset")
         now = int(time.time())
         reset_ts = int(reset) if reset and reset.isdigit() else None
-        sleep_for = (reset_ts - now + 2) if reset_ts and reset_ts > now else Params.rate_limit_fallback_sleep
+        sleep_for = (reset_ts - now + 2) if reset_ts and reset_ts > now else fallback_sleep
         logger.warning("Rate limit hit; sleeping %ds", sleep_for)
         time.sleep(max(1, sleep_for))
     except Exception:
         logger.exception("Rate-limit header parse failed; sleeping default")
-        time.sleep(Params.rate_limit_fallback_sleep)
+        time.sleep(fallback_sleep)
 
 # ---------- tweepy wrappers ----------
 def _refs_to_dict_list(refs):
@@ -126,14 +127,14 @@ def normalize_tweet(t, author_id: int, username: Optional[str]) -> Dict:
         "retrieved_at": datetime.now(timezone.utc),
     }
 
-def fetch_last_100(author_id: int, start_time=None):
+def fetch_last_100(author_id: int, tweet_fields, start_time=None):
     kwargs = {"start_time": start_time} if start_time else {}
-    return client.get_users_tweets(id=author_id, max_results=100, tweet_fields=Params.tweet_fields, **kwargs)
+    return client.get_users_tweets(id=author_id, max_results=100, tweet_fields=list(tweet_fields), **kwargs)
 
-def fetch_since_pages(author_id: int, since_id: str):
+def fetch_since_pages(author_id: int, since_id: str, tweet_fields):
     return tweepy.Paginator(
         client.get_users_tweets,
-        id=author_id, since_id=since_id, max_results=100, tweet_fields=Params.tweet_fields
+        id=author_id, since_id=since_id, max_results=100, tweet_fields=list(tweet_fields)
     )
 
 # ---------- insert ----------
@@ -142,34 +143,39 @@ def upsert_tweets(rows: List[Dict]) -> int:
         return 0
     records = sanitize_rows(rows)
     with engine.begin() as conn:
+        # append the counter changes before the upsert overwrites the stored values
+        record_changes(conn, records)
         conn.execute(INSERT_TWEETS_STMT, records)
+        # keep the daily per-author rollup in step with the upserted tweets (same transaction)
+        refresh_for_records(conn, records)
     return len(records)
 
 # ---------- main ----------
-def main():
-    profiles = get_all_profiles()
+def main(ctx: RunContext | None = None):
+    ctx = resolve_context(ctx)
+    profiles = get_all_profiles(ctx)
     total_available = len(profiles)
 
     # optional samplings
-    n = int(Params.tweets_sample_limit)
+    n = int(ctx.tweets_sample_limit)
     if n >= 0:
-        if Params.sample_seed is not None:
-            random.seed(int(Params.sample_seed))
+        if ctx.sample_seed is not None:
+            random.seed(int(ctx.sample_seed))
         profiles = random.sample(profiles, min(n, total_available))
 
     # start time cutoff from params
-    start_time = _start_time()
+    start_time = _start_time(ctx)
 
     logger.info(
         "Starting tweets fetch: selected %d profiles (out of %d). sample_limit=%s seed=%s",
-        len(profiles), total_available, Params.tweets_sample_limit, Params.sample_seed
+        len(profiles), total_available, ctx.tweets_sample_limit, ctx.sample_seed
     )
 
     total_upserts = 0
     for i, p in enumerate(profiles, start=1):
         aid = p["author_id"]; uname = p["username"]
-        if Params.skip_fetch_date and author_already_fetched_on(aid):
-            logger.info("Skipping %s (%s): already fetched on %s.", uname, aid, Params.skip_fetch_date.date())
+        if ctx.skip_fetch_date and author_already_fetched_on(aid, ctx.skip_fetch_date):
+            logger.info("Skipping %s (%s): already fetched on %s.", uname, aid, ctx.skip_fetch_date.date())
             continue
 
         logger.info("Profile %d/%d: %s (%s)", i, len(profiles), uname, aid)
@@ -181,10 +187,10 @@ def main():
                 # initial
                 while True:
                     try:
-                        resp = fetch_last_100(aid, start_time=start_time)
+                        resp = fetch_last_100(aid, ctx.tweet_fields, start_time=start_time)
                         break
                     except tweepy.TooManyRequests as e:
-                        sleep_from_headers(getattr(e, "response", None))
+                        sleep_from_headers(getattr(e, "response", None), ctx.rate_limit_fallback_sleep)
                 tweets = resp.data or []
                 rows = [normalize_tweet(t, aid, uname) for t in tweets]
                 inserted = upsert_tweets(rows)
@@ -193,7 +199,7 @@ def main():
             else:
                 # incremental
                 new_rows: List[Dict] = []
-                for page in fetch_since_pages(aid, since_id=last_id):
+                for page in fetch_since_pages(aid, since_id=last_id, tweet_fields=ctx.tweet_fields):
                     n = len(page.data) if page.data else 0
                     logger.info("Author %s (%s): page with %d tweets", uname, aid, n)
                     if page.data:
@@ -203,7 +209,7 @@ def main():
                 total_upserts += inserted
 
         except tweepy.TooManyRequests as e:
-            sleep_from_headers(getattr(e, "response", None))
+            sleep_from_headers(getattr(e, "response", None), ctx.rate_limit_fallback_sleep)
             # retry this author
             continue
         except Exception:
@@ -7,6 +7,7 @@ import tweepy
 from sqlalchemy import text
 
 from ..config.params import Params          # non-secrets: log file, sample_limit, etc.
+from ..config.context import RunContext, resolve_context
 from ..io.db import engine                     # shared engine
 from ..io.x_api import client 
 # ---------- Logging (from parameters.yml) ----------
@@ -33,10 +34,11 @@ def _politicians_table_name(month: int, year: int) -> str:
     return tbl
 
 
-def read_usernames(limit: int | None):
-    tbl = _politicians_table_name(Params.month, Params.year)  # e.g., "politicians_08_2025"
+def read_usernames(limit: int | None, ctx: RunContext | None = None):
+    ctx = resolve_context(ctx)
+    tbl = _politicians_table_name(ctx.month, ctx.year)  # e.g., "politicians_08_2025"
     logger.info("Using politicians source table: %s (month=%s, year=%s)",
-                tbl, Params.month, Params.year)
+                tbl, ctx.month, ctx.year)
     
     if limit is None or limit < 0:
         q = text(f"""
@@ -123,11 +125,12 @@ def upsert_x_profiles(df: pd.DataFrame) -> int:
         conn.execute(sql, rows)
     return len(rows)
 
-def main():
-    names = read_usernames(None if Params.sample_limit == -1 else Params.sample_limit)
+def main(ctx: RunContext | None = None):
+    ctx = resolve_context(ctx)
+    names = read_usernames(None if ctx.sample_limit == -1 else ctx.sample_limit, ctx)
 
     rows: List[Dict] = []
-    for group in chunk(names, min(Params.chunk_size, 100)):
+    for group in chunk(names, min(ctx.chunk_size, 100)):
         rows.extend(fetch_batch(group))
         logger.info("Fetched group=%d rows_total=%d", len(group), len(rows))
 
@@ -138,7 +141,7 @@ def main():
     ])
 
     # (A) Optional CSV on VPS
-    if Params.store_csv:
+    if ctx.store_csv:
         os.makedirs("outputs", exist_ok=True)
         ts = datetime.now().strftime("%Y%m%d-%H%M%S")
         out_csv = f"outputs/x_profiles_{ts}.csv"
@@ -148,7 +151,7 @@ def main():
         logger.info("CSV saving disabled (store_csv=false). Rows=%d", len(df))
 
     # (B) Optional upsert to Neon
-    if Params.load_to_db:
+    if ctx.load_to_db:
         n = upsert_x_profiles(df)
         logger.info("Upserted %d rows into x_profiles", n)
     else:
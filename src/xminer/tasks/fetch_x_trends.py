@@ -9,6 +9,7 @@ from sqlalchemy import text
 from ..config.params import Params                 # keep consistency with other tasks
 from ..io.db import engine                         # shared SQLAlchemy engine (Neon)
 from ..config.config import Config                 # env: DATABASE_URL, X_BEARER_TOKEN
+from ..config.context import RunContext, resolve_context
 
 # ---------- logging ----------
 os.makedirs("logs", exist_ok=True)
@@ -27,7 +28,7 @@ logger = logging.getLogger(__name__)
 # https://docs.x.com/x-api/trends/trends-by-woeid/introduction
 TRENDS_URL_TMPL = "https://api.x.com/2/trends/by/woeid/{woeid}"
 
-# Read from parameters.yml via Params (instead of env vars)
+# Defaults from parameters.yml via Params; a run uses RunContext.trends_woeid / trends_place_name
 GERMANY_WOEID = int(getattr(Params, "trends_woeid", 23424829))
 PLACE_NAME    = getattr(Params, "trends_place_name", "Germany")
 
@@ -98,7 +99,9 @@ def upsert_trends(woeid: int, place_name: str, items: List[Dict[str, Any]]) -> i
     return len(rows)
 
 # ---------- main ----------
-def main():
+def main(ctx: RunContext | None = None):
+    ctx = resolve_context(ctx)
+    woeid, place_name = int(ctx.trends_woeid), ctx.trends_place_name
     # Validate token once (same pattern as other tasks using Config)
     token = Config.X_BEARER_TOKEN
     if not token:
@@ -106,10 +109,10 @@ def main():
 
     ensure_table()
 
-    logger.info("Fetching Trends v2 for WOEID=%s (%s)", GERMANY_WOEID, PLACE_NAME)
+    logger.info("Fetching Trends v2 for WOEID=%s (%s)", woeid, place_name)
     try:
-        items = fetch_trends_v2(GERMANY_WOEID, token)
-        n = upsert_trends(GERMANY_WOEID, PLACE_NAME, items)
+        items = fetch_trends_v2(woeid, token)
+        n = upsert_trends(woeid, place_name, items)
         logger.info("Upserted %d trend rows into public.x_trends", n)
     except Exception:
         logger.exception("Trend fetch failed")
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import os
+import logging
+from datetime import date
+
+import pandas as pd
+
+# --- Project-style imports (match the metrics tasks) ---
+from ..io import loaders as _loaders
+from ..config.context import RunContext, resolve_context
+from ..utils.global_helpers import build_outdir, month_bounds
+from ..utils.metrics_helpers import TWEET_SUMMARY_COLUMNS, enrich_with_profiles
+from ..utils.metrics_cube import (
+    DEFAULT_CUBE_SETS,
+    PROFILE_CUBE_AGGS,
+    TWEET_CUBE_AGGS,
+    age_band,
+    cube_aggregate,
+    cube_dimensions,
+    finalize_cube,
+    parse_grouping_sets,
+)
+from ..utils.metrics_sql import sql_profile_cube, sql_tweet_cube
+
+# ---------- logging ----------
+os.makedirs("logs", exist_ok=True)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler("logs/metrics_cube.log", mode="w"),
+        logging.StreamHandler(),
+    ],
+)
+logger = logging.getLogger(__name__)
+
+ROSTER_ATTRIBUTES = ("geschlecht", "wp_wkr_land", "wp_mandatsart", "wp_liste")
+
+
+# -------------------------------
+# Inputs (pandas engine)
+# -------------------------------
+def with_roster_attributes(df: pd.DataFrame, roster: pd.DataFrame, ref: date) -> pd.DataFrame:
+    """Attach the roster attributes of each row's politician (by lower-cased username) and the age band at `ref`."""
+    keys = df["username"].astype(str).str.strip().str.lower()
+    attrs = roster.set_index("user_key")
+    pos = attrs.index.get_indexer(keys)
+    out = df.drop(columns=[c for c in (*ROSTER_ATTRIBUTES, "geburtsdatum") if c in df.columns])
+    out.index = pd.RangeIndex(len(out))
+    for c in ROSTER_ATTRIBUTES:
+        out[c] = pd.api.extensions.take(attrs[c].to_numpy(dtype=object), pos, allow_fill=True)
+    birth = pd.Series(pd.api.extensions.take(attrs["geburtsdatum"].to_numpy(dtype=object), pos, allow_fill=True))
+    out["age_band"] = age_band(birth, ref)
+    return out
+
+
+def pandas_cubes(schema: str, tweets_tbl: str, x_profiles_tbl: str, year: int, month: int, sets: list,
+                 loader_backend: str = "pandas") -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(tweet cube, profile cube) from the month's tweets and latest profiles, aggregated locally."""
+    ref = date(year, month, 1)
+    profiles = _loaders.load_latest_profiles(schema, x_profiles_tbl, month, year, backend=loader_backend)
+    tweets = _loaders.load_tweets_month(schema, tweets_tbl, month, year, columns=TWEET_SUMMARY_COLUMNS,
+                                        backend=loader_backend)
+    roster = _loaders.load_roster_attributes(schema, month, year, backend=loader_backend)
+    dataset = with_roster_attributes(enrich_with_profiles(tweets, profiles), roster, ref)
+    profiles = with_roster_attributes(profiles, roster, ref)
+    return cube_aggregate(dataset, sets, TWEET_CUBE_AGGS), cube_aggregate(profiles, sets, PROFILE_CUBE_AGGS)
+
+
+# -------------------------------
+# Orchestration
+# -------------------------------
+def run(year: int, month: int, outdir: str, schema: str, tweets_tbl: str, x_profiles_tbl: str,
+        cube_sets=(), metrics_engine: str = "pandas", loader_backend: str = "pandas"):
+    """
+    Engagement and follower aggregates of the month for every grouping set of politician
+    attributes (e.g. partei_kurz, geschlecht+partei_kurz, all) in one tidy table,
+    tweets/politician_cube_YYYYMM.csv. metrics_engine "sql" computes all sets in one
+    GROUPING SETS query per source; otherwise the rows are loaded and aggregated locally.
+    """
+    sets = parse_grouping_sets(cube_sets or DEFAULT_CUBE_SETS)
+    dims = cube_dimensions(sets)
+    ym = f"{year:04d}{month:02d}"
+    start_ts, end_ts = month_bounds(year, month)
+    logger.info("Cube %s over %d grouping sets (%s), engine=%s", ym, len(sets), ", ".join(dims) or "-", metrics_engine)
+
+    if metrics_engine == "sql":
+        tweets = sql_tweet_cube(schema, tweets_tbl, x_profiles_tbl, year, month, sets)
+        profiles = sql_profile_cube(schema, x_profiles_tbl, year, month, sets)
+    else:
+        tweets, profiles = pandas_cubes(schema, tweets_tbl, x_profiles_tbl, year, month, sets, loader_backend)
+    if not tweets["tweets"].sum():
+        logger.warning("No tweets found for %s (%s .. %s); tweet aggregates are empty.", ym, start_ts, end_ts)
+
+    cube = finalize_cube(tweets, profiles, dims)
+    out_path = os.path.join(build_outdir(outdir, year, month, "tweets"), f"politician_cube_{ym}.csv")
+    cube.to_csv(out_path, index=False)
+    logger.info("Wrote politician cube -> %s (rows=%d)", out_path, len(cube))
+
+
+# -------------------------------
+# Entrypoint (RunContext; parameters.yml by default)
+# -------------------------------
+def main(ctx: RunContext | None = None):
+    """Run for one RunContext (default: parameters.yml via Params)."""
+    ctx = resolve_context(ctx)
+    run(ctx.year, ctx.month, ctx.outdir, ctx.schema, tweets_tbl="tweets", x_profiles_tbl="x_profiles",
+        cube_sets=tuple(ctx.cube_sets), metrics_engine=ctx.metrics_engine, loader_backend=ctx.loader_backend)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import os
+import argparse
+import logging
+
+import pandas as pd
+
+# --- Project-style imports (match the metrics tasks) ---
+from ..config.context import RunContext, resolve_context
+from ..utils.global_helpers import build_outdir, prev_year_month
+from ..utils.metrics_panel import MetricPanel
+from .x_profiles_monthly_snapshot import iter_year_months
+
+# ---------- logging ----------
+os.makedirs("logs", exist_ok=True)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler("logs/metrics_panel.log", mode="w"),
+        logging.StreamHandler(),
+    ],
+)
+logger = logging.getLogger(__name__)
+
+# monthly outputs stacked into panels:
+# name -> (channel, file prefix of output/YYYYMM/<channel>/<prefix>_YYYYMM.csv, entity key, label columns, metrics)
+# metrics None: every numeric column
+PANEL_SOURCES = {
+    "tweets_individual": ("tweets", "tweets_individual_month", "username", ("partei_kurz",), None),
+    "tweets_party": ("tweets", "tweets_party_month", "partei_kurz", (), None),
+    "profiles_individual": ("profiles", "individual_base", "username", ("name", "partei_kurz"),
+                            ("followers_count", "following_count", "tweet_count", "listed_count")),
+    "profiles_party": ("profiles", "party_summary", "partei_kurz", (),
+                       ("members", "followers_sum", "followers_mean", "followers_median", "followers_per_member")),
+}
+# changes against 1, 3, 6 and 12 months earlier, a trailing 3-month mean and the 12-month CAGR
+PANEL_LAGS = (1, 3, 6, 12)
+PANEL_ROLLING_MONTHS = 3
+PANEL_GROWTH_MONTHS = 12
+
+
+# -------------------------------
+# Panels
+# -------------------------------
+def load_monthly_tables(outdir: str, months: list, channel: str, prefix: str) -> dict:
+    """{(year, month): stored monthly table}; months without the file are left out (NaN in the panel)."""
+    frames = {}
+    for y, m in months:
+        ym = f"{y:04d}{m:02d}"
+        path = os.path.join(outdir, ym, channel, f"{prefix}_{ym}.csv")
+        if not os.path.exists(path):
+            logger.warning("Missing %s; %04d-%02d stays empty in the panel.", path, y, m)
+            continue
+        frames[(y, m)] = pd.read_csv(path, keep_default_na=False, na_values=[""], float_precision="round_trip")
+    return frames
+
+
+def trend_panel(panel: MetricPanel, lags=PANEL_LAGS, rolling: int = PANEL_ROLLING_MONTHS,
+                growth: int = PANEL_GROWTH_MONTHS) -> MetricPanel:
+    """Metric values plus their deltas / pct changes per lag, trailing mean and annualized growth."""
+    parts = [panel]
+    parts += [panel.delta(k) for k in lags]
+    parts += [panel.pct_change(k) for k in lags]
+    parts += [panel.rolling(rolling, "mean", min_periods=1), panel.growth_rate(growth)]
+    return MetricPanel.concat(parts)
+
+
+# -------------------------------
+# Orchestration
+# -------------------------------
+def run(start: tuple, end: tuple, outdir: str):
+    """
+    Stack the stored monthly tables of [start, end] (inclusive (year, month) pairs) per source and
+    write, under output/<end>/panel, the tidy panel over all months and the end month's trends
+    (wide: one row per entity with the lagged changes, rolling mean and CAGR).
+    """
+    months = iter_year_months(start, end)
+    label = f"{start[0]:04d}{start[1]:02d}_{end[0]:04d}{end[1]:02d}"
+    ym_end = f"{end[0]:04d}{end[1]:02d}"
+    outdir_panel = build_outdir(outdir, end[0], end[1], "panel")
+    for name, (channel, prefix, key, labels, metrics) in PANEL_SOURCES.items():
+        frames = load_monthly_tables(outdir, months, channel, prefix)
+        if not frames:
+            logger.warning("No stored %s tables in %s; skipping %s.", prefix, label, name)
+            continue
+        panel = MetricPanel.stack({ym: frames.get(ym, pd.DataFrame()) for ym in months}, key, metrics, labels)
+        logger.info("Panel %s: %d entities x %d months x %d metrics", name, *panel.values.shape)
+
+        out_long = os.path.join(outdir_panel, f"{name}_panel_{label}.csv")
+        out_wide = os.path.join(outdir_panel, f"{name}_trends_{ym_end}.csv")
+        panel.long().to_csv(out_long, index=False)
+        trend_panel(panel).wide().to_csv(out_wide, index=False)
+        logger.info("Wrote %s panel -> %s", name, out_long)
+        logger.info("Wrote %s trends -> %s", name, out_wide)
+
+
+# -------------------------------
+# Entrypoint
+# -------------------------------
+def _year_month(s: str) -> tuple:
+    year, month = (int(x) for x in s.split("-"))
+    return year, month
+
+
+def main(argv=None, ctx: RunContext | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Multi-month panels and trends from the stored monthly metrics.")
+    parser.add_argument("--from", dest="start", type=_year_month,
+                        help="First month (YYYY-MM); default: 12 months before --to.")
+    parser.add_argument("--to", dest="end", type=_year_month, help="Last month, inclusive (YYYY-MM); default: the context month.")
+    args = parser.parse_args(argv)
+
+    ctx = resolve_context(ctx)
+    end = args.end or (ctx.year, ctx.month)
+    start = args.start
+    if start is None:
+        start = end
+        for _ in range(max(PANEL_LAGS)):
+            start = prev_year_month(*start)
+    if start > end:
+        raise SystemExit(f"--from {start} is after --to {end}")
+    run(start, end, ctx.outdir)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+from typing import Dict, Iterable, List
+
+from sqlalchemy import text
+
+# --- Project-style imports (match the metrics tasks) ---
+from ..io.db import engine                   # central engine built from Config.DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+HISTORY_TABLE = "tweet_metrics_history"
+# counters whose changes are kept (tweets column -> history column)
+HISTORY_COUNTERS = {
+    "like_count": "like_delta",
+    "reply_count": "reply_delta",
+    "retweet_count": "retweet_delta",
+    "quote_count": "quote_delta",
+    "bookmark_count": "bookmark_delta",
+    "impression_count": "impression_delta",
+}
+
+# -------------------------------
+# DDL / SQL
+# -------------------------------
+# Append-only: one row per fetch that changed any counter of a tweet, holding only the changes
+# (NULL = unchanged) against the value stored before that fetch. A tweet's first row is its
+# value at the first fetch after the table existed, minus the value already stored (0 for new
+# tweets). Levels are recovered from the current tweets row minus the later deltas.
+CREATE_HISTORY_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {schema}.{history} (
+    tweet_id          TEXT         NOT NULL,
+    retrieved_at      TIMESTAMPTZ  NOT NULL,
+    like_delta        INTEGER,
+    reply_delta       INTEGER,
+    retweet_delta     INTEGER,
+    quote_delta       INTEGER,
+    bookmark_delta    INTEGER,
+    impression_delta  INTEGER,
+    PRIMARY KEY (tweet_id, retrieved_at)
+);
+CREATE INDEX IF NOT EXISTS ix_{history}_retrieved_at ON {schema}.{history} (retrieved_at);
+"""
+
+# fetched counters (unnested batch) against the stored ones; runs before the upsert overwrites them
+INSERT_CHANGES_SQL_TMPL = r"""
+INSERT INTO {schema}.{history} (tweet_id, retrieved_at, {delta_cols})
+SELECT tweet_id, retrieved_at, {delta_cols}
+FROM (
+  SELECT
+    n.tweet_id,
+    n.retrieved_at,
+    {deltas}
+  FROM unnest(CAST(:tweet_ids AS TEXT[]), CAST(:retrieved_at AS TIMESTAMPTZ[]), {arrays})
+       AS n(tweet_id, retrieved_at, {counters})
+  LEFT JOIN {schema}.{tweets} t ON t.tweet_id = n.tweet_id
+  WHERE n.tweet_id IS NOT NULL AND n.retrieved_at IS NOT NULL
+) d
+WHERE COALESCE({delta_cols}) IS NOT NULL
+ON CONFLICT (tweet_id, retrieved_at) DO NOTHING
+"""
+
+_ready: set = set()
+
+
+def ensure_table(schema: str = "public"):
+    # own transaction: the table is only marked ready once its DDL has committed
+    if schema in _ready:
+        return
+    with engine.begin() as conn:
+        conn.execute(text(CREATE_HISTORY_TABLE_SQL.format(schema=schema, history=HISTORY_TABLE)))
+    _ready.add(schema)
+
+
+def insert_changes_sql(schema: str = "public", tweets: str = "tweets") -> str:
+    counters, delta_cols = list(HISTORY_COUNTERS), list(HISTORY_COUNTERS.values())
+    # deltas fit INTEGER; changes of 0 are stored as NULL
+    deltas = ",\n    ".join(f"NULLIF(n.{c} - COALESCE(t.{c}, 0), 0)::integer AS {d}" for c, d in HISTORY_COUNTERS.items())
+    return INSERT_CHANGES_SQL_TMPL.format(
+        schema=schema, history=HISTORY_TABLE, tweets=tweets, deltas=deltas,
+        delta_cols=", ".join(delta_cols), counters=", ".join(counters),
+        arrays=", ".join(f"CAST(:{c} AS BIGINT[])" for c in counters),
+    )
+
+
+def record_changes(conn, records: Iterable[Dict], schema: str = "public", tweets: str = "tweets") -> int:
+    """
+    Append the counter changes of sanitized tweet records (see fetch_tweets.upsert_tweets) in one
+    statement. Runs on the caller's connection before the upsert, so both commit together.
+    """
+    records: List[Dict] = list(records)
+    if not records:
+        return 0
+    ensure_table(schema)
+    params = {"tweet_ids": [r.get("tweet_id") for r in records], "retrieved_at": [r.get("retrieved_at") for r in records]}
+    params.update({c: [r.get(c) for r in records] for c in HISTORY_COUNTERS})
+    res = conn.execute(text(insert_changes_sql(schema, tweets)), params)
+    return res.rowcount if res.rowcount is not None else 0
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import os
+import argparse
+import logging
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import text
+
+# --- Project-style imports (match the metrics tasks) ---
+from ..io.db import engine                   # central engine built from Config.DATABASE_URL
+
+# ---------- logging ----------
+os.makedirs("logs", exist_ok=True)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler("logs/tweets_daily_rollup.log", mode="w"),
+        logging.StreamHandler(),
+    ],
+)
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = "tweets_daily_author"
+
+# -------------------------------
+# DDL / SQL
+# -------------------------------
+# One row per (author, username, UTC day). For every per-tweet quantity the metrics average
+# we keep its sum and its non-NULL count, so window means equal the per-tweet pandas means.
+CREATE_ROLLUP_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {schema}.{rollup} (
+    author_id              BIGINT,
+    username               TEXT,
+    day                    DATE         NOT NULL,   -- UTC
+    n_tweets               INTEGER      NOT NULL,
+    like_count_sum         BIGINT,
+    like_count_n           INTEGER      NOT NULL,
+    reply_count_sum        BIGINT,
+    reply_count_n          INTEGER      NOT NULL,
+    retweet_count_sum      BIGINT,
+    retweet_count_n        INTEGER      NOT NULL,
+    quote_count_sum        BIGINT,
+    quote_count_n          INTEGER      NOT NULL,
+    bookmark_count_sum     BIGINT,
+    bookmark_count_n       INTEGER      NOT NULL,
+    impression_count_sum   BIGINT,
+    impression_count_n     INTEGER      NOT NULL,
+    engagement_total_sum   BIGINT,
+    engagement_total_n     INTEGER      NOT NULL,
+    engagement_rate_sum    DOUBLE PRECISION,
+    engagement_rate_n      INTEGER      NOT NULL,
+    like_to_reply_sum      DOUBLE PRECISION,
+    like_to_reply_n        INTEGER      NOT NULL,
+    retweet_to_like_sum    DOUBLE PRECISION,
+    retweet_to_like_n      INTEGER      NOT NULL,
+    updated_at             TIMESTAMPTZ  NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_{rollup}_day ON {schema}.{rollup} (day);
+CREATE INDEX IF NOT EXISTS ix_{rollup}_author_day ON {schema}.{rollup} (author_id, day);
+"""
+
+# lets refresh_days() read a touched author-day from tweets by index instead of a scan
+CREATE_TWEETS_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS ix_{tweets}_author_created ON {schema}.{tweets} (author_id, created_at);
+"""
+
+# per-tweet quantities as in enrich_with_profiles(); {where} selects the tweets to aggregate
+AGGREGATE_DAYS_SQL_TMPL = r"""
+INSERT INTO {schema}.{rollup} (
+    author_id, username, day, n_tweets,
+    like_count_sum, like_count_n, reply_count_sum, reply_count_n,
+    retweet_count_sum, retweet_count_n, quote_count_sum, quote_count_n,
+    bookmark_count_sum, bookmark_count_n, impression_count_sum, impression_count_n,
+    engagement_total_sum, engagement_total_n, engagement_rate_sum, engagement_rate_n,
+    like_to_reply_sum, like_to_reply_n, retweet_to_like_sum, retweet_to_like_n
+)
+SELECT
+    x.author_id, x.username, x.day, COUNT(x.tweet_id),
+    SUM(x.like_count), COUNT(x.like_count), SUM(x.reply_count), COUNT(x.reply_count),
+    SUM(x.retweet_count), COUNT(x.retweet_count), SUM(x.quote_count), COUNT(x.quote_count),
+    SUM(x.bookmark_count), COUNT(x.bookmark_count), SUM(x.impression_count), COUNT(x.impression_count),
+    SUM(x.engagement_total), COUNT(x.engagement_total),
+    SUM(x.engagement_total::float8 / NULLIF(x.impression_count::float8, 0)),
+    COUNT(x.engagement_total::float8 / NULLIF(x.impression_count::float8, 0)),
+    SUM(x.like_count::float8 / NULLIF(x.reply_count::float8, 0)),
+    COUNT(x.like_count::float8 / NULLIF(x.reply_count::float8, 0)),
+    SUM(x.retweet_count::float8 / NULLIF(x.like_count::float8, 0)),
+    COUNT(x.retweet_count::float8 / NULLIF(x.like_count::float8, 0))
+FROM (
+  SELECT
+    t.*,
+    (t.created_at AT TIME ZONE 'UTC')::date AS day,
+    CASE WHEN COALESCE(t.like_count, t.reply_count, t.retweet_count, t.quote_count, t.bookmark_count) IS NULL THEN NULL
+         ELSE COALESCE(t.like_count, 0) + COALESCE(t.reply_count, 0) + COALESCE(t.retweet_count, 0)
+              + COALESCE(t.quote_count, 0) + COALESCE(t.bookmark_count, 0)
+    END AS engagement_total
+  FROM {schema}.{tweets} t
+  {where}
+) x
+GROUP BY x.author_id, x.username, x.day
+"""
+
+# (author_id, day) pairs touched by an upsert; fetched tweets always carry their author_id
+TOUCHED_CTE = """
+WITH touched AS (
+  SELECT DISTINCT u.author_id, u.day
+  FROM unnest(CAST(:author_ids AS BIGINT[]), CAST(:days AS DATE[])) AS u(author_id, day)
+)
+"""
+
+DELETE_TOUCHED_SQL_TMPL = TOUCHED_CTE + """
+DELETE FROM {schema}.{rollup} r
+USING touched
+WHERE r.author_id = touched.author_id
+  AND r.day = touched.day
+"""
+
+TOUCHED_WHERE = """WHERE EXISTS (
+    SELECT 1 FROM touched
+    WHERE t.author_id = touched.author_id
+      AND t.created_at >= (touched.day::timestamp AT TIME ZONE 'UTC')
+      AND t.created_at <  ((touched.day + 1)::timestamp AT TIME ZONE 'UTC')
+  )"""
+
+RANGE_WHERE = "WHERE t.created_at >= :start_ts AND t.created_at < :end_ts"
+
+_ready: set = set()
+
+
+def ensure_table(schema: str = "public", tweets: str = "tweets"):
+    # own transaction: the table is only marked ready once its DDL has committed
+    if (schema, tweets) in _ready:
+        return
+    with engine.begin() as conn:
+        conn.execute(text(CREATE_ROLLUP_TABLE_SQL.format(schema=schema, rollup=ROLLUP_TABLE)))
+        conn.execute(text(CREATE_TWEETS_INDEX_SQL.format(schema=schema, tweets=tweets)))
+    _ready.add((schema, tweets))
+
+
+def _day(v) -> date | None:
+    if not isinstance(v, datetime):
+        return None
+    v = v if v.tzinfo else v.replace(tzinfo=timezone.utc)
+    return v.astimezone(timezone.utc).date()
+
+
+def touched_days(records: Iterable[Dict]) -> List[Tuple[int, date]]:
+    """Distinct (author_id, UTC day) pairs of sanitized tweet records."""
+    pairs = {(r.get("author_id"), _day(r.get("created_at"))) for r in records}
+    return sorted((p for p in pairs if p[0] is not None and p[1] is not None), key=lambda p: (p[1], p[0]))
+
+
+def refresh_days(conn, pairs: List[Tuple[int, date]], schema: str = "public", tweets: str = "tweets") -> int:
+    """
+    Recompute the rollup rows of the given (author_id, day) pairs from the tweets table.
+    Runs on the caller's connection so it commits together with the tweet upsert.
+    """
+    if not pairs:
+        return 0
+    ensure_table(schema, tweets)
+    params = {"author_ids": [a for a, _ in pairs], "days": [d for _, d in pairs]}
+    conn.execute(text(DELETE_TOUCHED_SQL_TMPL.format(schema=schema, rollup=ROLLUP_TABLE)), params)
+    sql = TOUCHED_CTE + AGGREGATE_DAYS_SQL_TMPL.format(schema=schema, rollup=ROLLUP_TABLE, tweets=tweets, where=TOUCHED_WHERE)
+    res = conn.execute(text(sql), params)
+    return res.rowcount if res.rowcount is not None else 0
+
+
+def refresh_for_records(conn, records: Iterable[Dict], schema: str = "public", tweets: str = "tweets") -> int:
+    """Maintain the rollup after upserting sanitized tweet records (see fetch_tweets.upsert_tweets)."""
+    return refresh_days(conn, touched_days(records), schema, tweets)
+
+
+def backfill(schema: str, tweets: str, start: date | None = None, end: date | None = None) -> int:
+    """Rebuild the rollup for days in [start, end) (None = open-ended) from the tweets table."""
+    ensure_table(schema, tweets)
+    start_ts = datetime.combine(start or date(1970, 1, 1), datetime.min.time(), tzinfo=timezone.utc)
+    end_ts = datetime.combine(end or date(9999, 1, 1), datetime.min.time(), tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"DELETE FROM {schema}.{ROLLUP_TABLE} WHERE day >= :start_day AND day < :end_day"),
+            {"start_day": start_ts.date(), "end_day": end_ts.date()},
+        )
+        sql = AGGREGATE_DAYS_SQL_TMPL.format(schema=schema, rollup=ROLLUP_TABLE, tweets=tweets, where=RANGE_WHERE)
+        res = conn.execute(text(sql), {"start_ts": start_ts, "end_ts": end_ts})
+    n = res.rowcount if res.rowcount is not None else 0
+    logger.info("Rebuilt %s.%s for [%s, %s): %d rows", schema, ROLLUP_TABLE, start, end, n)
+    return n
+
+
+def _parse_day(s: str) -> date:
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the daily per-author tweet rollup.")
+    parser.add_argument("--schema", default="public")
+    parser.add_argument("--tweets", default="tweets")
+    parser.add_argument("--from", dest="start", help="First day to rebuild (YYYY-MM-DD); default: all.")
+    parser.add_argument("--to", dest="end", help="Day after the last day to rebuild (YYYY-MM-DD); default: all.")
+    args = parser.parse_args(argv)
+
+    start = _parse_day(args.start) if args.start else None
+    end = _parse_day(args.end) if args.end else None
+    backfill(args.schema, args.tweets, start, end)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
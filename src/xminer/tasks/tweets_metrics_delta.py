@@ -8,11 +8,11 @@ from typing import List, Tuple
 
 import numpy as np
 import pandas as pd
-from sqlalchemy import text
 
 # --- Project-style imports (align with your other tasks) ---
-from ..io.db import engine                               # shared SQLAlchemy engine
-from ..config.params import Params                       # parameters.yml access
+from ..io import loaders as _loaders                     # shared loaders + run-scoped cache
+from ..io.loaders import POSTGRES_LATEST_PROFILES_TMPL, POSTGRES_TWEETS_MONTH_TMPL
+from ..config.context import RunContext, resolve_context
 from ..utils.global_helpers import (
     politicians_table_name,
     normalize_party,
@@ -27,7 +27,14 @@ from ..utils.metrics_helpers import (
     enrich_with_profiles,
     metric_individual_month,
     metric_party_month,
+    rollup_individual_month,
+    rollup_party_month,
+    TWEET_SUMMARY_COLUMNS,
+    METRICS_ENGINES,
 )
+from ..utils.metrics_sql import sql_individual_month, sql_party_month
+from ..pipelines.fingerprint import metrics_sources, month_fingerprint
+from .tweets_daily_rollup import ROLLUP_TABLE
 
 # ---------- logging ----------
 os.makedirs("logs", exist_ok=True)
@@ -41,127 +48,104 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# -------------------------------
-# SQL templates (same as tweets_metrics_monthly)
-# -------------------------------
-POSTGRES_LATEST_PROFILES_TMPL = r"""
-WITH joined AS (
-  SELECT
-    xp.username,
-    xp.x_user_id,
-    xp.name,
-    xp.created_at,
-    xp.verified,
-    xp.protected,
-    xp.followers_count,
-    xp.following_count,
-    xp.tweet_count,
-    xp.listed_count,
-    xp.location,
-    xp.description,
-    xp.retrieved_at,
-    p.partei_kurz,
-    p.geschlecht,
-    p.geburtsdatum,
-    ROW_NUMBER() OVER (PARTITION BY lower(xp.username) ORDER BY xp.retrieved_at DESC) AS rn
-  FROM {schema}.{x_profiles} xp
-  JOIN {schema}.{politicians} p
-    ON lower(xp.username) = lower(p.username)
-)
-SELECT *
-FROM joined
-WHERE rn = 1
-"""
-
-POSTGRES_TWEETS_MONTH_TMPL = r"""
-SELECT
-  t.tweet_id,
-  t.author_id,
-  t.username,
-  t.created_at,
-  t.text,
-  t.lang,
-  t.conversation_id,
-  t.in_reply_to_user_id,
-  t.possibly_sensitive,
-  t.like_count,
-  t.reply_count,
-  t.retweet_count,
-  t.quote_count,
-  t.bookmark_count,
-  t.impression_count,
-  t.source,
-  t.entities,
-  t.referenced_tweets,
-  t.retrieved_at,
-  p.partei_kurz
-FROM {schema}.{tweets} t
-JOIN {schema}.{politicians} p
-  ON lower(t.username) = lower(p.username)
-WHERE t.created_at >= :start_ts
-  AND t.created_at < :end_ts
-"""
+# monthly tables of tweets_metrics_monthly (output/YYYYMM/tweets/<name>_YYYYMM.csv) the deltas can reuse
+MONTHLY_STEP = "tweets_metrics_monthly"
+STORED_MONTH_TABLES = ("tweets_individual_month", "tweets_party_month")
 
 # -------------------------------
-# Data loaders (mirroring tweets_metrics_monthly)
+# Data loaders (shared with tweets_metrics_monthly via io.loaders / dataset cache)
 # -------------------------------
-def load_latest_profiles(schema: str, x_profiles: str, month: int, year: int) -> pd.DataFrame:
-    politicians = politicians_table_name(month, year)
-    sql = POSTGRES_LATEST_PROFILES_TMPL.format(schema=schema, x_profiles=x_profiles, politicians=politicians)
-    with engine.begin() as conn:
-        df = pd.read_sql(text(sql), conn)
-    # dtypes/cleanup
-    if "created_at" in df:
-        df["created_at"] = pd.to_datetime(df["created_at"], utc=True, errors="coerce")
-    if "retrieved_at" in df:
-        df["retrieved_at"] = pd.to_datetime(df["retrieved_at"], utc=True, errors="coerce")
-    if "geburtsdatum" in df:
-        df["geburtsdatum"] = pd.to_datetime(df["geburtsdatum"], utc=True, errors="coerce").dt.date
-    if "username" in df:
-        df["username"] = df["username"].astype(str).str.strip()
-    return normalize_party(df)
-
-
-def load_tweets_month(schema: str, tweets: str, month: int, year: int) -> Tuple[pd.DataFrame, pd.Timestamp, pd.Timestamp]:
+def load_latest_profiles(schema: str, x_profiles: str, month: int, year: int, backend: str = "pandas") -> pd.DataFrame:
+    return _loaders.load_latest_profiles(schema, x_profiles, month, year, backend=backend)
+
+
+def load_tweets_month(schema: str, tweets: str, month: int, year: int,
+                      columns: tuple | None = None, backend: str = "pandas") -> Tuple[pd.DataFrame, pd.Timestamp, pd.Timestamp]:
     start_ts, end_ts = month_bounds(year, month)
-    politicians = politicians_table_name(month, year)
-    sql = POSTGRES_TWEETS_MONTH_TMPL.format(schema=schema, tweets=tweets, politicians=politicians)
-    with engine.begin() as conn:
-        df = pd.read_sql(text(sql), conn, params={"start_ts": start_ts, "end_ts": end_ts})
-    # dtypes / cleanup
-    if "created_at" in df:
-        df["created_at"] = pd.to_datetime(df["created_at"], utc=True, errors="coerce")
-    if "retrieved_at" in df:
-        df["retrieved_at"] = pd.to_datetime(df["retrieved_at"], utc=True, errors="coerce")
-    for c in ["like_count", "reply_count", "retweet_count", "quote_count", "bookmark_count", "impression_count"]:
-        if c in df:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-    if "username" in df:
-        df["username"] = df["username"].astype(str).str.strip()
-    df = normalize_party(df)
+    df = _loaders.load_tweets_month(schema, tweets, month, year, columns=columns, backend=backend)
     return df, start_ts, end_ts
 
 # -------------------------------
 # Delta helpers
 # -------------------------------
-def _build_monthly_author_table(schema: str, tweets_tbl: str, x_profiles_tbl: str, month: int, year: int) -> pd.DataFrame:
-    """Return the per-author monthly table (metric_individual_month) for given year-month."""
-    tweets, _, _ = load_tweets_month(schema, tweets_tbl, month, year)
+def _build_enriched_month(schema: str, tweets_tbl: str, x_profiles_tbl: str, month: int, year: int,
+                          backend: str = "pandas") -> pd.DataFrame:
+    """Load the month's tweets and latest profiles once and return the enriched tweet frame."""
+    # aggregates only read keys + counters; text/JSONB columns stay in Postgres
+    tweets, _, _ = load_tweets_month(schema, tweets_tbl, month, year, columns=TWEET_SUMMARY_COLUMNS, backend=backend)
     if tweets.empty:
         logger.warning("No tweets found for %04d-%02d.", year, month)
-    profiles_latest = load_latest_profiles(schema, x_profiles_tbl, month, year)
-    enriched = enrich_with_profiles(tweets, profiles_latest)  # follower-normalized fields, engagement rate, etc.
+    profiles_latest = load_latest_profiles(schema, x_profiles_tbl, month, year, backend=backend)
+    return enrich_with_profiles(tweets, profiles_latest)  # follower-normalized fields, engagement rate, etc.
+
+
+def _build_monthly_author_table(schema: str, tweets_tbl: str, x_profiles_tbl: str, month: int, year: int,
+                                backend: str = "pandas") -> pd.DataFrame:
+    """Return the per-author monthly table (metric_individual_month) for given year-month."""
+    enriched = _build_enriched_month(schema, tweets_tbl, x_profiles_tbl, month, year, backend)
     return metric_individual_month(enriched)  # includes sums/means & followers_latest
 
 
-def _build_monthly_party_table(schema: str, tweets_tbl: str, x_profiles_tbl: str, month: int, year: int) -> pd.DataFrame:
+def _build_monthly_party_table(schema: str, tweets_tbl: str, x_profiles_tbl: str, month: int, year: int,
+                               backend: str = "pandas") -> pd.DataFrame:
     """Return the party-level monthly aggregates (metric_party_month) for given year-month."""
-    tweets, _, _ = load_tweets_month(schema, tweets_tbl, month, year)
-    profiles_latest = load_latest_profiles(schema, x_profiles_tbl, month, year)
-    enriched = enrich_with_profiles(tweets, profiles_latest)
+    enriched = _build_enriched_month(schema, tweets_tbl, x_profiles_tbl, month, year, backend)
     return metric_party_month(enriched)
 
 
+def _load_rollup_month(schema: str, x_profiles_tbl: str, month: int, year: int, rollup_tbl: str,
+                       backend: str = "pandas") -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Daily rollup rows of the month (same UTC bounds as the tweet loads) and the latest profiles."""
+    start_ts, end_ts = month_bounds(year, month)
+    daily = _loaders.load_daily_rollup(schema, rollup_tbl, month, year, start_ts.date(), end_ts.date(), backend=backend)
+    return daily, load_latest_profiles(schema, x_profiles_tbl, month, year, backend=backend)
+
+
+def _month_tables(year: int, month: int, schema: str, tweets_tbl: str, x_profiles_tbl: str, metrics_engine: str,
+                  rollup_tbl: str, loader_backend: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Per-author and per-party monthly tables of one month, computed by the given engine."""
+    if metrics_engine == "sql":
+        # monthly aggregates computed in Postgres; no tweet rows are loaded
+        src = dict(schema=schema, tweets=tweets_tbl, x_profiles=x_profiles_tbl, year=year, month=month)
+        return sql_individual_month(**src), sql_party_month(**src)
+    if metrics_engine == "rollup":
+        # monthly aggregates from the daily per-author rollup
+        daily, prof = _load_rollup_month(schema, x_profiles_tbl, month, year, rollup_tbl, loader_backend)
+        return rollup_individual_month(daily, prof), rollup_party_month(daily, prof)
+    # the month is loaded and enriched once for both tables
+    enriched = _build_enriched_month(schema, tweets_tbl, x_profiles_tbl, month, year, loader_backend)
+    return metric_individual_month(enriched), metric_party_month(enriched)
+
+
+def load_stored_month(ctx: RunContext) -> Tuple[pd.DataFrame, pd.DataFrame] | None:
+    """
+    The per-author and per-party tables tweets_metrics_monthly wrote for ctx's month, or None
+    when they are missing or stale: the step's fingerprint (that month's tweets, month-bounded
+    profiles and roster, parameters, code version) must still match the stamp recorded with the files.
+    """
+    stamp = month_fingerprint(ctx, metrics_sources(ctx)[MONTHLY_STEP])
+    if not stamp.fresh(MONTHLY_STEP):
+        logger.info("No fresh %s outputs for %04d-%02d; recomputing.", MONTHLY_STEP, ctx.year, ctx.month)
+        return None
+    ym = f"{ctx.year:04d}{ctx.month:02d}"
+    paths = [os.path.join(ctx.outdir, ym, "tweets", f"{name}_{ym}.csv") for name in STORED_MONTH_TABLES]
+    if not all(os.path.exists(p) for p in paths):
+        return None
+    # round_trip: floats read back bit-identical to what was written; keys stay text (e.g. numeric usernames)
+    auth, party = (pd.read_csv(p, dtype={"username": str, "partei_kurz": str}, keep_default_na=False, na_values=[""],
+                               float_precision="round_trip") for p in paths)
+    logger.info("Reusing %s outputs for %04d-%02d (authors=%d, parties=%d)", MONTHLY_STEP, ctx.year, ctx.month,
+                len(auth), len(party))
+    return auth, party
+
+
+def _align_nullable(stored: pd.DataFrame, computed: pd.DataFrame) -> pd.DataFrame:
+    """Give CSV-read columns the nullable numeric dtypes (Int32, Float64, ...) the engine computes them with."""
+    dtypes = {c: computed[c].dtype for c in stored.columns.intersection(computed.columns)
+              if isinstance(computed[c].dtype, pd.api.extensions.ExtensionDtype) and computed[c].dtype.kind in "iuf"}
+    return stored.astype(dtypes) if dtypes else stored
+
+
 def _join_and_delta(prev_df: pd.DataFrame, curr_df: pd.DataFrame, on: List[str], id_cols_keep: List[str]) -> pd.DataFrame:
     """
     Generic prev/curr join with automatic delta/pct across numeric columns.
@@ -206,12 +190,16 @@ def _join_and_delta(prev_df: pd.DataFrame, curr_df: pd.DataFrame, on: List[str],
 # -------------------------------
 # Orchestration
 # -------------------------------
-def run(year: int, month: int, outdir: str, schema: str, tweets_tbl: str, x_profiles_tbl: str):
+def run(year: int, month: int, outdir: str, schema: str, tweets_tbl: str, x_profiles_tbl: str,
+        metrics_engine: str = "pandas", rollup_tbl: str = ROLLUP_TABLE, loader_backend: str = "pandas",
+        prev_ctx: RunContext | None = None):
     """
     Compute month-over-month deltas for tweet metrics:
       - per-politician (username)
       - per-party
     and write CSVs tagged with the *current* month (YYYYMM).
+    With `prev_ctx` (the previous month's RunContext), the previous month's tables are read from
+    its tweets_metrics_monthly outputs when those are still fresh (see load_stored_month).
     """
     outdir_tweets = build_outdir(outdir, year, month, "tweets")   # e.g., output/202509/tweets
     ym = f"{year:04d}{month:02d}"
@@ -219,12 +207,16 @@ def run(year: int, month: int, outdir: str, schema: str, tweets_tbl: str, x_prof
 
     logger.info("Building monthly tables: prev=%04d-%02d, curr=%04d-%02d", prev_y, prev_m, year, month)
 
-    # Build monthly aggregates (prev & curr)
-    prev_auth = _build_monthly_author_table(schema, tweets_tbl, x_profiles_tbl, prev_m, prev_y)
-    curr_auth = _build_monthly_author_table(schema, tweets_tbl, x_profiles_tbl, month, year)
-
-    prev_party = _build_monthly_party_table(schema, tweets_tbl, x_profiles_tbl, prev_m, prev_y)
-    curr_party = _build_monthly_party_table(schema, tweets_tbl, x_profiles_tbl, month, year)
+    if metrics_engine not in METRICS_ENGINES:
+        raise ValueError(f"Unknown metrics engine {metrics_engine!r}; expected one of {METRICS_ENGINES}")
+    src = dict(schema=schema, tweets_tbl=tweets_tbl, x_profiles_tbl=x_profiles_tbl, metrics_engine=metrics_engine,
+               rollup_tbl=rollup_tbl, loader_backend=loader_backend)
+    # the previous month usually was aggregated by an earlier tweets_metrics_monthly run
+    stored = load_stored_month(prev_ctx) if prev_ctx is not None else None
+    prev_auth, prev_party = stored if stored is not None else _month_tables(prev_y, prev_m, **src)
+    curr_auth, curr_party = _month_tables(year, month, **src)
+    if stored is not None:
+        prev_auth, prev_party = _align_nullable(prev_auth, curr_auth), _align_nullable(prev_party, curr_party)
 
     # Guard rails
     if prev_auth.empty or curr_auth.empty:
@@ -269,19 +261,17 @@ def run(year: int, month: int, outdir: str, schema: str, tweets_tbl: str, x_prof
 
 
 # -------------------------------
-# Entrypoint (parameters.yml only)
+# Entrypoint (RunContext; parameters.yml by default)
 # -------------------------------
-if __name__ == "__main__":
-    # Align with other tasks: read from Params (year/month/outdir)
-    year = int(getattr(Params, "year", datetime.now().year))
-    month = int(getattr(Params, "month", datetime.now().month))
-    outdir = getattr(Params, "outdir", "output")
-    if not (1 <= month <= 12):
-        raise SystemExit("Month must be in 1..12")
-
+def main(ctx: RunContext | None = None):
+    """Run for one RunContext (default: parameters.yml via Params)."""
+    ctx = resolve_context(ctx)
     # Hard-coded table identifiers to match your other tasks
-    schema = "public"
     tweets_tbl = "tweets"
     x_profiles_tbl = "x_profiles"
+    run(ctx.year, ctx.month, ctx.outdir, ctx.schema, tweets_tbl, x_profiles_tbl, metrics_engine=ctx.metrics_engine,
+        loader_backend=ctx.loader_backend, prev_ctx=ctx.for_month(*prev_year_month(ctx.year, ctx.month)))
 
-    run(year, month, outdir, schema, tweets_tbl, x_profiles_tbl)
+
+if __name__ == "__main__":
+    main()
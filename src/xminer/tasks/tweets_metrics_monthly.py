@@ -3,23 +3,37 @@ from __future__ import annotations
 import os
 import logging
 from datetime import datetime
+from functools import partial
 from typing import List
 
 import pandas as pd
-from sqlalchemy import text
 
 # --- Project-style imports (match your existing tasks) ---
-from ..io.db import engine  # central engine from Config.DATABASE_URL
-from ..config.params import Params  # parameters class used in production
+from ..io import loaders as _loaders
+from ..io.loaders import POSTGRES_LATEST_PROFILES_TMPL, POSTGRES_TWEETS_MONTH_TMPL
+from ..config.context import RunContext, resolve_context
 
 from ..utils.global_helpers import politicians_table_name, normalize_party, UNION_MAP, month_bounds, _safe_div, build_outdir
 # --- add/replace this import block near the top ---
 from ..utils.metrics_helpers import (
     MetricSpec,
+    uses_pushdown,
+    uses_rollup,
+    run_concurrently,
     enrich_with_profiles,
+    required_columns,
+    plan_metrics,
+    hydrate_lazy_columns,
+    ColumnStore,
+    ENRICHED_COLUMNS,
+    TWEET_SUMMARY_COLUMNS,
+    TWEET_LEADERBOARD_COLUMNS,
+    TWEET_LAZY_COLUMNS,
     # summaries
     metric_individual_month,
     metric_party_month,
+    rollup_individual_month,
+    rollup_party_month,
     # leaderboards (absolute)
     metric_top_tweets,  # engagement_rate (canonical top)
     metric_bottom_tweets_by_engagement_rate,
@@ -45,7 +59,33 @@ from ..utils.metrics_helpers import (
     # author-level
     metric_top_authors_by_avg_engagement_rate,
     metric_most_active_authors,
+    # posting-time heatmaps
+    metric_posting_heatmap_party,
+    metric_posting_heatmap_author,
+    # leaderboard definitions (computed together in one pass)
+    compute_leaderboards,
+    grouped_board_specs,
+    board_top_tweets,
+    board_bottom_tweets_by_engagement_rate,
+    board_top_tweets_by_likes,
+    board_top_tweets_by_retweets,
+    board_top_tweets_by_replies,
+    board_top_tweets_by_quotes,
+    board_top_tweets_by_bookmarks,
+    board_top_tweets_by_impressions,
+    board_top_tweets_by_likes_per_1k,
+    board_top_tweets_by_engagement_per_1k,
+    board_bottom_tweets_by_engagement_per_1k,
+    board_most_controversial,
+    board_most_reply_heavy,
+    board_most_quote_heavy,
+    board_most_amplified_debate,
+    board_most_controversial_by_like_to_reply,
+    board_low_conversion_high_reach,
+    board_silent_hits,
 )
+from ..utils.metrics_sql import sql_individual_month, sql_party_month
+from .tweets_daily_rollup import ROLLUP_TABLE
 
 # ---------- logging ----------
 os.makedirs("logs", exist_ok=True)
@@ -62,101 +102,14 @@ logger = logging.getLogger(__name__)
 # -------------------------------
 # Data access
 # -------------------------------
-# latest x_profile per username joined with politician attributes (for followers etc.)
-POSTGRES_LATEST_PROFILES_TMPL = r"""
-WITH joined AS (
-  SELECT
-    xp.username,
-    xp.x_user_id,
-    xp.name,
-    xp.created_at,
-    xp.verified,
-    xp.protected,
-    xp.followers_count,
-    xp.following_count,
-    xp.tweet_count,
-    xp.listed_count,
-    xp.location,
-    xp.description,
-    xp.retrieved_at,
-    p.partei_kurz,
-    p.geschlecht,
-    p.geburtsdatum,
-    ROW_NUMBER() OVER (PARTITION BY lower(xp.username) ORDER BY xp.retrieved_at DESC) AS rn
-  FROM {schema}.{x_profiles} xp
-  JOIN {schema}.{politicians} p
-    ON lower(xp.username) = lower(p.username)
-)
-SELECT *
-FROM joined
-WHERE rn = 1
-"""
-
-# tweets for a given month joined to politicians (party) by username
-POSTGRES_TWEETS_MONTH_TMPL = r"""
-SELECT
-  t.tweet_id,
-  t.author_id,
-  t.username,
-  t.created_at,
-  t.text,
-  t.lang,
-  t.conversation_id,
-  t.in_reply_to_user_id,
-  t.possibly_sensitive,
-  t.like_count,
-  t.reply_count,
-  t.retweet_count,
-  t.quote_count,
-  t.bookmark_count,
-  t.impression_count,
-  t.source,
-  t.entities,
-  t.referenced_tweets,
-  t.retrieved_at,
-  p.partei_kurz
-FROM {schema}.{tweets} t
-JOIN {schema}.{politicians} p
-  ON lower(t.username) = lower(p.username)
-WHERE t.created_at >= :start_ts
-  AND t.created_at < :end_ts
-"""
-
-def load_latest_profiles(schema: str, x_profiles: str, month: int, year: int) -> pd.DataFrame:
-    politicians = politicians_table_name(month, year)
-    sql = POSTGRES_LATEST_PROFILES_TMPL.format(schema=schema, x_profiles=x_profiles, politicians=politicians)
-    with engine.begin() as conn:
-        df = pd.read_sql(text(sql), conn)
-    if "created_at" in df:
-        df["created_at"] = pd.to_datetime(df["created_at"], utc=True, errors="coerce")
-    if "retrieved_at" in df:
-        df["retrieved_at"] = pd.to_datetime(df["retrieved_at"], utc=True, errors="coerce")
-    if "geburtsdatum" in df:
-        df["geburtsdatum"] = pd.to_datetime(df["geburtsdatum"], utc=True, errors="coerce").dt.date
-    if "username" in df:
-        df["username"] = df["username"].astype(str).str.strip()
+# SQL templates and typing live in io.loaders; loads are shared through the run's dataset cache.
+def load_latest_profiles(schema: str, x_profiles: str, month: int, year: int, backend: str = "pandas") -> pd.DataFrame:
+    return _loaders.load_latest_profiles(schema, x_profiles, month, year, backend=backend)
 
-    # NEW: normalize CDU/CSU union
-    df = normalize_party(df)
-    return df
-
-def load_tweets_month(schema: str, tweets: str, month: int, year: int, start_ts: pd.Timestamp, end_ts: pd.Timestamp) -> pd.DataFrame:
-    politicians = politicians_table_name(month, year)
-    sql = POSTGRES_TWEETS_MONTH_TMPL.format(schema=schema, tweets=tweets, politicians=politicians)
-    with engine.begin() as conn:
-        df = pd.read_sql(text(sql), conn, params={"start_ts": start_ts, "end_ts": end_ts})
-    # dtypes / cleanup
-    if "created_at" in df:
-        df["created_at"] = pd.to_datetime(df["created_at"], utc=True, errors="coerce")
-    if "retrieved_at" in df:
-        df["retrieved_at"] = pd.to_datetime(df["retrieved_at"], utc=True, errors="coerce")
-    for c in ["like_count", "reply_count", "retweet_count", "quote_count", "bookmark_count", "impression_count"]:
-        if c in df:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-    if "username" in df:
-        df["username"] = df["username"].astype(str).str.strip()
-    df = normalize_party(df)
-    return df
+def load_tweets_month(schema: str, tweets: str, month: int, year: int, start_ts: pd.Timestamp, end_ts: pd.Timestamp,
+                      columns: tuple | None = None, backend: str = "pandas") -> pd.DataFrame:
+    # start_ts/end_ts are kept for callers; the shared loader derives the same UTC month bounds
+    return _loaders.load_tweets_month(schema, tweets, month, year, columns=columns, backend=backend)
 
 
 # -------------------------------
@@ -170,11 +123,19 @@ def build_metrics(top_n: int) -> List[MetricSpec]:
             name="tweets_individual_month",
             description="Per-politician monthly tweet metrics (averages, ratios, follower-normalized)",
             compute=metric_individual_month,
+            columns=TWEET_SUMMARY_COLUMNS,
+            derived=ENRICHED_COLUMNS,
+            pushdown=sql_individual_month,
+            rollup=rollup_individual_month,
         ),
         MetricSpec(
             name="tweets_party_month",
             description="Party-level monthly tweet aggregates and rates",
             compute=metric_party_month,
+            columns=TWEET_SUMMARY_COLUMNS,
+            derived=ENRICHED_COLUMNS,
+            pushdown=sql_party_month,
+            rollup=rollup_party_month,
         ),
 
         # Core engagement-rate boards
@@ -182,41 +143,65 @@ def build_metrics(top_n: int) -> List[MetricSpec]:
             name="tweets_top_by_engagement_rate",
             description=f"Top {top_n} tweets by engagement rate in the month",
             compute=lambda df: metric_top_tweets(df, top_n=top_n),
+            board=board_top_tweets(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_bottom_by_engagement_rate",
             description=f"Bottom {top_n} tweets by engagement rate (min reach guard)",
             compute=lambda df: metric_bottom_tweets_by_engagement_rate(df, top_n=top_n),
+            board=board_bottom_tweets_by_engagement_rate(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_top_by_likes",
             description=f"Top {top_n} tweets by likes",
             compute=lambda df: metric_top_tweets_by_likes(df, top_n=top_n),
+            board=board_top_tweets_by_likes(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_top_by_retweets",
             description=f"Top {top_n} tweets by retweets",
             compute=lambda df: metric_top_tweets_by_retweets(df, top_n=top_n),
+            board=board_top_tweets_by_retweets(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_top_by_replies",
             description=f"Top {top_n} tweets by replies",
             compute=lambda df: metric_top_tweets_by_replies(df, top_n=top_n),
+            board=board_top_tweets_by_replies(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_top_by_quotes",
             description=f"Top {top_n} tweets by quotes",
             compute=lambda df: metric_top_tweets_by_quotes(df, top_n=top_n),
+            board=board_top_tweets_by_quotes(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_top_by_bookmarks",
             description=f"Top {top_n} tweets by bookmarks",
             compute=lambda df: metric_top_tweets_by_bookmarks(df, top_n=top_n),
+            board=board_top_tweets_by_bookmarks(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_top_by_impressions",
             description=f"Top {top_n} tweets by impressions",
             compute=lambda df: metric_top_tweets_by_impressions(df, top_n=top_n),
+            board=board_top_tweets_by_impressions(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
 
         # Follower-normalized leaderboards
@@ -224,16 +209,25 @@ def build_metrics(top_n: int) -> List[MetricSpec]:
             name="tweets_top_by_likes_per_1k_followers",
             description=f"Top {top_n} tweets by likes per 1k followers",
             compute=lambda df: metric_top_tweets_by_likes_per_1k(df, top_n=top_n),
+            board=board_top_tweets_by_likes_per_1k(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_top_by_engagement_per_1k_followers",
             description=f"Top {top_n} tweets by engagement per 1k followers",
             compute=lambda df: metric_top_tweets_by_engagement_per_1k(df, top_n=top_n),
+            board=board_top_tweets_by_engagement_per_1k(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_bottom_by_engagement_per_1k_followers",
             description=f"Bottom {top_n} tweets by engagement per 1k followers (min reach guard)",
             compute=lambda df: metric_bottom_tweets_by_engagement_per_1k(df, top_n=top_n),
+            board=board_bottom_tweets_by_engagement_per_1k(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
 
         # Controversy / “shitstorm” indicators
@@ -241,26 +235,41 @@ def build_metrics(top_n: int) -> List[MetricSpec]:
             name="tweets_most_controversial",
             description=f"Top {top_n} most controversial tweets ((replies+quotes) / likes)",
             compute=lambda df: metric_most_controversial(df, top_n=top_n),
+            board=board_most_controversial(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_most_reply_heavy",
             description=f"Top {top_n} by reply share of engagement (replies / engagement_total)",
             compute=lambda df: metric_most_reply_heavy(df, top_n=top_n),
+            board=board_most_reply_heavy(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_most_quote_heavy",
             description=f"Top {top_n} by quote share of engagement (quotes / engagement_total)",
             compute=lambda df: metric_most_quote_heavy(df, top_n=top_n),
+            board=board_most_quote_heavy(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_most_amplified_debate",
             description=f"Top {top_n} by amplification rate ((retweets+quotes) / impressions)",
             compute=lambda df: metric_most_amplified_debate(df, top_n=top_n),
+            board=board_most_amplified_debate(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_most_controversial_by_like_to_reply",
             description=f"Top {top_n} most controversial (lowest like-to-reply ratio)",
             compute=lambda df: metric_most_controversial_by_like_to_reply(df, top_n=top_n),
+            board=board_most_controversial_by_like_to_reply(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
 
         # Conversion patterns
@@ -268,11 +277,17 @@ def build_metrics(top_n: int) -> List[MetricSpec]:
             name="tweets_low_conversion_high_reach",
             description=f"Top {top_n} low-conversion tweets (high impressions, low engagement rate)",
             compute=lambda df: metric_low_conversion_high_reach(df, top_n=top_n),
+            board=board_low_conversion_high_reach(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
         MetricSpec(
             name="tweets_silent_hits",
             description=f"Top {top_n} silent hits (high engagement rate at low reach)",
             compute=lambda df: metric_silent_hits(df, top_n=top_n),
+            board=board_silent_hits(top_n),
+            columns=TWEET_LEADERBOARD_COLUMNS,
+            lazy_columns=TWEET_LAZY_COLUMNS,
         ),
 
         # Author-level
@@ -280,16 +295,37 @@ def build_metrics(top_n: int) -> List[MetricSpec]:
             name="authors_top_avg_engagement_rate",
             description=f"Top {top_n} authors by avg engagement rate (min tweets threshold inside)",
             compute=lambda df: metric_top_authors_by_avg_engagement_rate(df, top_n=top_n),
+            columns=TWEET_SUMMARY_COLUMNS,
+            derived=("engagement_rate", "engagement_total"),
         ),
         MetricSpec(
             name="authors_most_active",
             description=f"Top {top_n} most active authors (tweets this month)",
             compute=lambda df: metric_most_active_authors(df, top_n=top_n),
+            columns=TWEET_SUMMARY_COLUMNS,
+        ),
+
+        # Posting-time heatmaps (weekday x hour, Europe/Berlin)
+        MetricSpec(
+            name="tweets_heatmap_party",
+            description="Tweets and engagement per party, weekday and hour (Europe/Berlin)",
+            compute=metric_posting_heatmap_party,
+            columns=TWEET_SUMMARY_COLUMNS,
+            derived=("engagement_total",),
+        ),
+        MetricSpec(
+            name="tweets_heatmap_author",
+            description="Tweets and engagement per author, weekday and hour (Europe/Berlin; cells with tweets)",
+            compute=metric_posting_heatmap_author,
+            columns=TWEET_SUMMARY_COLUMNS,
+            derived=("engagement_total",),
         ),
     ]
 
 
-def run(year: int, month: int, outdir: str, schema: str, tweets_tbl: str, x_profiles_tbl: str, top_n: int):
+def run(year: int, month: int, outdir: str, schema: str, tweets_tbl: str, x_profiles_tbl: str, top_n: int,
+        metrics_engine: str = "pandas", leaderboard_group_by: tuple = (), rollup_tbl: str = ROLLUP_TABLE,
+        workers: int = 1, loader_backend: str = "pandas"):
     outdir_tweets = build_outdir(outdir, year, month, "tweets")
     ym = f"{year:04d}{month:02d}"
 
@@ -297,41 +333,93 @@ def run(year: int, month: int, outdir: str, schema: str, tweets_tbl: str, x_prof
     start_ts, end_ts = month_bounds(year, month)
     logger.info("Computing metrics for %s to %s (UTC)", start_ts.isoformat(), end_ts.isoformat())
 
-    # load
-    prof_latest = load_latest_profiles(schema=schema, x_profiles=x_profiles_tbl, month=month, year=year)
-    tweets_month = load_tweets_month(schema=schema, tweets=tweets_tbl, month=month, year=year, start_ts=start_ts, end_ts=end_ts)
-    logger.info("Partei_kurz values in latest profiles: %s", prof_latest["partei_kurz"].dropna().unique())
-    logger.info("Partei_kurz values in tweets_month: %s", tweets_month["partei_kurz"].dropna().unique())
-    if tweets_month.empty:
-        logger.warning("No tweets found for %04d-%02d. Outputs will be empty.", year, month)
-        
+    specs = build_metrics(top_n=top_n)
+    # per-group variants of every leaderboard (top_n per party / ISO week / language), one tidy CSV each
+    specs += grouped_board_specs(specs, leaderboard_group_by)
+    local_specs = [spec for spec in specs if not uses_pushdown(spec, metrics_engine) and not uses_rollup(spec, metrics_engine)]
+
+    results = {}
+    # aggregate metrics pushed down to Postgres (metrics_engine="sql"): only grouped rows come back
+    source = dict(schema=schema, tweets=tweets_tbl, x_profiles=x_profiles_tbl, year=year, month=month)
+    pushed = [spec for spec in specs if uses_pushdown(spec, metrics_engine)]
+    results.update(zip((spec.name for spec in pushed),
+                       run_concurrently([partial(spec.pushdown, **source) for spec in pushed], workers)))
 
-    # enrich tweets with latest followers etc. for follower-normalized metrics
-    dataset = enrich_with_profiles(tweets_month, prof_latest)
-    logger.info("Partei_kurz values in dataset: %s", dataset["partei_kurz"].dropna().unique())
+    # aggregate metrics from the daily per-author rollup (metrics_engine="rollup"): no per-tweet load
+    rollup_specs = [spec for spec in specs if uses_rollup(spec, metrics_engine)]
+    if rollup_specs:
+        prof_latest = load_latest_profiles(schema=schema, x_profiles=x_profiles_tbl, month=month, year=year,
+                                           backend=loader_backend)
+        daily = _loaders.load_daily_rollup(schema, rollup_tbl, month, year, start_ts.date(), end_ts.date(),
+                                           backend=loader_backend)
+        results.update(zip((spec.name for spec in rollup_specs),
+                           run_concurrently([partial(spec.rollup, daily, prof_latest) for spec in rollup_specs], workers)))
 
-    # compute & write
-    for spec in build_metrics(top_n=top_n):
-        df_metric = spec.compute(dataset)
-        out_path = os.path.join(outdir_tweets, f"{spec.name}_{ym}.csv")
-        df_metric.to_csv(out_path, index=False)
+    if local_specs:
+        # load (only the raw columns the specs read; wide text columns are fetched later for output rows)
+        prof_latest = load_latest_profiles(schema=schema, x_profiles=x_profiles_tbl, month=month, year=year,
+                                           backend=loader_backend)
+        tweets_month = load_tweets_month(schema=schema, tweets=tweets_tbl, month=month, year=year, start_ts=start_ts, end_ts=end_ts,
+                                         columns=required_columns(local_specs), backend=loader_backend)
+        logger.info("Partei_kurz values in latest profiles: %s", prof_latest["partei_kurz"].dropna().unique())
+        logger.info("Partei_kurz values in tweets_month: %s", tweets_month["partei_kurz"].dropna().unique())
+        if tweets_month.empty:
+            logger.warning("No tweets found for %04d-%02d. Outputs will be empty.", year, month)
+
+        # enrich tweets with latest followers etc. for follower-normalized metrics
+        dataset = enrich_with_profiles(tweets_month, prof_latest)
+        logger.info("Partei_kurz values in dataset: %s", dataset["partei_kurz"].dropna().unique())
+
+        # plan: specs with missing inputs are skipped (empty output); derived columns are computed
+        # once into the dataset's column store, which every board below reads
+        store = ColumnStore(dataset)
+        local_specs, skipped = plan_metrics(local_specs, store)
+        results.update((spec.name, pd.DataFrame()) for spec in skipped)
+
+        # compute: all leaderboards in one pass over shared arrays, the rest per spec;
+        # the other specs run while the boards are ranked (workers share `dataset` read-only)
+        boards = {spec.name: spec.board for spec in local_specs if spec.board}
+        plain = [spec for spec in local_specs if spec.board is None]
+        board_workers = max(1, workers - len(plain))
+        computed = run_concurrently(
+            [partial(compute_leaderboards, store, boards, board_workers)] + [partial(spec.compute, dataset) for spec in plain],
+            workers,
+        )
+        results.update(computed[0])
+        results.update(zip((spec.name for spec in plain), computed[1:]))
+
+    results = [(spec, results[spec.name]) for spec in specs]
+
+    # lazily fetch wide columns for the rows that made it into an output, in one query
+    lazy_cols = [c for c in TWEET_LAZY_COLUMNS if any(c in spec.lazy_columns for spec in specs)]
+    if lazy_cols:
+        ids = {tid for spec, df in results if spec.lazy_columns and "tweet_id" in df for tid in df["tweet_id"]}
+        values = _loaders.load_tweet_columns(schema, tweets_tbl, ids, lazy_cols, backend=loader_backend)
+        results = [
+            (spec, hydrate_lazy_columns(df, values, spec.lazy_columns) if spec.lazy_columns else df)
+            for spec, df in results
+        ]
+
+    # write
+    out_paths = [os.path.join(outdir_tweets, f"{spec.name}_{ym}.csv") for spec, _ in results]
+    run_concurrently([partial(df_metric.to_csv, out_path, index=False)
+                      for (_, df_metric), out_path in zip(results, out_paths)], workers)
+    for (spec, _), out_path in zip(results, out_paths):
         logger.info("Wrote %s -> %s", spec.description, out_path)
 
 # -------------------------------
-# Entrypoint (parameters.yml only)
+# Entrypoint (RunContext; parameters.yml by default)
 # -------------------------------
-if __name__ == "__main__":
-    # Read all parameters from parameters.yml via Params
-    year = int(getattr(Params, "year", datetime.now().year))
-    month = int(getattr(Params, "month", datetime.now().month))
-    outdir = getattr(Params, "outdir", "output")
-    top_n = int(getattr(Params, "top_n", 50))
-    if not (1 <= month <= 12):
-        raise SystemExit("Month must be in 1..12")
-
+def main(ctx: RunContext | None = None):
+    """Run for one RunContext (default: parameters.yml via Params)."""
+    ctx = resolve_context(ctx)
     # Hard-coded table identifiers per request
-    schema = "public"
     tweets_tbl = "tweets"
     x_profiles_tbl = "x_profiles"
+    run(ctx.year, ctx.month, ctx.outdir, ctx.schema, tweets_tbl, x_profiles_tbl, ctx.top_n,
+        metrics_engine=ctx.metrics_engine, leaderboard_group_by=tuple(ctx.leaderboard_group_by),
+        workers=ctx.metrics_workers, loader_backend=ctx.loader_backend)
 
-    run(year, month, outdir, schema, tweets_tbl, x_profiles_tbl, top_n)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import os
+import argparse
+import logging
+from datetime import date
+
+import pandas as pd
+
+# --- Project-style imports (match the metrics tasks) ---
+from ..io import loaders as _loaders
+from ..config.context import RunContext, resolve_context
+from ..utils.global_helpers import build_outdir, window_bounds
+from ..utils.metrics_helpers import (
+    TWEET_LAZY_COLUMNS,
+    TWEET_LEADERBOARD_COLUMNS,
+    ProfileIndex,
+    enrich_with_profiles,
+    grouped_board_specs,
+    hydrate_lazy_columns,
+)
+from ..utils.metrics_stream import (
+    StreamingLeaderboards,
+    finalize_individual_range,
+    finalize_party_range,
+    individual_range_agg,
+    party_range_agg,
+)
+from .tweets_metrics_monthly import build_metrics
+from .x_profiles_monthly_snapshot import iter_year_months
+
+# ---------- logging ----------
+os.makedirs("logs", exist_ok=True)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler("logs/tweets_metrics_range.log", mode="w"),
+        logging.StreamHandler(),
+    ],
+)
+logger = logging.getLogger(__name__)
+
+# rows per database fetch; peak memory is a few chunks regardless of the range length
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+# -------------------------------
+# Orchestration
+# -------------------------------
+def run(start: tuple, end: tuple, outdir: str, schema: str, tweets_tbl: str, x_profiles_tbl: str, top_n: int = 10,
+        leaderboard_group_by: tuple = (), chunksize: int = DEFAULT_CHUNK_ROWS):
+    """
+    Per-politician and per-party tweet aggregates and the tweet leaderboards over the months
+    [start, end] (inclusive (year, month) pairs), streamed chunk by chunk. Each month's tweets
+    are attributed to that month's roster and normalized by that month's latest profiles;
+    months do not overlap.
+    """
+    specs = [spec for spec in build_metrics(top_n) if spec.board is not None]
+    specs += grouped_board_specs(specs, leaderboard_group_by)
+    individual, party = individual_range_agg(), party_range_agg()
+    boards = StreamingLeaderboards({spec.name: spec.board for spec in specs})
+    for year, month in iter_year_months(start, end):
+        first, nxt = window_bounds("month", date(year, month, 1))
+        start_ts, end_ts = pd.Timestamp(first, tz="UTC"), pd.Timestamp(nxt, tz="UTC")
+        # indexed once per month; every chunk is enriched by positional lookups
+        profiles = ProfileIndex(_loaders.load_latest_profiles(schema, x_profiles_tbl, month, year))
+        rows = 0
+        for chunk in _loaders.iter_tweets_month_chunks(schema, tweets_tbl, month, year, start_ts, end_ts,
+                                                      columns=TWEET_LEADERBOARD_COLUMNS, chunksize=chunksize):
+            enriched = enrich_with_profiles(chunk, profiles)
+            individual.update(enriched)
+            party.update(enriched)
+            boards.update(enriched)
+            rows += len(chunk)
+        logger.info("Aggregated %04d-%02d: %d tweets (total %d)", year, month, rows, party.rows)
+
+    label = f"{start[0]:04d}{start[1]:02d}_{end[0]:04d}{end[1]:02d}"
+    outdir_tweets = build_outdir(outdir, end[0], end[1], "tweets")
+    outputs = [
+        ("tweets_individual_range", "Per-politician tweet metrics", finalize_individual_range(individual)),
+        ("tweets_party_range", "Party-level tweet aggregates", finalize_party_range(party)),
+    ]
+    # leaderboards: only their top rows were kept; fetch the wide columns for those in one query
+    ranked = boards.result()
+    lazy_cols = [c for c in TWEET_LAZY_COLUMNS if any(c in spec.lazy_columns for spec in specs)]
+    values = None
+    if lazy_cols:
+        ids = {tid for df in ranked.values() if "tweet_id" in df for tid in df["tweet_id"]}
+        values = _loaders.load_tweet_columns(schema, tweets_tbl, ids, lazy_cols)
+    for spec in specs:
+        df_board = ranked[spec.name]
+        if values is not None and spec.lazy_columns:
+            df_board = hydrate_lazy_columns(df_board, values, spec.lazy_columns)
+        outputs.append((spec.name, spec.description, df_board))
+    for name, description, df_metric in outputs:
+        out_path = os.path.join(outdir_tweets, f"{name}_{label}.csv")
+        df_metric.to_csv(out_path, index=False)
+        logger.info("Wrote %s (%s) -> %s", description, label, out_path)
+
+
+# -------------------------------
+# Entrypoint
+# -------------------------------
+def _year_month(s: str) -> tuple:
+    year, month = (int(x) for x in s.split("-"))
+    return year, month
+
+
+def main(argv=None, ctx: RunContext | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Streamed tweet metrics and leaderboards over a range of months.")
+    parser.add_argument("--from", dest="start", type=_year_month, help="First month (YYYY-MM); default: the context month.")
+    parser.add_argument("--to", dest="end", type=_year_month, help="Last month, inclusive (YYYY-MM); default: the context month.")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_ROWS, help="Tweet rows per database fetch.")
+    args = parser.parse_args(argv)
+
+    ctx = resolve_context(ctx)
+    end = args.end or (ctx.year, ctx.month)
+    start = args.start or end
+    if start > end:
+        raise SystemExit(f"--from {start} is after --to {end}")
+    run(start, end, ctx.outdir, ctx.schema, tweets_tbl="tweets", x_profiles_tbl="x_profiles", top_n=ctx.top_n,
+        leaderboard_group_by=tuple(ctx.leaderboard_group_by), chunksize=args.chunksize)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
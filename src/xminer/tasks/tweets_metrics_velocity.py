@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import os
+import logging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# --- Project-style imports (match the metrics tasks) ---
+from ..io import loaders as _loaders
+from ..io.db import engine                   # central engine built from Config.DATABASE_URL
+from ..io.cache import cached                # run-scoped dataset cache
+from ..config.context import RunContext, resolve_context
+from ..utils.global_helpers import build_outdir, month_bounds
+from ..utils.metrics_helpers import ENGAGEMENT_PARTS, TWEET_SUMMARY_COLUMNS, TWEET_LAZY_COLUMNS, _safe_div, hydrate_lazy_columns
+from .tweet_metrics_history import HISTORY_COUNTERS, HISTORY_TABLE, ensure_table
+
+# ---------- logging ----------
+os.makedirs("logs", exist_ok=True)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler("logs/tweets_metrics_velocity.log", mode="w"),
+        logging.StreamHandler(),
+    ],
+)
+logger = logging.getLogger(__name__)
+
+VELOCITY_COLUMNS = (*TWEET_SUMMARY_COLUMNS, "retrieved_at")
+ENGAGEMENT_DELTAS = tuple(HISTORY_COUNTERS[c] for c in ENGAGEMENT_PARTS)
+
+# -------------------------------
+# Data access
+# -------------------------------
+# history rows of the tweets created in the month (the same UTC bounds as the month loaders)
+POSTGRES_HISTORY_MONTH_SQL_TMPL = r"""
+SELECT h.*
+FROM {schema}.{history} h
+JOIN {schema}.{tweets} t ON t.tweet_id = h.tweet_id
+WHERE t.created_at >= :start_ts
+  AND t.created_at < :end_ts
+"""
+
+
+def load_history_month(schema: str, tweets: str, year: int, month: int) -> pd.DataFrame:
+    """Counter changes of the month's tweets (one row per tweet and fetch that changed something)."""
+    key = (POSTGRES_HISTORY_MONTH_SQL_TMPL, (schema, HISTORY_TABLE, tweets), year, month)
+    return cached(key, lambda: _load_history_month(schema, tweets, year, month))
+
+
+def _load_history_month(schema: str, tweets: str, year: int, month: int) -> pd.DataFrame:
+    ensure_table(schema)
+    start_ts, end_ts = month_bounds(year, month)
+    sql = POSTGRES_HISTORY_MONTH_SQL_TMPL.format(schema=schema, history=HISTORY_TABLE, tweets=tweets)
+    with engine.begin() as conn:
+        df = pd.read_sql(text(sql), conn, params={"start_ts": start_ts.to_pydatetime(), "end_ts": end_ts.to_pydatetime()})
+    df["tweet_id"] = df["tweet_id"].astype(str)
+    df["retrieved_at"] = pd.to_datetime(df["retrieved_at"], utc=True, errors="coerce")
+    logger.info("Loaded %d history rows for %d tweets of %04d-%02d", len(df), df["tweet_id"].nunique(), year, month)
+    return df
+
+
+# -------------------------------
+# Velocity / saturation
+# -------------------------------
+def _hours(ts: pd.Series) -> np.ndarray:
+    return pd.to_datetime(ts, utc=True).to_numpy(dtype="datetime64[ns]").astype(np.int64) / 3.6e12
+
+
+def counter_velocity(pos: np.ndarray, hours: np.ndarray, delta: np.ndarray, current: np.ndarray,
+                     created: np.ndarray) -> dict:
+    """
+    Per tweet, from change rows sorted by (tweet position, time): levels recovered backwards
+    from the current value, the change per hour of every interval (the first one from creation,
+    when the tweet was first seen at 0) and
+    velocity_last / velocity_peak / half_life (hours after creation at which half of the
+    current value was reached, interpolated). Tweets without rows are NaN.
+    """
+    n = len(current)
+    out = {k: np.full(n, np.nan) for k in ("velocity_last", "velocity_peak", "half_life")}
+    if not len(pos):
+        return out
+    starts = np.flatnonzero(np.r_[True, pos[1:] != pos[:-1]])
+    tweet = pos[starts]
+    seg = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(pos)]))
+    # level after each row = current - changes after it; the level before the first row is the base
+    csum = np.cumsum(delta)
+    seg_total = np.add.reduceat(delta, starts)
+    seg_before = csum[starts] - delta[starts]
+    level = current[pos] - (seg_total[seg] - (csum - seg_before[seg]))
+    base = current[tweet] - seg_total
+
+    age = hours - created[pos]
+    prev_level, prev_age = np.r_[np.nan, level[:-1]], np.r_[np.nan, age[:-1]]
+    # a tweet first recorded with a base of 0 started at creation; an older base has no known time
+    prev_level[starts] = base
+    prev_age[starts] = np.where(base == 0, 0.0, np.nan)
+    velocity = _safe_div(level - prev_level, age - prev_age)
+
+    last = np.r_[starts[1:], len(pos)] - 1
+    out["velocity_last"][tweet] = velocity[last]
+    peak = np.fmax.reduceat(np.where(np.isnan(velocity), -np.inf, velocity), starts)
+    out["velocity_peak"][tweet] = np.where(np.isinf(peak), np.nan, peak)
+
+    # half-life: first interval reaching half of the current value
+    target = current[pos] / 2.0
+    reached = (level >= target) & (current[pos] > 0)
+    first = np.minimum.reduceat(np.where(reached, np.arange(len(pos)), len(pos)), starts)
+    ok = first < len(pos)
+    i = first[ok]
+    frac = _safe_div(target[i] - prev_level[i], level[i] - prev_level[i])
+    out["half_life"][tweet[ok]] = np.where(prev_level[i] >= target[i], np.nan,
+                                           prev_age[i] + np.clip(frac, 0, 1) * (age[i] - prev_age[i]))
+    return out
+
+
+def tweet_velocity(tweets: pd.DataFrame, history: pd.DataFrame) -> pd.DataFrame:
+    """
+    Engagement and impression velocity per tweet (per hour) from its change history, plus the
+    engagement half-life and saturation (1 - last / peak velocity; 1 = no longer growing).
+    A fetch after the last change counts as an interval without change.
+    """
+    tweets = tweets.reset_index(drop=True)
+    tid = tweets["tweet_id"].astype(str)
+    pos = pd.Index(tid).get_indexer(history["tweet_id"])
+    rows = history[pos >= 0]
+    pos = pos[pos >= 0]
+
+    # closing zero-change row at the last fetch when it came after the last recorded change
+    fetched = _hours(tweets["retrieved_at"])
+    last_change = np.full(len(tweets), -np.inf)
+    np.maximum.at(last_change, pos, _hours(rows["retrieved_at"]))
+    tail = np.flatnonzero(~np.isnan(fetched) & (fetched > last_change) & np.isfinite(last_change))
+
+    hours = np.r_[_hours(rows["retrieved_at"]), fetched[tail]]
+    pos = np.r_[pos, tail]
+    order = np.lexsort((hours, pos))
+    pos, hours = pos[order], hours[order]
+
+    def deltas(cols) -> np.ndarray:
+        d = np.nansum(np.vstack([rows[c].to_numpy(dtype=float, na_value=np.nan) for c in cols]), axis=0)
+        return np.r_[d, np.zeros(len(tail))][order]
+
+    counts = {c: tweets[c].to_numpy(dtype=float, na_value=np.nan) if c in tweets else np.full(len(tweets), np.nan)
+              for c in (*ENGAGEMENT_PARTS, "impression_count")}
+    parts = np.vstack([counts[c] for c in ENGAGEMENT_PARTS])
+    engagement = np.where(np.isnan(parts).all(axis=0), np.nan, np.nansum(parts, axis=0))
+    created = _hours(tweets["created_at"])
+    eng = counter_velocity(pos, hours, deltas(ENGAGEMENT_DELTAS), np.nan_to_num(engagement), created)
+    imp = counter_velocity(pos, hours, deltas((HISTORY_COUNTERS["impression_count"],)),
+                           np.nan_to_num(counts["impression_count"]), created)
+
+    n_changes = np.bincount(pd.Index(tid).get_indexer(rows["tweet_id"]), minlength=len(tweets))
+    out = pd.DataFrame({
+        "tweet_id": tid,
+        "username": tweets["username"],
+        "partei_kurz": tweets["partei_kurz"],
+        "created_at": tweets["created_at"],
+        "retrieved_at": tweets["retrieved_at"],
+        "n_changes": n_changes,
+        "age_hours": fetched - created,
+        "engagement_total": engagement,
+        "impression_count": counts["impression_count"],
+        "engagement_velocity_last": eng["velocity_last"],
+        "engagement_velocity_peak": eng["velocity_peak"],
+        "impression_velocity_last": imp["velocity_last"],
+        "impression_velocity_peak": imp["velocity_peak"],
+        "engagement_half_life_hours": eng["half_life"],
+        "saturation": np.where(eng["velocity_peak"] > 0, 1.0 - _safe_div(eng["velocity_last"], eng["velocity_peak"]), np.nan),
+    })
+    return out[out["n_changes"] > 0].reset_index(drop=True)
+
+
+# -------------------------------
+# Orchestration
+# -------------------------------
+def run(year: int, month: int, outdir: str, schema: str, tweets_tbl: str, top_n: int, loader_backend: str = "pandas"):
+    """
+    Velocity and saturation of the month's tweets (tweets_velocity_YYYYMM.csv) and the top_n
+    fastest rising ones by their latest engagement velocity (tweets_fastest_rising_YYYYMM.csv).
+    """
+    outdir_tweets = build_outdir(outdir, year, month, "tweets")
+    ym = f"{year:04d}{month:02d}"
+    tweets = _loaders.load_tweets_month(schema, tweets_tbl, month, year, columns=VELOCITY_COLUMNS, backend=loader_backend)
+    history = load_history_month(schema, tweets_tbl, year, month)
+    velocity = tweet_velocity(tweets, history)
+    if velocity.empty:
+        logger.warning("No engagement history for the tweets of %s. Outputs will be empty.", ym)
+
+    rising = velocity[velocity["engagement_velocity_last"] > 0]
+    rising = rising.sort_values(["engagement_velocity_last", "engagement_total"], ascending=False, kind="mergesort").head(top_n)
+    values = _loaders.load_tweet_columns(schema, tweets_tbl, rising["tweet_id"], TWEET_LAZY_COLUMNS, backend=loader_backend)
+    rising = hydrate_lazy_columns(rising, values, TWEET_LAZY_COLUMNS)
+
+    out_all = os.path.join(outdir_tweets, f"tweets_velocity_{ym}.csv")
+    out_rising = os.path.join(outdir_tweets, f"tweets_fastest_rising_{ym}.csv")
+    velocity.to_csv(out_all, index=False)
+    rising.to_csv(out_rising, index=False)
+    logger.info("Wrote tweet velocity -> %s (rows=%d)", out_all, len(velocity))
+    logger.info("Wrote fastest rising tweets -> %s (rows=%d)", out_rising, len(rising))
+
+
+# -------------------------------
+# Entrypoint (RunContext; parameters.yml by default)
+# -------------------------------
+def main(ctx: RunContext | None = None):
+    """Run for one RunContext (default: parameters.yml via Params)."""
+    ctx = resolve_context(ctx)
+    run(ctx.year, ctx.month, ctx.outdir, ctx.schema, tweets_tbl="tweets", top_n=ctx.top_n,
+        loader_backend=ctx.loader_backend)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+import pandas as pd
+
+# --- Project-style imports (match the metrics tasks) ---
+from ..io import loaders as _loaders
+from ..config.context import RunContext, resolve_context
+from ..utils.global_helpers import build_outdir, window_bounds, window_label
+from ..utils.metrics_helpers import rollup_individual_month, rollup_party_month
+from .tweets_daily_rollup import ROLLUP_TABLE
+
+# ---------- logging ----------
+os.makedirs("logs", exist_ok=True)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler("logs/tweets_metrics_window.log", mode="w"),
+        logging.StreamHandler(),
+    ],
+)
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------
+# Orchestration
+# -------------------------------
+def run_window(window: str, day, outdir: str, schema: str, x_profiles_tbl: str, rollup_tbl: str = ROLLUP_TABLE,
+               loader_backend: str = "pandas"):
+    """
+    Per-politician and per-party tweet metrics for one window (week, month, quarter, rollingN)
+    from the daily rollup. Roster and latest profiles are those of the month of the window's
+    last day, or of `day` for a window still in progress.
+    """
+    start, end = window_bounds(window, day)
+    last = min(end - timedelta(days=1), pd.Timestamp(day).date())
+    label = window_label(window, day)
+    logger.info("Computing %s window %s: [%s, %s)", window, label, start, end)
+
+    daily = _loaders.load_daily_rollup(schema, rollup_tbl, last.month, last.year, start, end, backend=loader_backend)
+    prof_latest = _loaders.load_latest_profiles(schema, x_profiles_tbl, last.month, last.year, backend=loader_backend)
+    if daily.empty:
+        logger.warning("No rollup rows for %s. Outputs will be empty.", label)
+
+    outdir_tweets = build_outdir(outdir, last.year, last.month, "tweets")
+    outputs = [
+        ("tweets_individual", "Per-politician tweet metrics", rollup_individual_month(daily, prof_latest)),
+        ("tweets_party", "Party-level tweet aggregates", rollup_party_month(daily, prof_latest)),
+    ]
+    for name, description, df_metric in outputs:
+        out_path = os.path.join(outdir_tweets, f"{name}_{label}.csv")
+        df_metric.to_csv(out_path, index=False)
+        logger.info("Wrote %s (%s) -> %s", description, label, out_path)
+
+
+def run(day, windows: Iterable[str], outdir: str, schema: str, x_profiles_tbl: str, rollup_tbl: str = ROLLUP_TABLE,
+        loader_backend: str = "pandas"):
+    """Compute every configured window ending on/containing `day`."""
+    for window in windows:
+        run_window(window, day, outdir, schema, x_profiles_tbl, rollup_tbl, loader_backend)
+
+
+# -------------------------------
+# Entrypoint
+# -------------------------------
+def main(argv=None, ctx: RunContext | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Tweet metrics for week / month / quarter / rollingN windows.")
+    parser.add_argument("--window", action="append", dest="windows",
+                        help="Window to compute (repeatable); default: parameters.yml windows.")
+    parser.add_argument("--date", dest="day", help="Day inside / ending the window (YYYY-MM-DD); default: yesterday (UTC).")
+    args = parser.parse_args(argv)
+
+    ctx = resolve_context(ctx)
+    windows = args.windows or list(ctx.windows)
+    if not windows:
+        raise SystemExit("No windows given (use --window or common.windows)")
+    day = (datetime.strptime(args.day, "%Y-%m-%d").date() if args.day
+           else datetime.now(timezone.utc).date() - timedelta(days=1))
+    run(day, windows, ctx.outdir, schema=ctx.schema, x_profiles_tbl="x_profiles", loader_backend=ctx.loader_backend)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import os
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# --- Project-style imports (match the profile metrics tasks) ---
+from ..io.db import engine                   # central engine built from Config.DATABASE_URL
+from ..io.cache import cached                # run-scoped dataset cache
+from ..config.context import RunContext, resolve_context
+from ..utils.global_helpers import politicians_table_name, normalize_party, window_bounds, build_outdir
+from ..utils.metrics_timeseries import daily_grid, rolling_robust_z
+
+# ---------- logging ----------
+os.makedirs("logs", exist_ok=True)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler("logs/x_profile_followers_daily.log", mode="w"),
+        logging.StreamHandler(),
+    ],
+)
+logger = logging.getLogger(__name__)
+
+# daily follower changes are scored against the previous BASELINE_DAYS days of the same account
+BASELINE_DAYS = 28
+MIN_BASELINE_DAYS = 7
+Z_THRESHOLD = 3.5          # |robust z| at or above which a day is flagged
+# floor of the baseline spread (followers/day): interpolated gaps make baselines flat, which
+# would otherwise flag every small change
+MIN_DAILY_SCALE = 1.0
+MIN_RELATIVE_SCALE = 1e-3  # ... and at least 0.1% of the account's followers per day
+FILL_METHOD = "interpolate"
+
+# -------------------------------
+# Data access
+# -------------------------------
+# Follower snapshots of the roster accounts in [:lb, :ub) plus each account's last snapshot
+# before :lb, which anchors the first days of the grid.
+POSTGRES_FOLLOWER_HISTORY_SQL_TMPL = r"""
+WITH roster AS (
+  SELECT xp.x_user_id, xp.username, xp.followers_count, xp.retrieved_at, p.partei_kurz
+  FROM {schema}.{x_profiles} xp
+  JOIN {schema}.{politicians} p
+    ON lower(xp.username) = lower(p.username)
+  WHERE xp.retrieved_at < :ub
+)
+SELECT * FROM roster WHERE retrieved_at >= :lb
+UNION ALL
+SELECT * FROM (
+  SELECT DISTINCT ON (x_user_id) *
+  FROM roster
+  WHERE retrieved_at < :lb
+  ORDER BY x_user_id, retrieved_at DESC
+) seed
+"""
+
+
+def load_follower_history(schema: str, x_profiles: str, politicians: str, lb: date, ub: date) -> pd.DataFrame:
+    """Follower snapshots of the roster between lb and ub (plus one anchor each), sorted by retrieved_at."""
+    key = (POSTGRES_FOLLOWER_HISTORY_SQL_TMPL, (schema, x_profiles, politicians), lb, ub)
+    return cached(key, lambda: _load_follower_history(schema, x_profiles, politicians, lb, ub))
+
+
+def _load_follower_history(schema: str, x_profiles: str, politicians: str, lb: date, ub: date) -> pd.DataFrame:
+    sql = POSTGRES_FOLLOWER_HISTORY_SQL_TMPL.format(schema=schema, x_profiles=x_profiles, politicians=politicians)
+    with engine.begin() as conn:
+        df = pd.read_sql(text(sql), conn, params={"lb": pd.Timestamp(lb, tz="UTC").to_pydatetime(),
+                                                   "ub": pd.Timestamp(ub, tz="UTC").to_pydatetime()})
+    df["retrieved_at"] = pd.to_datetime(df["retrieved_at"], utc=True, errors="coerce")
+    df["username"] = df["username"].astype(str).str.strip()
+    df = normalize_party(df)
+    df = df.sort_values(["retrieved_at", "x_user_id"], kind="mergesort").reset_index(drop=True)
+    logger.info("Loaded %d follower snapshots (%s .. %s) for %d accounts", len(df), lb, ub, df["x_user_id"].nunique())
+    return df
+
+
+# -------------------------------
+# Daily panel + anomalies
+# -------------------------------
+def follower_panel(history: pd.DataFrame, first: date, n_days: int, method: str = FILL_METHOD) -> dict:
+    """
+    Dense daily follower arrays for the days from `first`: accounts (x_user_id, latest username and
+    party), followers (accounts x days), observed (a snapshot that day) and delta (day-over-day change).
+    """
+    codes, accounts = pd.factorize(history["x_user_id"])
+    times = history["retrieved_at"].dt.tz_convert(None).to_numpy(dtype="datetime64[ns]")
+    followers, observed = daily_grid(codes, times, history["followers_count"].to_numpy(dtype=float),
+                                     len(accounts), np.datetime64(first, "ns"), n_days, method)
+    delta = np.full_like(followers, np.nan)
+    delta[:, 1:] = np.diff(followers, axis=1)
+    latest = history.drop_duplicates("x_user_id", keep="last").set_index("x_user_id")
+    info = latest.loc[accounts, ["username", "partei_kurz"]].rename_axis("x_user_id").reset_index()
+    return {"accounts": info, "days": pd.date_range(first, periods=n_days, freq="D").date,
+            "followers": followers, "observed": observed, "delta": delta}
+
+
+def follower_anomalies(panel: dict, window: int = BASELINE_DAYS, min_periods: int = MIN_BASELINE_DAYS) -> np.ndarray:
+    """Robust z-score of every day's follower change against the account's preceding `window` days."""
+    min_scale = np.fmax(MIN_DAILY_SCALE, MIN_RELATIVE_SCALE * panel["followers"])
+    return rolling_robust_z(panel["delta"], window, min_periods, min_scale)
+
+
+def _tidy(panel: dict, rows: np.ndarray, cols: np.ndarray, extra: dict) -> pd.DataFrame:
+    info = panel["accounts"].iloc[rows].reset_index(drop=True)
+    followers = panel["followers"][rows, cols]
+    out = pd.DataFrame({
+        "date": panel["days"][cols],
+        "username": info["username"],
+        "partei_kurz": info["partei_kurz"],
+        "x_user_id": info["x_user_id"],
+        "followers_count": pd.array(np.round(followers), dtype="Int64"),
+        "delta_followers": pd.array(np.round(panel["delta"][rows, cols]), dtype="Int64"),
+        "observed": panel["observed"][rows, cols],
+    })
+    return out.assign(**extra)
+
+
+# -------------------------------
+# Orchestration
+# -------------------------------
+def run(year: int, month: int, outdir: str, schema: str, x_profiles: str, method: str = FILL_METHOD):
+    """
+    Daily follower panel of the month (one row per account and day) and the days whose follower
+    change is a robust outlier for that account, as followers_daily_YYYYMM.csv and
+    follower_anomalies_YYYYMM.csv.
+    """
+    outdir_profiles = build_outdir(outdir, year, month, "profiles")
+    ym = f"{year:04d}{month:02d}"
+    first, nxt = window_bounds("month", date(year, month, 1))
+    # baseline days before the month (plus one for the first day-over-day change)
+    lb = first - timedelta(days=BASELINE_DAYS + 1)
+    history = load_follower_history(schema, x_profiles, politicians_table_name(month, year), lb, nxt)
+    if history.empty:
+        logger.warning("No follower snapshots for %s; nothing to write.", ym)
+        return
+
+    panel = follower_panel(history, lb, (nxt - lb).days, method)
+    z = follower_anomalies(panel)
+    month_cols = np.flatnonzero(panel["days"] >= first)
+    n_acc = len(panel["accounts"])
+
+    # panel: every account x month day with a value
+    rows, cols = np.repeat(np.arange(n_acc), len(month_cols)), np.tile(month_cols, n_acc)
+    present = ~np.isnan(panel["followers"][rows, cols])
+    daily = _tidy(panel, rows[present], cols[present], {})
+
+    # anomalies: month days with |z| >= threshold, strongest first. Only days with a snapshot are
+    # reported: the interpolated days before it share its change and would repeat the finding.
+    hit = (np.abs(z[:, month_cols]) >= Z_THRESHOLD) & panel["observed"][:, month_cols]
+    rows, cols = np.nonzero(hit)
+    cols = month_cols[cols]
+    scores = z[rows, cols]
+    anomalies = _tidy(panel, rows, cols, {
+        "z_score": scores,
+        "kind": np.where(scores > 0, "spike", "drop"),
+    })
+    anomalies = anomalies.iloc[np.argsort(-np.abs(scores), kind="stable")].drop(columns="observed")
+
+    out_daily = os.path.join(outdir_profiles, f"followers_daily_{ym}.csv")
+    out_anom = os.path.join(outdir_profiles, f"follower_anomalies_{ym}.csv")
+    daily.to_csv(out_daily, index=False)
+    anomalies.to_csv(out_anom, index=False)
+    logger.info("Wrote daily follower panel -> %s (%d accounts x %d days)", out_daily, n_acc, len(month_cols))
+    logger.info("Wrote follower anomalies -> %s (rows=%d)", out_anom, len(anomalies))
+
+
+# -------------------------------
+# Entrypoint (RunContext; parameters.yml by default)
+# -------------------------------
+def main(ctx: RunContext | None = None):
+    """Run for one RunContext (default: parameters.yml via Params)."""
+    ctx = resolve_context(ctx)
+    run(ctx.year, ctx.month, ctx.outdir, ctx.schema, x_profiles="x_profiles")
+
+
+if __name__ == "__main__":
+    main()
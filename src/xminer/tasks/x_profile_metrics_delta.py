@@ -3,7 +3,8 @@ from __future__ import annotations
 import os
 import logging
 from datetime import datetime
-from typing import List
+from functools import partial
+from typing import Iterable, List, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
@@ -11,9 +12,17 @@ from sqlalchemy import text
 
 # --- Project-style imports (match your existing script) ---
 from ..io.db import engine                   # central engine built from Config.DATABASE_URL
-from ..config.params import Params           # parameters class already used in production
+from ..io.cache import cached                # run-scoped dataset cache
+from ..config.context import RunContext, resolve_context
 from ..utils.global_helpers import politicians_table_name, normalize_party, UNION_MAP, month_bounds, prev_year_month, _safe_div, build_outdir
-from ..utils.metrics_helpers import MetricSpec, metric_individual_deltas, metric_party_delta_summary, metric_top_gainers_by_party, metric_top_gainers_global
+from ..utils.metrics_helpers import (
+    MetricSpec, uses_pushdown, run_concurrently, metric_individual_deltas, metric_party_delta_summary, metric_top_gainers_by_party,
+    metric_top_gainers_global, PARTY_DELTA_SUMMARY_AGGS, _finalize_party_delta_summary,
+)
+from ..utils.metrics_sql import compile_group_agg, read_group_agg, party_sql
+from .x_profiles_monthly_snapshot import (
+    ensure_month_snapshot, load_snapshots, year_month_key, SNAPSHOT_TABLE, POSTGRES_SNAPSHOT_READ_TMPL,
+)
 
 
 # ---------- logging ----------
@@ -54,7 +63,7 @@ WITH joined AS (
   FROM {schema}.{x_profiles} xp
   JOIN {schema}.{politicians} p
     ON lower(xp.username) = lower(p.username)
-  WHERE xp.retrieved_at < TIMESTAMPTZ '{ub_iso}'
+  WHERE xp.retrieved_at < :ub
 )
 SELECT *
 FROM joined
@@ -65,15 +74,25 @@ def load_month_snapshot(schema: str, x_profiles: str, politicians: str, year: in
     """
     Return the latest profile per username taken at/before the start of the next month.
     This effectively gives you a month-end snapshot (or the latest available before that).
+
+    Closed months are served from the prepared x_profiles_monthly_snapshot table
+    (materialized on first use); only the still-open month windows over x_profiles.
     """
     politicians = politicians_table_name(month, year)
+    key = (POSTGRES_SNAPSHOT_SQL_TMPL, (schema, x_profiles, politicians), year, month)
+    return cached(key, lambda: _load_month_snapshot(schema, x_profiles, politicians, year, month))
+
+
+def _load_month_snapshot(schema: str, x_profiles: str, politicians: str, year: int, month: int) -> pd.DataFrame:
+    if ensure_month_snapshot(schema, x_profiles, year, month):
+        df = load_snapshots(schema, politicians, [(year, month)])
+        logger.info("Loaded snapshot for %04d-%02d from %s: %d rows", year, month, "x_profiles_monthly_snapshot", len(df))
+        return df
+
     _, ub = month_bounds(year, month)  # use next month start as upper bound
-    ub_iso = ub.strftime("%Y-%m-%d %H:%M:%S%z")  # e.g., '2025-10-01 00:00:00+0000'
-    sql = POSTGRES_SNAPSHOT_SQL_TMPL.format(
-        schema=schema, x_profiles=x_profiles, politicians=politicians, ub_iso=ub_iso
-    )
+    sql = POSTGRES_SNAPSHOT_SQL_TMPL.format(schema=schema, x_profiles=x_profiles, politicians=politicians)
     with engine.begin() as conn:
-        df = pd.read_sql(text(sql), conn)
+        df = pd.read_sql(text(sql), conn, params={"ub": ub.to_pydatetime()})
 
     # Ensure expected dtypes
     if "created_at" in df:
@@ -119,6 +138,140 @@ def join_prev_curr(prev_df: pd.DataFrame, curr_df: pd.DataFrame) -> pd.DataFrame
 
     return merged
 
+# -------------------------------
+# SQL push-down (metrics_engine="sql")
+# -------------------------------
+# join_prev_curr() in SQL: outer join of both month-end snapshots on username,
+# party taken from the current month, float deltas as in pandas.
+POSTGRES_DELTA_SOURCE_TMPL = r"""
+WITH prev AS (
+{prev}
+), curr AS (
+{curr}
+)
+SELECT
+  CASE WHEN c.username IS NOT NULL THEN {party} END AS partei_kurz,
+  c.followers_count::float8 - p.followers_count::float8 AS delta_followers_count,
+  c.following_count::float8 - p.following_count::float8 AS delta_following_count,
+  c.tweet_count::float8 - p.tweet_count::float8 AS delta_tweet_count,
+  c.listed_count::float8 - p.listed_count::float8 AS delta_listed_count
+FROM curr c
+FULL OUTER JOIN prev p
+  ON btrim(c.username) = btrim(p.username)
+"""
+
+
+def _snapshot_source(schema: str, x_profiles: str, year: int, month: int, tag: str) -> tuple:
+    """SQL + params of load_month_snapshot() for one month; bind names are suffixed with `tag`."""
+    politicians = politicians_table_name(month, year)
+    if ensure_month_snapshot(schema, x_profiles, year, month):
+        sql = POSTGRES_SNAPSHOT_READ_TMPL.format(schema=schema, snapshot=SNAPSHOT_TABLE, politicians=politicians)
+        return sql.replace(":year_months", f":year_months_{tag}"), {f"year_months_{tag}": [year_month_key(year, month)]}
+    _, ub = month_bounds(year, month)
+    sql = POSTGRES_SNAPSHOT_SQL_TMPL.format(schema=schema, x_profiles=x_profiles, politicians=politicians)
+    return sql.replace(":ub", f":ub_{tag}"), {f"ub_{tag}": ub.to_pydatetime()}
+
+
+def sql_party_delta_summary(schema: str, x_profiles: str, year: int, month: int, **_) -> pd.DataFrame:
+    prev_y, prev_m = prev_year_month(year, month)
+    prev_sql, prev_params = _snapshot_source(schema, x_profiles, prev_y, prev_m, "prev")
+    curr_sql, curr_params = _snapshot_source(schema, x_profiles, year, month, "curr")
+    source = POSTGRES_DELTA_SOURCE_TMPL.format(prev=prev_sql, curr=curr_sql, party=party_sql("c.partei_kurz"))
+    float_cols = [col for col, _func in PARTY_DELTA_SUMMARY_AGGS.values() if col]
+    sql = compile_group_agg(source, ["partei_kurz"], PARTY_DELTA_SUMMARY_AGGS, float_cols)
+    result = read_group_agg(sql, {**prev_params, **curr_params}, PARTY_DELTA_SUMMARY_AGGS, _finalize_party_delta_summary)
+    logger.info("Computed metric_party_delta_summary in SQL with %d rows", len(result))
+    return result
+
+
+# -------------------------------
+# As-of comparisons (any number of dates from one history load)
+# -------------------------------
+# Every profile row of the roster accounts fetched before the month's upper bound; the profile
+# of an account at time t is its latest row with retrieved_at <= t.
+POSTGRES_PROFILE_HISTORY_SQL_TMPL = r"""
+SELECT
+  xp.x_user_id,
+  xp.username,
+  xp.name,
+  xp.followers_count,
+  xp.following_count,
+  xp.tweet_count,
+  xp.listed_count,
+  xp.retrieved_at,
+  p.partei_kurz
+FROM {schema}.{x_profiles} xp
+JOIN {schema}.{politicians} p
+  ON lower(xp.username) = lower(p.username)
+WHERE xp.retrieved_at < :ub
+"""
+
+
+def load_profile_history(schema: str, x_profiles: str, politicians: str, year: int, month: int) -> pd.DataFrame:
+    """Profile history of the month's roster up to the month's snapshot bound, sorted by retrieved_at."""
+    key = (POSTGRES_PROFILE_HISTORY_SQL_TMPL, (schema, x_profiles, politicians), year, month)
+    return cached(key, lambda: _load_profile_history(schema, x_profiles, politicians, year, month))
+
+
+def _load_profile_history(schema: str, x_profiles: str, politicians: str, year: int, month: int) -> pd.DataFrame:
+    _, ub = month_bounds(year, month)
+    sql = POSTGRES_PROFILE_HISTORY_SQL_TMPL.format(schema=schema, x_profiles=x_profiles, politicians=politicians)
+    with engine.begin() as conn:
+        df = pd.read_sql(text(sql), conn, params={"ub": ub.to_pydatetime()})
+    df["retrieved_at"] = pd.to_datetime(df["retrieved_at"], utc=True, errors="coerce")
+    df["username"] = df["username"].astype(str).str.strip()
+    df = normalize_party(df)
+    # merge_asof needs the history ordered by its time key
+    df = df.sort_values(["retrieved_at", "x_user_id"], kind="mergesort")
+    logger.info("Loaded profile history up to %s: %d rows, %d accounts", ub, len(df), df["x_user_id"].nunique())
+    return df.reset_index(drop=True)
+
+
+def profiles_asof(history: pd.DataFrame, times: Sequence[pd.Timestamp]) -> List[pd.DataFrame]:
+    """
+    Per timestamp, the latest profile row of every account at or before it (accounts without a row
+    by then are left out), resolved for all timestamps in one sorted as-of join. Accounts are keyed
+    by x_user_id and carry their latest username, so renamed accounts still line up across dates.
+    """
+    accounts = history["x_user_id"].drop_duplicates().to_numpy()
+    at = pd.DatetimeIndex(times)
+    at = at.tz_localize("UTC") if at.tz is None else at.tz_convert("UTC")
+    probes = pd.DataFrame({
+        "x_user_id": np.tile(accounts, len(at)),
+        "as_of": at.repeat(len(accounts)),
+        "_probe": np.arange(len(at)).repeat(len(accounts)),
+    }).sort_values("as_of", kind="mergesort")
+    found = pd.merge_asof(probes, history, left_on="as_of", right_on="retrieved_at", by="x_user_id",
+                          direction="backward", allow_exact_matches=True)
+    found = found[found["retrieved_at"].notna()]
+    latest = history.drop_duplicates("x_user_id", keep="last").set_index("x_user_id")["username"]
+    found = found.assign(username=found["x_user_id"].map(latest))
+    return [found.loc[found["_probe"] == i].drop(columns=["_probe", "as_of"]).reset_index(drop=True)
+            for i in range(len(at))]
+
+
+def parse_comparison(spec: str, as_of: pd.Timestamp) -> Tuple[str, pd.Timestamp]:
+    """(label, timestamp) of a comparison: 'week', '<N>d' (N days before as_of) or 'YYYY-MM-DD' (since that day)."""
+    spec = str(spec).strip().lower()
+    if spec == "week":
+        return "week", as_of - pd.Timedelta(days=7)
+    if spec.endswith("d") and spec[:-1].isdigit():
+        return spec, as_of - pd.Timedelta(days=int(spec[:-1]))
+    try:
+        day = pd.Timestamp(spec)
+    except ValueError:
+        raise ValueError(f"Unknown profile comparison {spec!r}; expected week, <N>d or YYYY-MM-DD") from None
+    day = day.tz_localize("UTC") if day.tz is None else day.tz_convert("UTC")
+    return f"since_{day:%Y%m%d}", day
+
+
+def asof_delta_frames(history: pd.DataFrame, as_of: pd.Timestamp, comparisons: Iterable[str]) -> dict:
+    """{label: join_prev_curr frame of the profiles at each comparison date vs. at `as_of`}."""
+    parsed = [parse_comparison(spec, as_of) for spec in comparisons]
+    curr, *prevs = profiles_asof(history, [as_of, *(ts for _, ts in parsed)])
+    return {label: join_prev_curr(prev, curr) for (label, _), prev in zip(parsed, prevs)}
+
+
 # -------------------------------
 # Orchestration
 # -------------------------------
@@ -133,6 +286,7 @@ def build_delta_metrics(top_n: int) -> List[MetricSpec]:
             name="party_delta_summary",
             description="Aggregated MoM deltas by party",
             compute=metric_party_delta_summary,
+            pushdown=sql_party_delta_summary,
         ),
         MetricSpec(
             name="top_gainers_by_party",
@@ -147,60 +301,81 @@ def build_delta_metrics(top_n: int) -> List[MetricSpec]:
     ]
 
 
-def run(year: int, month: int, outdir: str, schema: str, x_profiles: str, politicians: str, top_n: int):
+def run(year: int, month: int, outdir: str, schema: str, x_profiles: str, politicians: str, top_n: int,
+        metrics_engine: str = "pandas", workers: int = 1, comparisons: Iterable[str] = ()):
     """
     Compute month-over-month metrics for the target year-month vs its previous month.
     Writes one CSV per metric into outdir with the suffix YYYYMM (the *current* month).
+    Each of `comparisons` (see parse_comparison) adds the same metrics for the month-end profiles
+    vs. that date, as <metric>_<label>_YYYYMM.csv.
     """
     outdir_profiles = build_outdir(outdir, year, month, "profiles")
     ym = f"{year:04d}{month:02d}"
     prev_y, prev_m = prev_year_month(year, month)
 
-    prev_snap = load_month_snapshot(schema=schema, x_profiles=x_profiles, politicians=politicians,
-                                    year=prev_y, month=prev_m)
-    curr_snap = load_month_snapshot(schema=schema, x_profiles=x_profiles, politicians=politicians,
-                                    year=year, month=month)
-
-    # Guard rails
-    if prev_snap.empty or curr_snap.empty:
-        logger.warning("One of the snapshots is empty (prev=%d rows, curr=%d rows). Outputs may be empty.",
-                       len(prev_snap), len(curr_snap))
-
-    delta_df = join_prev_curr(prev_snap, curr_snap)
-
-    required_cols = {
-        "username", "partei_kurz",
-        "followers_count_prev", "followers_count_curr",
-        "following_count_prev", "following_count_curr",
-        "tweet_count_prev", "tweet_count_curr",
-        "listed_count_prev", "listed_count_curr",
-        "retrieved_at_prev", "retrieved_at_curr",
-    }
-    missing = required_cols - set(delta_df.columns)
-    if missing:
-        logger.warning("Missing expected columns after join: %s. Some metrics may be partial.", sorted(missing))
-
-    for spec in build_delta_metrics(top_n=top_n):
-        out = spec.compute(delta_df)
+    specs = build_delta_metrics(top_n=top_n)
+    source = dict(schema=schema, x_profiles=x_profiles, year=year, month=month)
+
+    delta_df = None
+    if any(not uses_pushdown(spec, metrics_engine) for spec in specs):
+        prev_snap = load_month_snapshot(schema=schema, x_profiles=x_profiles, politicians=politicians,
+                                        year=prev_y, month=prev_m)
+        curr_snap = load_month_snapshot(schema=schema, x_profiles=x_profiles, politicians=politicians,
+                                        year=year, month=month)
+
+        # Guard rails
+        if prev_snap.empty or curr_snap.empty:
+            logger.warning("One of the snapshots is empty (prev=%d rows, curr=%d rows). Outputs may be empty.",
+                           len(prev_snap), len(curr_snap))
+
+        delta_df = join_prev_curr(prev_snap, curr_snap)
+
+        required_cols = {
+            "username", "partei_kurz",
+            "followers_count_prev", "followers_count_curr",
+            "following_count_prev", "following_count_curr",
+            "tweet_count_prev", "tweet_count_curr",
+            "listed_count_prev", "listed_count_curr",
+            "retrieved_at_prev", "retrieved_at_curr",
+        }
+        missing = required_cols - set(delta_df.columns)
+        if missing:
+            logger.warning("Missing expected columns after join: %s. Some metrics may be partial.", sorted(missing))
+
+    def compute_and_write(spec: MetricSpec) -> str:
+        out = spec.pushdown(**source) if uses_pushdown(spec, metrics_engine) else spec.compute(delta_df)
         out_path = os.path.join(outdir_profiles, f"{spec.name}_{ym}.csv")
         out.to_csv(out_path, index=False)
+        return out_path
+
+    # specs only read `delta_df`; run them side by side and log in spec order
+    out_paths = run_concurrently([partial(compute_and_write, spec) for spec in specs], workers)
+    for spec, out_path in zip(specs, out_paths):
         logger.info("Wrote %s -> %s", spec.description, out_path)
 
+    if comparisons:
+        # all comparison dates are resolved against one load of the profile history
+        history = load_profile_history(schema, x_profiles, politicians_table_name(month, year), year, month)
+        as_of = month_bounds(year, month)[1] - pd.Timedelta(microseconds=1)  # month-end: retrieved_at < bound
+        for label, frame in asof_delta_frames(history, as_of, comparisons).items():
+            for spec in specs:
+                out_path = os.path.join(outdir_profiles, f"{spec.name}_{label}_{ym}.csv")
+                spec.compute(frame).to_csv(out_path, index=False)
+                logger.info("Wrote %s (%s) -> %s", spec.description, label, out_path)
+
 
 # -------------------------------
-# Entrypoint (parameters.yml only)
+# Entrypoint (RunContext; parameters.yml by default)
 # -------------------------------
-if __name__ == "__main__":
-    # pull parameters the same way as your monthly script
-    year = int(getattr(Params, "year", datetime.now().year))
-    month = int(getattr(Params, "month", datetime.now().month))
-    outdir = getattr(Params, "outdir", "output")
-    top_n = int(getattr(Params, "top_n", 10))
-    if not (1 <= month <= 12):
-        raise SystemExit("Month must be in 1..12")
-
-    # Hard-coded table identifiers per request (same as your other script)
-    schema = "public"
+def main(ctx: RunContext | None = None):
+    """Run for one RunContext (default: parameters.yml via Params)."""
+    ctx = resolve_context(ctx)
+    # Hard-coded table identifiers per request
     x_profiles_tbl = "x_profiles"
     politicians_tbl = "politicians"
-    run(year, month, outdir, schema, x_profiles_tbl, politicians_tbl, top_n)
+    run(ctx.year, ctx.month, ctx.outdir, ctx.schema, x_profiles_tbl, politicians_tbl, ctx.top_n,
+        metrics_engine=ctx.metrics_engine, workers=ctx.metrics_workers, comparisons=ctx.profile_comparisons)
+
+
+if __name__ == "__main__":
+    main()
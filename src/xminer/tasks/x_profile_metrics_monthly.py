@@ -4,17 +4,19 @@ import os
 import logging
 
 from datetime import datetime
+from functools import partial
 from typing import List
 
 
 import pandas as pd
-from sqlalchemy import text
 
 # --- Project-style imports (match fetch_tweets) ---
-from ..io.db import engine  # central engine built from Config.DATABASE_URL
-from ..config.params import Params  # parameters class already used in production
+from ..io import loaders as _loaders  # shared loaders + run-scoped dataset cache
+from ..io.loaders import POSTGRES_LATEST_PROFILES_TMPL
+from ..config.context import RunContext, resolve_context
 from ..utils.global_helpers import politicians_table_name, normalize_party, UNION_MAP, build_outdir
-from ..utils.metrics_helpers import MetricSpec, metric_individual_base, metric_party_summary, metric_top_accounts_by_party, metric_top_accounts_global
+from ..utils.metrics_helpers import MetricSpec, uses_pushdown, run_concurrently, metric_individual_base, metric_party_summary, metric_top_accounts_by_party, metric_top_accounts_global
+from ..utils.metrics_sql import sql_party_summary
 
 # ---------- logging ----------
 os.makedirs("logs", exist_ok=True)
@@ -31,57 +33,12 @@ logger = logging.getLogger(__name__)
 # -------------------------------
 # Data access
 # -------------------------------
-POSTGRES_LATEST_SQL_TMPL = r"""
-WITH joined AS (
-  SELECT
-    xp.username,
-    xp.x_user_id,
-    xp.name,
-    xp.created_at,
-    xp.verified,
-    xp.protected,
-    xp.followers_count,
-    xp.following_count,
-    xp.tweet_count,
-    xp.listed_count,
-    xp.location,
-    xp.description,
-    xp.retrieved_at,
-    p.partei_kurz,
-    p.geschlecht,
-    p.geburtsdatum,
-    ROW_NUMBER() OVER (PARTITION BY lower(xp.username) ORDER BY xp.retrieved_at DESC) AS rn
-  FROM {schema}.{x_profiles} xp
-  JOIN {schema}.{politicians} p
-    ON lower(xp.username) = lower(p.username)
-)
-SELECT *
-FROM joined
-WHERE rn = 1
-"""
+# Same latest-profile query as the tweet tasks; shared through io.loaders and the run's dataset cache.
+POSTGRES_LATEST_SQL_TMPL = POSTGRES_LATEST_PROFILES_TMPL
 
-def load_latest_profiles(schema: str, x_profiles: str, month: int, year: int) -> pd.DataFrame:
+def load_latest_profiles(schema: str, x_profiles: str, month: int, year: int, backend: str = "pandas") -> pd.DataFrame:
     """Return one latest row per username joined with politician attributes."""
-    politicians = politicians_table_name(month, year)
-    logger.info("Joining x_profiles with table: %s.%s", schema, politicians)
-    sql = POSTGRES_LATEST_SQL_TMPL.format(schema=schema, x_profiles=x_profiles, politicians=politicians)
-    with engine.begin() as conn:
-        df = pd.read_sql(text(sql), conn)
-    # Ensure expected dtypes
-    if "created_at" in df:
-        df["created_at"] = pd.to_datetime(df["created_at"], utc=True, errors="coerce")
-    if "retrieved_at" in df:
-        df["retrieved_at"] = pd.to_datetime(df["retrieved_at"], utc=True, errors="coerce")
-    if "geburtsdatum" in df:
-        df["geburtsdatum"] = pd.to_datetime(df["geburtsdatum"], utc=True, errors="coerce").dt.date
-    # Normalize username case
-    if "username" in df:
-        df["username"] = df["username"].astype(str).str.strip()
-
-    # NEW: normalize CDU/CSU union
-    df = normalize_party(df)
-    
-    return df
+    return _loaders.load_latest_profiles(schema, x_profiles, month, year, backend=backend)
 
 # -------------------------------
 # Orchestration
@@ -98,6 +55,7 @@ def build_metrics(top_n: int) -> List[MetricSpec]:
             name="party_summary",
             description="Aggregated metrics by party",
             compute=metric_party_summary,
+            pushdown=sql_party_summary,
         ),
         MetricSpec(
             name="top_accounts_by_party",
@@ -112,11 +70,13 @@ def build_metrics(top_n: int) -> List[MetricSpec]:
     ]
 
 
-def run(year: int, month: int, outdir: str, schema: str, x_profiles: str, top_n: int):
+def run(year: int, month: int, outdir: str, schema: str, x_profiles: str, top_n: int, metrics_engine: str = "pandas", workers: int = 1,
+        loader_backend: str = "pandas"):
     outdir_profiles = build_outdir(outdir, year, month, "profiles")
     ym = f"{year:04d}{month:02d}"
+    source = dict(schema=schema, x_profiles=x_profiles, year=year, month=month)
 
-    latest = load_latest_profiles(schema=schema, x_profiles=x_profiles, month=month, year=year)
+    latest = load_latest_profiles(schema=schema, x_profiles=x_profiles, month=month, year=year, backend=loader_backend)
 
     required_cols = {
         "username", "partei_kurz", "created_at", "verified", "protected",
@@ -126,25 +86,29 @@ def run(year: int, month: int, outdir: str, schema: str, x_profiles: str, top_n:
     if missing:
         logger.warning("Missing columns in joined dataset: %s. Some metrics may be partial.", sorted(missing))
 
-    for spec in build_metrics(top_n=top_n):
-        df_metric = spec.compute(latest)
+    def compute_and_write(spec: MetricSpec) -> str:
+        df_metric = spec.pushdown(**source) if uses_pushdown(spec, metrics_engine) else spec.compute(latest)
         out_path = os.path.join(outdir_profiles, f"{spec.name}_{ym}.csv")
         df_metric.to_csv(out_path, index=False)
+        return out_path
+
+    # specs only read `latest`; run them side by side and log in spec order
+    specs = build_metrics(top_n=top_n)
+    out_paths = run_concurrently([partial(compute_and_write, spec) for spec in specs], workers)
+    for spec, out_path in zip(specs, out_paths):
         logger.info("Wrote %s -> %s", spec.description, out_path)
 
 # -------------------------------
-# Entrypoint (parameters.yml only)
+# Entrypoint (RunContext; parameters.yml by default)
 # -------------------------------
-if __name__ == "__main__":
-    # Read all parameters from parameters.yml via Params
-    year = int(getattr(Params, "year", datetime.now().year))
-    month = int(getattr(Params, "month", datetime.now().month))
-    outdir = getattr(Params, "outdir", "output")
-    top_n = int(getattr(Params, "top_n", 10))
-    if not (1 <= month <= 12):
-        raise SystemExit("Month must be in 1..12")
-
+def main(ctx: RunContext | None = None):
+    """Run for one RunContext (default: parameters.yml via Params)."""
+    ctx = resolve_context(ctx)
     # Hard-coded table identifiers per request
-    schema = "public"
     x_profiles_tbl = "x_profiles"
-    run(year, month, outdir, schema, x_profiles_tbl, top_n)
+    run(ctx.year, ctx.month, ctx.outdir, ctx.schema, x_profiles_tbl, ctx.top_n, metrics_engine=ctx.metrics_engine,
+        workers=ctx.metrics_workers, loader_backend=ctx.loader_backend)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import os
+import argparse
+import logging
+from datetime import datetime, timezone
+from typing import Iterable, List, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+
+# --- Project-style imports (match the metrics tasks) ---
+from ..io.db import engine                   # central engine built from Config.DATABASE_URL
+from ..config.context import RunContext, resolve_context
+from ..utils.global_helpers import month_bounds, prev_year_month, normalize_party
+
+# ---------- logging ----------
+os.makedirs("logs", exist_ok=True)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler("logs/x_profiles_monthly_snapshot.log", mode="w"),
+        logging.StreamHandler(),
+    ],
+)
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TABLE = "x_profiles_monthly_snapshot"
+
+# -------------------------------
+# DDL / SQL
+# -------------------------------
+# One row per (month, account, lowercased username): the latest x_profiles row
+# retrieved before the month's upper bound. Keeping the username in the key makes
+# the read side (latest row per lower(username) joined to the roster) identical to
+# the old windowed query over the full x_profiles history. Profiles stored without an
+# x_user_id are kept too (that query read them), keyed by their username alone.
+CREATE_SNAPSHOT_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {schema}.{snapshot} (
+    year_month       INTEGER      NOT NULL,   -- YYYYMM
+    x_user_id        BIGINT,
+    username         TEXT,
+    username_key     TEXT         NOT NULL,   -- lower(username)
+    name             TEXT,
+    created_at       TIMESTAMPTZ,
+    verified         BOOLEAN,
+    protected        BOOLEAN,
+    followers_count  BIGINT,
+    following_count  BIGINT,
+    tweet_count      BIGINT,
+    listed_count     BIGINT,
+    location         TEXT,
+    description      TEXT,
+    retrieved_at     TIMESTAMPTZ,
+    snapshot_upper   TIMESTAMPTZ  NOT NULL,
+    materialized_at  TIMESTAMPTZ  NOT NULL DEFAULT now()
+);
+-- tables created before profiles without x_user_id were kept
+ALTER TABLE {schema}.{snapshot} ALTER COLUMN x_user_id DROP NOT NULL;
+DROP INDEX IF EXISTS {schema}.ux_{snapshot}_ym_uid;
+CREATE UNIQUE INDEX IF NOT EXISTS ux_{snapshot}_ym_account
+ON {schema}.{snapshot} (year_month, (COALESCE(x_user_id, -1)), username_key);
+"""
+
+MATERIALIZE_SNAPSHOT_SQL_TMPL = r"""
+INSERT INTO {schema}.{snapshot} (
+    year_month, x_user_id, username, username_key, name, created_at, verified, protected,
+    followers_count, following_count, tweet_count, listed_count,
+    location, description, retrieved_at, snapshot_upper
+)
+SELECT DISTINCT ON (COALESCE(xp.x_user_id, -1), lower(xp.username))
+    :year_month,
+    xp.x_user_id,
+    xp.username,
+    COALESCE(lower(xp.username), ''),
+    xp.name,
+    xp.created_at,
+    xp.verified,
+    xp.protected,
+    xp.followers_count,
+    xp.following_count,
+    xp.tweet_count,
+    xp.listed_count,
+    xp.location,
+    xp.description,
+    xp.retrieved_at,
+    :ub
+FROM {schema}.{x_profiles} xp
+WHERE xp.retrieved_at < :ub
+ORDER BY COALESCE(xp.x_user_id, -1), lower(xp.username), xp.retrieved_at DESC
+ON CONFLICT (year_month, (COALESCE(x_user_id, -1)), username_key) DO NOTHING
+"""
+
+# latest snapshot row per username for the requested months, joined with politician attributes
+POSTGRES_SNAPSHOT_READ_TMPL = r"""
+WITH joined AS (
+  SELECT
+    s.username,
+    s.x_user_id,
+    s.name,
+    s.created_at,
+    s.verified,
+    s.protected,
+    s.followers_count,
+    s.following_count,
+    s.tweet_count,
+    s.listed_count,
+    s.location,
+    s.description,
+    s.retrieved_at,
+    p.partei_kurz,
+    p.geschlecht,
+    p.geburtsdatum,
+    s.year_month,
+    ROW_NUMBER() OVER (PARTITION BY s.year_month, s.username_key ORDER BY s.retrieved_at DESC) AS rn
+  FROM {schema}.{snapshot} s
+  JOIN {schema}.{politicians} p
+    ON s.username_key = lower(p.username)
+  WHERE s.year_month = ANY(:year_months)
+)
+SELECT *
+FROM joined
+WHERE rn = 1
+"""
+
+
+def year_month_key(year: int, month: int) -> int:
+    """Return the integer YYYYMM key used by the snapshot table."""
+    return int(year) * 100 + int(month)
+
+
+def is_closed_month(year: int, month: int, now: datetime | None = None) -> bool:
+    """A month is closed once its snapshot upper bound lies in the past."""
+    _, ub = month_bounds(year, month)
+    now = now or datetime.now(timezone.utc)
+    return ub <= pd.Timestamp(now)
+
+
+def ensure_table(schema: str = "public"):
+    with engine.begin() as conn:
+        conn.execute(text(CREATE_SNAPSHOT_TABLE_SQL.format(schema=schema, snapshot=SNAPSHOT_TABLE)))
+
+
+def snapshot_exists(schema: str, year: int, month: int) -> bool:
+    sql = text(f"SELECT 1 FROM {schema}.{SNAPSHOT_TABLE} WHERE year_month = :ym LIMIT 1")
+    with engine.begin() as conn:
+        return conn.execute(sql, {"ym": year_month_key(year, month)}).fetchone() is not None
+
+
+def materialize_month(schema: str, x_profiles: str, year: int, month: int, force: bool = False) -> int:
+    """
+    Fill the snapshot table for one *closed* month. Already materialized months are left
+    untouched unless `force` is set, in which case they are rebuilt. Returns rows written.
+    """
+    if not is_closed_month(year, month):
+        logger.info("Skipping snapshot for %04d-%02d: month is not closed yet.", year, month)
+        return 0
+
+    ym = year_month_key(year, month)
+    _, ub = month_bounds(year, month)
+    sql = MATERIALIZE_SNAPSHOT_SQL_TMPL.format(schema=schema, snapshot=SNAPSHOT_TABLE, x_profiles=x_profiles)
+    with engine.begin() as conn:
+        if force:
+            conn.execute(text(f"DELETE FROM {schema}.{SNAPSHOT_TABLE} WHERE year_month = :ym"), {"ym": ym})
+        res = conn.execute(text(sql), {"year_month": ym, "ub": ub.to_pydatetime()})
+    n = res.rowcount if res.rowcount is not None else 0
+    logger.info("Materialized snapshot %d: %d rows", ym, n)
+    return n
+
+
+def ensure_month_snapshot(schema: str, x_profiles: str, year: int, month: int) -> bool:
+    """Materialize a closed month on first use. Returns True when the snapshot table can serve the month."""
+    if not is_closed_month(year, month):
+        return False
+    ensure_table(schema)
+    if not snapshot_exists(schema, year, month):
+        materialize_month(schema, x_profiles, year, month)
+    return True
+
+
+def iter_year_months(start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """Inclusive list of (year, month) between start and end."""
+    (y, m), out = start, []
+    while (y, m) <= tuple(end):
+        out.append((y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+
+def backfill(schema: str, x_profiles: str, start: Tuple[int, int], end: Tuple[int, int], force: bool = False) -> int:
+    ensure_table(schema)
+    total = 0
+    for y, m in iter_year_months(start, end):
+        if force or not snapshot_exists(schema, y, m):
+            total += materialize_month(schema, x_profiles, y, m, force=force)
+        else:
+            logger.info("Snapshot %04d-%02d already materialized; skipping.", y, m)
+    return total
+
+
+def load_snapshots(schema: str, politicians: str, year_months: Iterable[Tuple[int, int]]) -> pd.DataFrame:
+    """
+    Read prepared month-end snapshots for any number of months in one query.
+    Returns one row per (year_month, username) joined with the given roster table.
+    """
+    keys = [year_month_key(y, m) for y, m in year_months]
+    sql = POSTGRES_SNAPSHOT_READ_TMPL.format(schema=schema, snapshot=SNAPSHOT_TABLE, politicians=politicians)
+    with engine.begin() as conn:
+        df = pd.read_sql(text(sql), conn, params={"year_months": keys})
+
+    if "created_at" in df:
+        df["created_at"] = pd.to_datetime(df["created_at"], utc=True, errors="coerce")
+    if "retrieved_at" in df:
+        df["retrieved_at"] = pd.to_datetime(df["retrieved_at"], utc=True, errors="coerce")
+    if "geburtsdatum" in df:
+        df["geburtsdatum"] = pd.to_datetime(df["geburtsdatum"], utc=True, errors="coerce").dt.date
+    if "username" in df:
+        df["username"] = df["username"].astype(str).str.strip()
+    return normalize_party(df)
+
+
+def run(year: int, month: int, schema: str, x_profiles: str):
+    """Make sure the current and previous month snapshots exist (closed months only)."""
+    ensure_table(schema)
+    prev_y, prev_m = prev_year_month(year, month)
+    for y, m in ((prev_y, prev_m), (year, month)):
+        if is_closed_month(y, m) and not snapshot_exists(schema, y, m):
+            materialize_month(schema, x_profiles, y, m)
+
+
+def _parse_ym(s: str) -> Tuple[int, int]:
+    y, m = s.split("-")
+    return int(y), int(m)
+
+
+def main(argv=None, ctx: RunContext | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Materialize month-end x_profiles snapshots.")
+    parser.add_argument("--schema", help="Default: the run context's schema.")
+    parser.add_argument("--x-profiles", default="x_profiles")
+    parser.add_argument("--from", dest="start", help="First month to backfill (YYYY-MM).")
+    parser.add_argument("--to", dest="end", help="Last month to backfill (YYYY-MM).")
+    parser.add_argument("--force", action="store_true", help="Rebuild months that already exist.")
+    args = parser.parse_args(argv)
+
+    ctx = resolve_context(ctx)
+    year, month = ctx.year, ctx.month
+    schema = args.schema or ctx.schema
+    if args.start or args.end:
+        start = _parse_ym(args.start) if args.start else (year, month)
+        end = _parse_ym(args.end) if args.end else (year, month)
+        n = backfill(schema, args.x_profiles, start, end, force=args.force)
+        logger.info("Backfill done: %d rows written", n)
+    else:
+        run(year, month, schema, args.x_profiles)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,7 +3,7 @@ from __future__ import annotations
 import json, math, os
 import pandas as pd
 import numpy as np
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from typing import Any, Dict, Iterable, List, Tuple
 from sqlalchemy import text, bindparam, BigInteger, Text, JSON
 
@@ -139,15 +139,46 @@ INSERT_TWEETS_STMT = text("""
 
 UNION_MAP = {"CDU": "CDU/CSU", "CSU": "CDU/CSU"}
 
+def map_categories(values: pd.Series, fn, missing=None) -> pd.Series:
+    """
+    Apply a vectorized string transform to a categorical once per category instead of once
+    per row. Categories mapping to the same label are merged; missing rows get fn(missing).
+    """
+    cats = pd.Series(list(values.cat.categories) + [missing], dtype=object)
+    labels = fn(cats).to_numpy(dtype=object).astype(str)
+    uniq, inverse = np.unique(labels, return_inverse=True)
+    codes = inverse[values.cat.codes.to_numpy()]  # code -1 (missing) picks the appended label
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniq), index=values.index, name=values.name)
+
+
+def _as_str(s: pd.Series) -> pd.Series:
+    """astype(str); pyarrow-backed missing values become "None" like DB-API None does."""
+    if isinstance(s.dtype, pd.ArrowDtype):
+        s = s.astype(object).where(s.notna(), None)
+    return s.astype(str)
+
+
+def _party_label(s: pd.Series) -> pd.Series:
+    return _as_str(s).str.strip().str.upper().replace(UNION_MAP)
+
+
 def normalize_party(df: pd.DataFrame) -> pd.DataFrame:
     if "partei_kurz" in df.columns:
-        df["partei_kurz"] = (
-            df["partei_kurz"]
-            .astype(str)
-            .str.strip()
-            .str.upper()
-            .replace(UNION_MAP)
-        )
+        col = df["partei_kurz"]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            df["partei_kurz"] = map_categories(col, _party_label)
+        else:
+            df["partei_kurz"] = _party_label(col)
+    return df
+
+
+def strip_usernames(df: pd.DataFrame) -> pd.DataFrame:
+    if "username" in df.columns:
+        col = df["username"]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            df["username"] = map_categories(col, lambda s: s.astype(str).str.strip())
+        else:
+            df["username"] = _as_str(col).str.strip()
     return df
 
 def month_bounds(year: int, month: int) -> Tuple[pd.Timestamp, pd.Timestamp]:
@@ -161,6 +192,40 @@ def month_bounds(year: int, month: int) -> Tuple[pd.Timestamp, pd.Timestamp]:
     return start, nxt
 
 
+def window_bounds(window: str, day) -> Tuple[date, date]:
+    """
+    Return [start_day, end_day) of a named window ending on/containing `day`:
+    "week" (ISO week), "month", "quarter", or "rollingN" (the N days up to and including `day`).
+    """
+    day = pd.Timestamp(day).date()
+    if window == "week":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    if window == "month":
+        start = day.replace(day=1)
+        return start, (pd.Timestamp(start) + pd.DateOffset(months=1)).date()
+    if window == "quarter":
+        start = day.replace(month=3 * ((day.month - 1) // 3) + 1, day=1)
+        return start, (pd.Timestamp(start) + pd.DateOffset(months=3)).date()
+    if window.startswith("rolling") and window[len("rolling"):].isdigit():
+        n = int(window[len("rolling"):])
+        return day - timedelta(days=n - 1), day + timedelta(days=1)
+    raise ValueError(f"Unknown window {window!r}; use week, month, quarter or rollingN")
+
+
+def window_label(window: str, day) -> str:
+    """File-name label of a window, e.g. 2025-W41, 202510, 2025Q4, rolling30_20251031."""
+    start, end = window_bounds(window, day)
+    if window == "week":
+        iso = start.isocalendar()
+        return f"{iso[0]:04d}-W{iso[1]:02d}"
+    if window == "month":
+        return f"{start.year:04d}{start.month:02d}"
+    if window == "quarter":
+        return f"{start.year:04d}Q{(start.month - 1) // 3 + 1}"
+    return f"{window}_{(end - timedelta(days=1)):%Y%m%d}"
+
+
 def prev_year_month(year: int, month: int) -> Tuple[int, int]:
     """Return (prev_year, prev_month)."""
     if month == 1:
@@ -168,9 +233,16 @@ def prev_year_month(year: int, month: int) -> Tuple[int, int]:
     return year, month - 1
 
 
+def _as_float(x):
+    """float64 view of a scalar / array / Series (nullable Int32/Float64 NA -> NaN)."""
+    if isinstance(x, (pd.Series, pd.Index)):
+        return x.to_numpy(dtype="float64", na_value=np.nan)
+    return x if x is None or np.isscalar(x) else np.asarray(x, dtype="float64")
+
+
 def _safe_div(a, b):
     with np.errstate(divide="ignore", invalid="ignore"):
-        res = np.divide(a, b)
+        res = np.divide(_as_float(a), _as_float(b))
     return np.where(~np.isfinite(res), np.nan, res)
 
 def build_outdir(base_outdir: str, year: int, month: int, channel: str) -> str:
@@ -0,0 +1,179 @@
+# src/xminer/utils/metrics_cube.py
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .metrics_helpers import _safe_div
+
+# -------------------------------
+# Grouping-sets cube
+# -------------------------------
+# One aggregate definition ({out: (col, func)}, as in metrics_helpers) evaluated for several
+# combinations of politician attributes at once. Every dimension is factorized once; per set
+# the combined code is sorted once and each aggregate is a segmented reduction over it.
+# Output is tidy: a `grouping` label per row plus one column per dimension (NaN where the
+# dimension is rolled up), in the row order of the SQL push-down (sets in the given order,
+# keys ascending, NULL last).
+CUBE_DIMENSIONS = ("partei_kurz", "geschlecht", "age_band", "wp_wkr_land", "wp_mandatsart", "wp_liste")
+CUBE_FUNCS = ("size", "count", "sum", "mean", "median")
+GRAND_TOTAL = "all"
+DEFAULT_CUBE_SETS = ("partei_kurz", "geschlecht+partei_kurz", "wp_wkr_land+partei_kurz", "age_band", GRAND_TOTAL)
+
+# age at the start of the month: "<30", "30-39", ..., "70+"
+AGE_BAND_EDGES = (30, 40, 50, 60, 70)
+
+# engagement over the tweets of the month, followers over the latest profile per politician
+TWEET_CUBE_AGGS = {
+    "tweets": (None, "size"),
+    "likes_sum": ("like_count", "sum"),
+    "impressions_sum": ("impression_count", "sum"),
+    "engagement_sum": ("engagement_total", "sum"),
+    "engagement_rate_mean": ("engagement_rate", "mean"),
+    "engagement_per_1k_followers_mean": ("engagement_per_1k_followers", "mean"),
+}
+PROFILE_CUBE_AGGS = {
+    "members": (None, "size"),
+    "followers_sum": ("followers_count", "sum"),
+    "followers_mean": ("followers_count", "mean"),
+    "followers_median": ("followers_count", "median"),
+}
+
+
+def parse_grouping_sets(specs: Iterable[str]) -> list:
+    """'geschlecht+partei_kurz' -> ('partei_kurz', 'geschlecht') (CUBE_DIMENSIONS order); 'all' -> () (grand total). Duplicates dropped."""
+    out, seen = [], set()
+    for spec in specs:
+        spec = str(spec).strip()
+        dims = () if spec == GRAND_TOTAL else tuple(d.strip() for d in spec.split("+"))
+        unknown = [d for d in dims if d not in CUBE_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown cube dimension(s) {unknown}; expected {CUBE_DIMENSIONS}")
+        dims = tuple(d for d in CUBE_DIMENSIONS if d in dims)
+        if dims not in seen:
+            seen.add(dims)
+            out.append(dims)
+    return out
+
+
+def grouping_label(dims: Sequence[str]) -> str:
+    return "+".join(dims) if dims else GRAND_TOTAL
+
+
+def cube_dimensions(sets: Sequence[tuple]) -> list:
+    """Dimensions used by any set, in CUBE_DIMENSIONS order."""
+    used = {d for dims in sets for d in dims}
+    return [d for d in CUBE_DIMENSIONS if d in used]
+
+
+def age_band_labels(edges: Sequence[int] = AGE_BAND_EDGES) -> list:
+    """One label per band: below the first edge, between consecutive edges, from the last edge on."""
+    return [f"<{edges[0]}", *(f"{lo}-{hi - 1}" for lo, hi in zip(edges, edges[1:])), f"{edges[-1]}+"]
+
+
+def age_band(birth: pd.Series, ref: date) -> pd.Series:
+    """Age band at `ref` from birth dates (full years, as Postgres age()); NaN when unknown."""
+    b = pd.to_datetime(birth, errors="coerce")
+    years = ref.year - b.dt.year - ((b.dt.month > ref.month) | ((b.dt.month == ref.month) & (b.dt.day > ref.day)))
+    labels = age_band_labels()
+    idx = np.searchsorted(np.asarray(AGE_BAND_EDGES), years.to_numpy(dtype=float), side="right")
+    return pd.Series(np.asarray(labels, dtype=object)[np.clip(idx, 0, len(labels) - 1)], index=birth.index).where(years.notna())
+
+
+def _segments(key: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(order, segment starts, segment keys) of the stable sort of `key`."""
+    order = np.argsort(key, kind="stable")
+    ks = key[order]
+    starts = np.flatnonzero(np.r_[True, ks[1:] != ks[:-1]]) if len(ks) else np.array([], dtype=np.intp)
+    return order, starts, ks[starts]
+
+
+def _reduce(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Per-segment sums (zeros when there are no rows at all)."""
+    return np.add.reduceat(values, starts) if len(values) else np.zeros(len(starts), dtype=values.dtype)
+
+
+def _segment_median(key: np.ndarray, v: np.ndarray, ok: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Median of the valid values per segment (mean of the two middle ones), NaN for segments without values."""
+    if not len(v):
+        return np.full(len(starts), np.nan)
+    vs = v[np.lexsort((np.where(ok, v, np.inf), ~ok, key))]  # by key; valid values first, ascending
+    lo = np.clip(starts + (counts - 1) // 2, 0, len(vs) - 1)
+    hi = np.clip(starts + counts // 2, 0, len(vs) - 1)
+    return np.where(counts > 0, (vs[lo] + vs[hi]) / 2.0, np.nan)
+
+
+def cube_aggregate(df: pd.DataFrame, sets: Sequence[tuple], aggs: dict) -> pd.DataFrame:
+    """Aggregate `df` over every grouping set (tuples of dimension columns; () = grand total)."""
+    if not sets:
+        raise ValueError("No grouping sets given")
+    unknown = {func for _, func in aggs.values()} - set(CUBE_FUNCS)
+    if unknown:
+        raise ValueError(f"Aggregates {sorted(unknown)} are not supported in the cube; expected {CUBE_FUNCS}")
+    dims = cube_dimensions(sets)
+    n = len(df)
+    # plain object values, so categoricals sort by value and NULLs share one code
+    factors = {d: pd.factorize(df[d].astype(object).where(df[d].notna(), np.nan), sort=True, use_na_sentinel=False)
+               for d in dims}
+    inputs = {}
+    for col in {c for c, _ in aggs.values() if c is not None}:
+        s = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+        v = s.to_numpy(dtype=float, na_value=np.nan)
+        is_int = pd.api.types.is_integer_dtype(s.dtype) or pd.api.types.is_bool_dtype(s.dtype)
+        inputs[col] = (v, ~np.isnan(v), is_int)
+
+    parts = []
+    for dims_set in sets:
+        shape = [len(factors[d][1]) for d in dims_set]
+        if dims_set:
+            key = np.ravel_multi_index([factors[d][0] for d in dims_set], shape)
+        else:
+            key = np.zeros(n, dtype=np.int64)
+        order, starts, keys = _segments(key)
+        if not dims_set and not n:
+            starts, keys = np.array([0]), np.array([0])  # the grand total exists even without rows
+        out = {"grouping": np.full(len(starts), grouping_label(dims_set), dtype=object)}
+        if dims_set:
+            for d, codes in zip(dims_set, np.unravel_index(keys, shape)):
+                out[d] = np.asarray(factors[d][1], dtype=object)[codes]
+        for out_col, (col, func) in aggs.items():
+            if func == "size":
+                out[out_col] = np.diff(np.r_[starts, n]).astype(np.int64)
+                continue
+            v, ok, is_int = inputs[col]
+            vo, oko = v[order], ok[order]
+            counts = _reduce(oko.astype(np.int64), starts)
+            if func == "count":
+                out[out_col] = counts
+            elif func == "sum":
+                total = _reduce(np.where(oko, vo, 0.0), starts)
+                out[out_col] = total.astype(np.int64) if is_int else total
+            elif func == "mean":
+                out[out_col] = _safe_div(_reduce(np.where(oko, vo, 0.0), starts), counts.astype(float))
+            else:  # median
+                out[out_col] = _segment_median(key, v, ok, starts, counts)
+        parts.append(pd.DataFrame(out))
+    return pd.concat(parts, ignore_index=True).reindex(columns=["grouping", *dims, *aggs])
+
+
+def finalize_cube(tweets: pd.DataFrame, profiles: pd.DataFrame, dims: Sequence[str]) -> pd.DataFrame:
+    """
+    Engagement and follower cubes side by side, one row per grouping and key (sets in their
+    order, keys ascending, NULL last), plus the total engagement rate. Counts and sums of a
+    key missing on one side are 0.
+    """
+    on = ["grouping", *dims]
+    keys = pd.concat([tweets[on], profiles[on]], ignore_index=True).drop_duplicates()
+    out = keys.merge(tweets, on=on, how="left").merge(profiles, on=on, how="left")
+    zero = [c for c, (_, func) in {**TWEET_CUBE_AGGS, **PROFILE_CUBE_AGGS}.items() if func in ("size", "count", "sum")]
+    for c in zero:
+        if out[c].isna().any():
+            filled = out[c].fillna(0)
+            out[c] = filled.astype(np.int64) if (filled % 1 == 0).all() else filled
+    out["engagement_rate_total"] = _safe_div(out["engagement_sum"], out["impressions_sum"])
+    rank = {label: i for i, label in enumerate(dict.fromkeys(keys["grouping"]))}
+    out = out.sort_values(list(dims), na_position="last", kind="mergesort") if dims else out
+    return out.iloc[np.argsort(out["grouping"].map(rank).to_numpy(), kind="stable")].reset_index(drop=True)
@@ -1,6 +1,9 @@
+from __future__ import annotations
+
 import numpy as np
 import pandas as pd
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import timezone
 import logging
 
@@ -11,11 +14,125 @@ class MetricSpec:
     name: str  # slug used in filename
     description: str
     compute: callable  # function(df) -> DataFrame
+    columns: tuple | None = None  # raw tweet columns the compute reads (None = all)
+    lazy_columns: tuple = ()  # wide columns filled in only for the output rows (e.g. "text")
+    pushdown: callable | None = None  # same metric computed in Postgres: function(**source) -> DataFrame
+    board: Leaderboard | None = None  # leaderboard definition; boards of a run are computed in one pass
+    derived: tuple = ()  # DERIVED_COLUMNS the compute reads (resolved once per dataset by plan_metrics)
+    rollup: callable | None = None  # same metric from the daily rollup: function(daily_df, profiles_df) -> DataFrame
+
+
+METRICS_ENGINES = ("pandas", "sql", "rollup")
+
+
+def uses_pushdown(spec: MetricSpec, metrics_engine: str) -> bool:
+    """True when the spec runs as a SQL aggregate under the given engine ("pandas" | "sql" | "rollup")."""
+    if metrics_engine not in METRICS_ENGINES:
+        raise ValueError(f"Unknown metrics engine {metrics_engine!r}; expected one of {METRICS_ENGINES}")
+    return metrics_engine == "sql" and spec.pushdown is not None
+
+
+def uses_rollup(spec: MetricSpec, metrics_engine: str) -> bool:
+    """True when the spec is computed from the daily per-author rollup under the given engine."""
+    if metrics_engine not in METRICS_ENGINES:
+        raise ValueError(f"Unknown metrics engine {metrics_engine!r}; expected one of {METRICS_ENGINES}")
+    return metrics_engine == "rollup" and spec.rollup is not None
+
+
+def run_concurrently(tasks, workers: int = 1) -> list:
+    """
+    Call each zero-argument task on up to `workers` threads and return the results in task order.
+    Tasks share the loaded frames read-only (nothing is copied or pickled per task); the heavy
+    pandas/numpy kernels and the database reads release the GIL.
+    """
+    tasks = list(tasks)
+    if workers <= 1 or len(tasks) <= 1:
+        return [task() for task in tasks]
+    with ThreadPoolExecutor(max_workers=min(int(workers), len(tasks)), thread_name_prefix="metrics") as pool:
+        return list(pool.map(lambda task: task(), tasks))
+
+
+# Raw tweet column sets used to project the month loads
+TWEET_COUNT_COLUMNS = ("like_count", "reply_count", "retweet_count", "quote_count", "bookmark_count", "impression_count")
+TWEET_SUMMARY_COLUMNS = ("tweet_id", "author_id", "username", "created_at", *TWEET_COUNT_COLUMNS)
+TWEET_LEADERBOARD_COLUMNS = (*TWEET_SUMMARY_COLUMNS, "lang")
+TWEET_LAZY_COLUMNS = ("text",)
+
+
+def required_columns(specs) -> tuple | None:
+    """Union of the raw columns the given specs read; None when any spec needs everything."""
+    cols: list = []
+    for spec in specs:
+        if spec.columns is None:
+            return None
+        cols.extend(c for c in spec.columns if c not in cols)
+    return tuple(cols)
+
+
+def spec_inputs(spec: MetricSpec) -> tuple:
+    """Dataset columns a spec reads: its raw columns, declared derived columns and its board's metric."""
+    cols = [*(spec.columns or ()), *spec.derived]
+    if spec.board is not None:
+        cols.append(spec.board.metric)
+    return tuple(dict.fromkeys(cols))
+
+
+def plan_metrics(specs, store: ColumnStore) -> tuple:
+    """
+    Split specs into (runnable, skipped) against a dataset's ColumnStore. A spec runs when each
+    input is a frame column or a derived column whose inputs resolve (and its board's grouping
+    key exists). The derived inputs of runnable specs are computed here, once, before the specs
+    run concurrently over the shared store.
+    """
+    runnable, skipped = [], []
+    for spec in specs:
+        missing = [c for name in spec_inputs(spec) for c in store.missing(name)]
+        if spec.board is not None and spec.board.group_by is not None and not store.has_group(spec.board.group_by):
+            missing.append(spec.board.group_by)
+        if missing:
+            logger.warning("Skipping %s: missing input columns %s", spec.name, missing)
+            skipped.append(spec)
+        else:
+            runnable.append(spec)
+    for name in dict.fromkeys(c for spec in runnable for c in spec_inputs(spec)):
+        if name not in store.df.columns:
+            store[name]
+    return runnable, skipped
+
+
+def hydrate_lazy_columns(df: pd.DataFrame, values: pd.DataFrame, columns=TWEET_LAZY_COLUMNS, after: str = "created_at") -> pd.DataFrame:
+    """
+    Insert lazily fetched columns (keyed by tweet_id in `values`) into a small result frame,
+    right after `after` (where the eager loaders used to place them). Columns are added even
+    when there are no rows (or no values), so empty outputs keep the same header.
+    """
+    if "tweet_id" not in df.columns:
+        return df
+    lookup = values.drop_duplicates("tweet_id").set_index("tweet_id")
+    out = df.copy()
+    pos = out.columns.get_loc(after) + 1 if after in out.columns else len(out.columns)
+    for c in columns:
+        if c in out.columns:
+            continue
+        if c in lookup.columns:
+            filled = out["tweet_id"].astype(str).map(lookup[c]).to_numpy()
+        else:
+            filled = np.full(len(out), np.nan, dtype=object)
+        out.insert(pos, c, filled)
+        pos += 1
+    return out
+
+
+def _as_float(x):
+    """float64 view of a scalar / array / Series (nullable Int32/Float64 NA -> NaN)."""
+    if isinstance(x, (pd.Series, pd.Index)):
+        return x.to_numpy(dtype="float64", na_value=np.nan)
+    return x if x is None or np.isscalar(x) else np.asarray(x, dtype="float64")
 
 
 def _safe_div(a, b):
     with np.errstate(divide="ignore", invalid="ignore"):
-        res = np.divide(a, b)
+        res = np.divide(_as_float(a), _as_float(b))
     return np.where(~np.isfinite(res), np.nan, res)
 
 
@@ -50,44 +167,60 @@ def metric_individual_base(df: pd.DataFrame) -> pd.DataFrame:
     logger.info("Computed metric_individual_base with %d rows", len(result))
     return result
 
-def metric_party_summary(df: pd.DataFrame) -> pd.DataFrame:
-    if "partei_kurz" not in df.columns:
-        logger.warning("metric_party_summary skipped: 'party' column missing")
-        return pd.DataFrame()
-
-    g = df.groupby("partei_kurz", dropna=False)
-
-    # start with a simple members count
-    summary = g.size().rename("members").to_frame()
-
-    # add aggregations only if those columns exist
-    if "followers_count" in df.columns:
-        summary["followers_sum"] = g["followers_count"].sum()
-        summary["followers_mean"] = g["followers_count"].mean()
-        summary["followers_median"] = g["followers_count"].median()
-
-    if "following_count" in df.columns:
-        summary["following_mean"] = g["following_count"].mean()
-
-    if "tweet_count" in df.columns:
-        summary["tweet_mean"] = g["tweet_count"].mean()
-
-    if "listed_count" in df.columns:
-        summary["listed_mean"] = g["listed_count"].mean()
-
+# Aggregate definitions: output column -> (input column, reduction). Shared by the pandas
+# metrics below and by the SQL push-down engine in utils/metrics_sql.py.
+PARTY_SUMMARY_AGGS = {
+    "members": (None, "size"),
+    "followers_sum": ("followers_count", "sum"),
+    "followers_mean": ("followers_count", "mean"),
+    "followers_median": ("followers_count", "median"),
+    "following_mean": ("following_count", "mean"),
+    "tweet_mean": ("tweet_count", "mean"),
+    "listed_mean": ("listed_count", "mean"),
     # boolean shares (mean over 0/1)
-    if "verified" in df.columns:
-        summary["verified_share"] = g["verified"].mean()
-    if "protected" in df.columns:
-        summary["protected_share"] = g["protected"].mean()
-
+    "verified_share": ("verified", "mean"),
+    "protected_share": ("protected", "mean"),
+}
+
+
+def _grouped_aggs(df: pd.DataFrame, g, aggs: dict) -> pd.DataFrame:
+    """Apply an aggregate definition to a groupby, skipping inputs that are missing."""
+    summary = None
+    for out_col, (col, func) in aggs.items():
+        if func == "size":
+            res = g.size()
+        elif col in df.columns:
+            res = getattr(g[col], func)()
+        else:
+            continue
+        if summary is None:
+            summary = res.rename(out_col).to_frame()
+        else:
+            summary[out_col] = res
+    return summary
+
+
+def _finalize_party_summary(summary: pd.DataFrame) -> pd.DataFrame:
+    """Derived columns + ordering for metric_party_summary (summary has partei_kurz as a column)."""
     # derived metric if inputs present
     if {"followers_sum", "members"}.issubset(summary.columns):
         summary["followers_per_member"] = summary["followers_sum"] / summary["members"]
 
     # order by what's available
     sort_col = "followers_sum" if "followers_sum" in summary.columns else "members"
-    result = summary.reset_index().sort_values(sort_col, ascending=False)
+    return summary.sort_values(sort_col, ascending=False)
+
+
+def metric_party_summary(df: pd.DataFrame) -> pd.DataFrame:
+    if "partei_kurz" not in df.columns:
+        logger.warning("metric_party_summary skipped: 'party' column missing")
+        return pd.DataFrame()
+
+    g = df.groupby("partei_kurz", dropna=False, observed=True)
+
+    # members count plus the aggregations whose columns exist
+    summary = _grouped_aggs(df, g, PARTY_SUMMARY_AGGS)
+    result = _finalize_party_summary(summary.reset_index())
 
     logger.info("Computed metric_party_summary with %d rows", len(result))
     return result
@@ -98,7 +231,7 @@ def metric_top_accounts_by_party(df: pd.DataFrame, top_n: int = 10) -> pd.DataFr
     if not needed.issubset(df.columns):
         return pd.DataFrame()
     df = df.copy()
-    df["rank_in_party"] = df.groupby("partei_kurz")["followers_count"].rank(ascending=False, method="first")
+    df["rank_in_party"] = df.groupby("partei_kurz", observed=True)["followers_count"].rank(ascending=False, method="first")
     cols = [c for c in ["partei_kurz", "rank_in_party", "username", "name", "followers_count", "verified"] if c in df.columns]
     result = (
         df.loc[df["rank_in_party"] <= top_n, cols]
@@ -148,26 +281,28 @@ def metric_individual_deltas(delta_df: pd.DataFrame) -> pd.DataFrame:
     return result
 
 
+PARTY_DELTA_SUMMARY_AGGS = {"members_in_both": (None, "size")}
+for _col in ["followers_count", "following_count", "tweet_count", "listed_count"]:
+    for _func in ("sum", "mean", "median"):
+        PARTY_DELTA_SUMMARY_AGGS[f"delta_{_col}_{_func}"] = (f"delta_{_col}", _func)
+
+
+def _finalize_party_delta_summary(out: pd.DataFrame) -> pd.DataFrame:
+    # Order by total follower delta if available, else by members
+    sort_col = "delta_followers_count_sum" if "delta_followers_count_sum" in out.columns else "members_in_both"
+    return out.sort_values(sort_col, ascending=False)
+
+
 def metric_party_delta_summary(delta_df: pd.DataFrame) -> pd.DataFrame:
     """Aggregated month-over-month changes by party."""
     if "partei_kurz" not in delta_df:
         logger.warning("metric_party_delta_summary skipped: 'partei_kurz' missing")
         return pd.DataFrame()
 
-    g = delta_df.groupby("partei_kurz", dropna=False)
-
-    out = g.size().rename("members_in_both").to_frame()
+    g = delta_df.groupby("partei_kurz", dropna=False, observed=True)
 
-    for col in ["followers_count", "following_count", "tweet_count", "listed_count"]:
-        dcol = f"delta_{col}"
-        if dcol in delta_df:
-            out[f"{dcol}_sum"] = g[dcol].sum()
-            out[f"{dcol}_mean"] = g[dcol].mean()
-            out[f"{dcol}_median"] = g[dcol].median()
-
-    # Order by total follower delta if available, else by members
-    sort_col = "delta_followers_count_sum" if "delta_followers_count_sum" in out.columns else "members_in_both"
-    result = out.reset_index().sort_values(sort_col, ascending=False)
+    out = _grouped_aggs(delta_df, g, PARTY_DELTA_SUMMARY_AGGS)
+    result = _finalize_party_delta_summary(out.reset_index())
     logger.info("Computed metric_party_delta_summary with %d rows", len(result))
     return result
 
@@ -178,7 +313,7 @@ def metric_top_gainers_by_party(delta_df: pd.DataFrame, top_n: int = 10) -> pd.D
     if not needed.issubset(delta_df.columns):
         return pd.DataFrame()
     df = delta_df.copy()
-    df["rank_in_party_gain"] = df.groupby("partei_kurz")["delta_followers_count"].rank(ascending=False, method="first")
+    df["rank_in_party_gain"] = df.groupby("partei_kurz", observed=True)["delta_followers_count"].rank(ascending=False, method="first")
     cols = [
         "partei_kurz", "rank_in_party_gain",
         "username", "name_curr",
@@ -208,60 +343,104 @@ def metric_top_gainers_global(delta_df: pd.DataFrame, top_n: int = 10) -> pd.Dat
     logger.info("Computed metric_top_gainers_global with %d rows (top_n=%d)", len(result), top_n)
     return result
 
-def enrich_with_profiles(tweets_df: pd.DataFrame, prof_df: pd.DataFrame) -> pd.DataFrame:
-    """Attach latest profile fields used for follower-based ratios to each tweet."""
-    use_cols = [c for c in ["username", "name", "followers_count", "following_count", "tweet_count", "listed_count", "verified", "protected"] if c in prof_df.columns]
-    prof_small = prof_df[use_cols].drop_duplicates("username") if "username" in prof_df else prof_df
-    out = tweets_df.merge(prof_small, on="username", how="left", suffixes=("", "_profile"))
-    
-    # precompute per-tweet engagement components
-    for c in ["like_count", "reply_count", "retweet_count", "quote_count", "bookmark_count", "impression_count"]:
+PROFILE_ENRICH_COLUMNS = ("name", "followers_count", "following_count", "tweet_count", "listed_count", "verified", "protected")
+ENGAGEMENT_PARTS = ("like_count", "reply_count", "retweet_count", "quote_count", "bookmark_count")
+
+
+class ProfileIndex:
+    """
+    Latest profile attributes (PROFILE_ENRICH_COLUMNS) with a positional index on username,
+    built once per profile frame and reused for every tweet frame/chunk of the month.
+    """
+
+    def __init__(self, prof_df: pd.DataFrame):
+        prof = prof_df.drop_duplicates("username")
+        self.usernames = pd.Index(prof["username"].astype(object))
+        self.columns = [c for c in PROFILE_ENRICH_COLUMNS if c in prof.columns]
+        self._values = {c: prof[c].array if pd.api.types.is_extension_array_dtype(prof[c]) else prof[c].to_numpy()
+                        for c in self.columns}
+
+    def positions(self, usernames: pd.Series) -> np.ndarray:
+        """Profile row of each username (-1 when there is none); hashes distinct names only."""
+        if isinstance(usernames.dtype, pd.CategoricalDtype):
+            codes, uniques = usernames.cat.codes.to_numpy(), usernames.cat.categories
+        else:
+            codes, uniques = pd.factorize(usernames)
+        per_unique = self.usernames.get_indexer(pd.Index(uniques).astype(object))
+        return np.where(codes >= 0, per_unique[codes], -1) if len(per_unique) else np.full(len(codes), -1)
+
+    def take(self, column: str, pos: np.ndarray):
+        """Gather a profile column by position; -1 becomes missing (as in a left merge)."""
+        return pd.api.extensions.take(self._values[column], pos, allow_fill=True)
+
+
+def enrich_with_profiles(tweets_df: pd.DataFrame, profiles) -> pd.DataFrame:
+    """
+    Attach latest profile fields used for follower-based ratios to each tweet.
+    `profiles` is the latest-profile frame or a prebuilt ProfileIndex of it.
+    """
+    index = profiles if isinstance(profiles, ProfileIndex) else ProfileIndex(profiles)
+    out = tweets_df.copy(deep=False)
+    out.index = pd.RangeIndex(len(out))
+    pos = index.positions(out["username"])
+    for c in index.columns:
+        out[c if c not in tweets_df.columns else f"{c}_profile"] = index.take(c, pos)
+
+    for c in TWEET_COUNT_COLUMNS:
         if c not in out:
             out[c] = np.nan
-    out["engagement_total"] = out[["like_count", "reply_count", "retweet_count", "quote_count", "bookmark_count"]].sum(axis=1, min_count=1)
-    out["engagement_rate"] = _safe_div(out["engagement_total"], out["impression_count"])
-    out["like_to_reply"] = _safe_div(out["like_count"], out["reply_count"])
-    out["retweet_to_like"] = _safe_div(out["retweet_count"], out["like_count"])
-    # follower-normalized per tweet
-    followers_k = _safe_div(out["followers_count"], 1000.0)
-    out["likes_per_1k_followers"] = _safe_div(out["like_count"], followers_k)
-    out["engagement_per_1k_followers"] = _safe_div(out["engagement_total"], followers_k)
+    # per-tweet engagement total and ratios, from one shared set of float64 counter arrays
+    store = ColumnStore(out)
+    for name in ENRICHED_COLUMNS:
+        out[name] = store[name] if name in store else np.nan
+    if all(out[c].dtype.kind in "iu" for c in ENGAGEMENT_PARTS):
+        total = store["engagement_total"]
+        missing = np.isnan(total)
+        out["engagement_total"] = pd.arrays.IntegerArray(np.where(missing, 0, total).astype(np.int64), missing)
     return out
 
-def metric_individual_month(out: pd.DataFrame) -> pd.DataFrame:
-    """Per-politician metrics for the month (averages per post, ratios, follower-normalized)."""
-    if "username" not in out.columns:
-        logger.warning("metric_individual_month skipped: 'username' column missing")
-        return pd.DataFrame()
-
-    g = out.groupby(["partei_kurz", "username"], dropna=False)
-
-    agg = g.agg(
-        n_tweets=("tweet_id", "count"),
-        likes_sum=("like_count", "sum"),
-        likes_mean=("like_count", "mean"),
-        replies_sum=("reply_count", "sum"),
-        replies_mean=("reply_count", "mean"),
-        retweets_sum=("retweet_count", "sum"),
-        retweets_mean=("retweet_count", "mean"),
-        quotes_sum=("quote_count", "sum"),
-        quotes_mean=("quote_count", "mean"),
-        bookmarks_sum=("bookmark_count", "sum"),
-        bookmarks_mean=("bookmark_count", "mean"),
-        impressions_sum=("impression_count", "sum"),
-        impressions_mean=("impression_count", "mean"),
-        engagement_sum=("engagement_total", "sum"),
-        engagement_mean=("engagement_total", "mean"),
-        engagement_rate_mean=("engagement_rate", "mean"),
-        like_to_reply_mean=("like_to_reply", "mean"),
-        retweet_to_like_mean=("retweet_to_like", "mean"),
-        likes_per_1k_followers_mean=("likes_per_1k_followers", "mean"),
-        engagement_per_1k_followers_mean=("engagement_per_1k_followers", "mean"),
-        verified_share=("verified", "mean"),
-        protected_share=("protected", "mean"),
-        followers_latest=("followers_count", "max"),
-    ).reset_index()
 
+INDIVIDUAL_MONTH_AGGS = {
+    "n_tweets": ("tweet_id", "count"),
+    "likes_sum": ("like_count", "sum"),
+    "likes_mean": ("like_count", "mean"),
+    "replies_sum": ("reply_count", "sum"),
+    "replies_mean": ("reply_count", "mean"),
+    "retweets_sum": ("retweet_count", "sum"),
+    "retweets_mean": ("retweet_count", "mean"),
+    "quotes_sum": ("quote_count", "sum"),
+    "quotes_mean": ("quote_count", "mean"),
+    "bookmarks_sum": ("bookmark_count", "sum"),
+    "bookmarks_mean": ("bookmark_count", "mean"),
+    "impressions_sum": ("impression_count", "sum"),
+    "impressions_mean": ("impression_count", "mean"),
+    "engagement_sum": ("engagement_total", "sum"),
+    "engagement_mean": ("engagement_total", "mean"),
+    "engagement_rate_mean": ("engagement_rate", "mean"),
+    "like_to_reply_mean": ("like_to_reply", "mean"),
+    "retweet_to_like_mean": ("retweet_to_like", "mean"),
+    "likes_per_1k_followers_mean": ("likes_per_1k_followers", "mean"),
+    "engagement_per_1k_followers_mean": ("engagement_per_1k_followers", "mean"),
+    "verified_share": ("verified", "mean"),
+    "protected_share": ("protected", "mean"),
+    "followers_latest": ("followers_count", "max"),
+}
+
+
+SHARE_COLUMNS = ("verified_share", "protected_share")
+
+
+def _numeric_shares(agg: pd.DataFrame) -> pd.DataFrame:
+    # profile flags are object-typed when some tweets have no profile; keep the shares float for every engine
+    for c in SHARE_COLUMNS:
+        if c in agg.columns:
+            agg[c] = pd.to_numeric(agg[c], errors="coerce").astype("float64")
+    return agg
+
+
+def _finalize_individual_month(agg: pd.DataFrame) -> pd.DataFrame:
+    """Derived totals ratios, presentation order and sort for metric_individual_month."""
+    agg = _numeric_shares(agg)
     # Derived stable ratios (across totals)
     agg["like_to_reply_total_ratio"] = _safe_div(agg["likes_sum"], agg["replies_sum"])
     agg["retweet_to_like_total_ratio"] = _safe_div(agg["retweets_sum"], agg["likes_sum"])
@@ -279,74 +458,433 @@ def metric_individual_month(out: pd.DataFrame) -> pd.DataFrame:
         "followers_latest", "verified_share", "protected_share",
     ]
     cols = [c for c in cols if c in agg.columns]
-    result = agg[cols].sort_values(["partei_kurz", "n_tweets"], ascending=[True, False])
+    return agg[cols].sort_values(["partei_kurz", "n_tweets"], ascending=[True, False])
+
+
+def metric_individual_month(out: pd.DataFrame) -> pd.DataFrame:
+    """Per-politician metrics for the month (averages per post, ratios, follower-normalized)."""
+    if "username" not in out.columns:
+        logger.warning("metric_individual_month skipped: 'username' column missing")
+        return pd.DataFrame()
+
+    g = out.groupby(["partei_kurz", "username"], dropna=False, observed=True)
+
+    agg = g.agg(**INDIVIDUAL_MONTH_AGGS).reset_index()
+    result = _finalize_individual_month(agg)
     logger.info("Computed metric_individual_month with %d rows", len(result))
     return result
 
+PARTY_MONTH_AGGS = {
+    "tweets": ("tweet_id", "count"),
+    "likes_sum": ("like_count", "sum"),
+    "replies_sum": ("reply_count", "sum"),
+    "retweets_sum": ("retweet_count", "sum"),
+    "quotes_sum": ("quote_count", "sum"),
+    "bookmarks_sum": ("bookmark_count", "sum"),
+    "impressions_sum": ("impression_count", "sum"),
+    "engagement_sum": ("engagement_total", "sum"),
+    "engagement_rate_mean": ("engagement_rate", "mean"),
+    "like_to_reply_mean": ("like_to_reply", "mean"),
+    "retweet_to_like_mean": ("retweet_to_like", "mean"),
+    "likes_per_1k_followers_mean": ("likes_per_1k_followers", "mean"),
+    "engagement_per_1k_followers_mean": ("engagement_per_1k_followers", "mean"),
+    "verified_share": ("verified", "mean"),
+    "protected_share": ("protected", "mean"),
+}
+
+
+def _finalize_party_month(summary: pd.DataFrame) -> pd.DataFrame:
+    summary = _numeric_shares(summary)
+    # Totals-based engagement rate (robust vs mean of per-tweet rates)
+    summary["engagement_rate_total"] = _safe_div(summary["engagement_sum"], summary["impressions_sum"])
+    return summary.sort_values("engagement_sum", ascending=False)
+
+
 def metric_party_month(out: pd.DataFrame) -> pd.DataFrame:
     """Party-level monthly aggregates across all tweets in the month."""
     if "partei_kurz" not in out.columns:
         logger.warning("metric_party_month skipped: 'partei_kurz' column missing")
         return pd.DataFrame()
 
-    g = out.groupby("partei_kurz", dropna=False)
-
-    summary = g.agg(
-        tweets=("tweet_id", "count"),
-        likes_sum=("like_count", "sum"),
-        replies_sum=("reply_count", "sum"),
-        retweets_sum=("retweet_count", "sum"),
-        quotes_sum=("quote_count", "sum"),
-        bookmarks_sum=("bookmark_count", "sum"),
-        impressions_sum=("impression_count", "sum"),
-        engagement_sum=("engagement_total", "sum"),
-        engagement_rate_mean=("engagement_rate", "mean"),
-        like_to_reply_mean=("like_to_reply", "mean"),
-        retweet_to_like_mean=("retweet_to_like", "mean"),
-        likes_per_1k_followers_mean=("likes_per_1k_followers", "mean"),
-        engagement_per_1k_followers_mean=("engagement_per_1k_followers", "mean"),
-        verified_share=("verified", "mean"),
-        protected_share=("protected", "mean"),
-    )
+    g = out.groupby("partei_kurz", dropna=False, observed=True)
 
-    # Totals-based engagement rate (robust vs mean of per-tweet rates)
-    summary["engagement_rate_total"] = _safe_div(summary["engagement_sum"], summary["impressions_sum"])
-    result = summary.reset_index().sort_values("engagement_sum", ascending=False)
+    summary = g.agg(**PARTY_MONTH_AGGS)
+    result = _finalize_party_month(summary.reset_index())
     logger.info("Computed metric_party_month with %d rows", len(result))
     return result
 
+# -------------------------------
+# Daily rollup (tweets_daily_author) -> monthly / window tables
+# -------------------------------
+def rollup_aggregate(daily: pd.DataFrame, profiles: pd.DataFrame, keys: list, aggs: dict) -> pd.DataFrame:
+    """
+    Evaluate a per-tweet aggregate definition (INDIVIDUAL_MONTH_AGGS, PARTY_MONTH_AGGS) over
+    daily rollup rows: sums add up, means are sum / non-NULL count, and the follower-based
+    per-tweet ratios use the latest profile, as enrich_with_profiles() does per tweet.
+    """
+    use_cols = [c for c in ["username", "followers_count", "verified", "protected"] if c in profiles.columns]
+    prof_small = profiles[use_cols].drop_duplicates("username") if "username" in profiles else profiles
+    d = daily.merge(prof_small, on="username", how="left")
+
+    followers_k = _safe_div(pd.to_numeric(d["followers_count"], errors="coerce"), 1000.0)
+    has_k = np.isfinite(followers_k) & (followers_k != 0)
+    for per_1k, base in (("likes_per_1k_followers", "like_count"), ("engagement_per_1k_followers", "engagement_total")):
+        d[f"{per_1k}_sum"] = np.where(has_k, _safe_div(d[f"{base}_sum"], np.where(has_k, followers_k, 1.0)), 0.0)
+        d[f"{per_1k}_n"] = np.where(has_k, d[f"{base}_n"], 0)
+    for flag in ("verified", "protected"):
+        v = pd.Series(_as_float(d[flag]) if flag in d else np.nan, index=d.index)
+        d[f"{flag}_sum"] = np.where(v.notna(), v.fillna(0) * d["n_tweets"], 0.0)
+        d[f"{flag}_n"] = np.where(v.notna(), d["n_tweets"], 0)
+
+    g = d.groupby(keys, dropna=False, observed=True)
+    sum_cols = ["n_tweets"] + [c for c in d.columns if c.endswith(("_sum", "_n"))]
+    sums = g[sum_cols].sum()
+    out = pd.DataFrame(index=sums.index)
+    for out_col, (col, func) in aggs.items():
+        if func == "count":
+            out[out_col] = sums["n_tweets"]
+        elif func == "sum":
+            out[out_col] = sums[f"{col}_sum"]
+        elif func == "mean":
+            out[out_col] = _safe_div(sums[f"{col}_sum"], sums[f"{col}_n"])
+        elif func == "max" and col in d.columns:
+            out[out_col] = g[col].max()
+    return out.reset_index()
+
+
+def rollup_individual_month(daily: pd.DataFrame, profiles: pd.DataFrame) -> pd.DataFrame:
+    """metric_individual_month() from daily rollup rows (<= 31 rows per author and month)."""
+    if daily.empty:
+        logger.warning("rollup_individual_month: no rollup rows")
+    agg = rollup_aggregate(daily, profiles, ["partei_kurz", "username"], INDIVIDUAL_MONTH_AGGS)
+    result = _finalize_individual_month(agg)
+    logger.info("Computed metric_individual_month from rollup with %d rows", len(result))
+    return result
+
+
+def rollup_party_month(daily: pd.DataFrame, profiles: pd.DataFrame) -> pd.DataFrame:
+    """metric_party_month() from daily rollup rows."""
+    agg = rollup_aggregate(daily, profiles, ["partei_kurz"], PARTY_MONTH_AGGS)
+    result = _finalize_party_month(agg)
+    logger.info("Computed metric_party_month from rollup with %d rows", len(result))
+    return result
+
+# -------------------------------
+# Leaderboards (single pass over shared arrays)
+# -------------------------------
+# Output columns per board family (only those present in the frame are kept;
+# the ranked metric is appended when it is not already listed)
+TOP_TWEETS_COLUMNS = (
+    "tweet_id", "username", "partei_kurz", "created_at", "text", "lang",
+    "like_count", "reply_count", "retweet_count", "quote_count", "bookmark_count",
+    "impression_count", "engagement_total", "engagement_rate",
+    "likes_per_1k_followers", "engagement_per_1k_followers",
+)
+BOARD_COLUMNS = (
+    "tweet_id", "username", "partei_kurz", "created_at", "text",
+    "like_count", "reply_count", "retweet_count", "quote_count",
+    "impression_count", "engagement_total", "engagement_rate",
+)
+FLEX_BOARD_COLUMNS = (
+    "tweet_id", "username", "partei_kurz", "created_at", "text", "lang",
+    "like_count", "reply_count", "retweet_count", "quote_count", "bookmark_count",
+    "impression_count", "engagement_total", "engagement_rate",
+)
+
+
+@dataclass(frozen=True)
+class Leaderboard:
+    """Declarative top-k board over the enriched tweet frame (see compute_leaderboards)."""
+    metric: str
+    top_n: int = 10
+    ascending: bool = False
+    tie_breaker: str | None = None  # secondary key, always descending
+    min_impressions: int | None = None
+    max_impressions: int | None = None
+    dropna: bool = False  # drop rows whose metric is not finite (otherwise NaN ranks last)
+    columns: tuple = BOARD_COLUMNS
+    group_by: str | None = None  # top_n per group (see LEADERBOARD_GROUP_KEYS)
+
+
+# -------------------------------
+# Derived per-tweet columns
+# -------------------------------
+@dataclass(frozen=True)
+class DerivedColumn:
+    """Per-tweet float column computed from other (raw or derived) columns of a ColumnStore."""
+    inputs: tuple
+    compute: callable  # function(store) -> float64 array
+
+
+def _nonzero(x: np.ndarray) -> np.ndarray:
+    return np.where(x == 0, np.nan, x)
+
+
+def _engagement_total(c) -> np.ndarray:
+    # sum of the engagement counters; NaN only when all of them are missing
+    parts = np.vstack([c[name] for name in ENGAGEMENT_PARTS])
+    return np.where(np.isnan(parts).all(axis=0), np.nan, np.nansum(parts, axis=0))
+
+
+# Registry of derived columns; a ColumnStore computes each at most once per dataset
+DERIVED_COLUMNS = {
+    # materialized on every enriched tweet frame (ENRICHED_COLUMNS)
+    "engagement_total": DerivedColumn(ENGAGEMENT_PARTS, _engagement_total),
+    "engagement_rate": DerivedColumn(("engagement_total", "impression_count"),
+                                     lambda c: _safe_div(c["engagement_total"], c["impression_count"])),
+    "like_to_reply": DerivedColumn(("like_count", "reply_count"),
+                                   lambda c: _safe_div(c["like_count"], c["reply_count"])),
+    "retweet_to_like": DerivedColumn(("retweet_count", "like_count"),
+                                     lambda c: _safe_div(c["retweet_count"], c["like_count"])),
+    "followers_k": DerivedColumn(("followers_count",), lambda c: _safe_div(c["followers_count"], 1000.0)),
+    "likes_per_1k_followers": DerivedColumn(("like_count", "followers_k"),
+                                            lambda c: _safe_div(c["like_count"], c["followers_k"])),
+    "engagement_per_1k_followers": DerivedColumn(("engagement_total", "followers_k"),
+                                                 lambda c: _safe_div(c["engagement_total"], c["followers_k"])),
+    # leaderboard-only scores
+    # (replies + quotes) / likes
+    "controversy_score": DerivedColumn(("reply_count", "quote_count", "like_count"),
+                                       lambda c: _safe_div(c["reply_count"] + c["quote_count"], _nonzero(c["like_count"]))),
+    # replies / engagement_total
+    "reply_share": DerivedColumn(("reply_count", "engagement_total"),
+                                 lambda c: _safe_div(c["reply_count"], _nonzero(c["engagement_total"]))),
+    "quote_share": DerivedColumn(("quote_count", "engagement_total"),
+                                 lambda c: _safe_div(c["quote_count"], _nonzero(c["engagement_total"]))),
+    # (retweets + quotes) / impressions
+    "amplification_rate": DerivedColumn(("retweet_count", "quote_count", "impression_count"),
+                                        lambda c: _safe_div(c["retweet_count"] + c["quote_count"], c["impression_count"])),
+}
+ENRICHED_COLUMNS = (
+    "engagement_total", "engagement_rate", "like_to_reply", "retweet_to_like",
+    "likes_per_1k_followers", "engagement_per_1k_followers",
+)
+
+
+def _iso_week(df: pd.DataFrame) -> pd.Series:
+    iso = pd.to_datetime(df["created_at"], utc=True).dt.isocalendar()
+    return iso["year"].astype(str) + "-W" + iso["week"].astype(str).str.zfill(2)
+
+
+# Grouping keys for per-group leaderboards: a frame column or a label derived from the frame
+LEADERBOARD_GROUP_KEYS = {
+    "partei_kurz": lambda df: df["partei_kurz"],
+    "lang": lambda df: df["lang"],
+    "iso_week": _iso_week,  # e.g. "2025-W41" (UTC)
+}
+
+
+class ColumnStore:
+    """
+    Float64 views of a frame's columns and of its DERIVED_COLUMNS, each converted or computed
+    at most once and shared by everything that reads the dataset (enrichment, planner, boards).
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._cols: dict = {}
+        self._groups: dict = {}
+
+    def __contains__(self, name: str) -> bool:
+        """True for frame columns and for derived columns whose inputs resolve."""
+        if name in self.df.columns:
+            return True
+        derived = DERIVED_COLUMNS.get(name)
+        return derived is not None and all(c in self for c in derived.inputs)
+
+    def missing(self, name: str) -> list:
+        """Frame columns that keep `name` from resolving (empty when it does)."""
+        if name in self.df.columns:
+            return []
+        if name not in DERIVED_COLUMNS:
+            return [name]
+        return list(dict.fromkeys(c for i in DERIVED_COLUMNS[name].inputs for c in self.missing(i)))
+
+    def has_group(self, key: str) -> bool:
+        try:
+            self.groups(key)
+        except KeyError:
+            return False
+        return True
+
+    def groups(self, key: str) -> tuple:
+        """(codes, labels) of a grouping key, factorized once with sorted labels (missing last)."""
+        if key not in self._groups:
+            values = LEADERBOARD_GROUP_KEYS[key](self.df) if key in LEADERBOARD_GROUP_KEYS else self.df[key]
+            codes, labels = pd.factorize(values, sort=True, use_na_sentinel=False)
+            self._groups[key] = (codes, np.asarray(labels, dtype=object))
+        return self._groups[key]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self._cols:
+            if name in self.df.columns:
+                self._cols[name] = pd.to_numeric(self.df[name], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            else:
+                self._cols[name] = np.asarray(DERIVED_COLUMNS[name].compute(self), dtype="float64")
+        return self._cols[name]
+
+
+def _eligible_rows(arrays: ColumnStore, board: Leaderboard) -> np.ndarray:
+    """Frame positions passing the board's impression guards (and dropna)."""
+    eligible = np.ones(len(arrays.df), dtype=bool)
+    if "impression_count" in arrays.df.columns:
+        if board.min_impressions is not None:
+            eligible &= arrays["impression_count"] >= board.min_impressions
+        if board.max_impressions is not None:
+            eligible &= arrays["impression_count"] <= board.max_impressions
+    if board.dropna:
+        eligible &= np.isfinite(arrays[board.metric])
+    return np.flatnonzero(eligible)
+
+
+def _rank_rows(arrays: ColumnStore, board: Leaderboard) -> np.ndarray:
+    """
+    Row positions of the board's top_n, ordered like a stable sort_values over
+    (metric, tie_breaker desc) with NaN last; remaining ties keep frame order.
+    Only the rows that can reach the top_n (including boundary ties) are sorted.
+    """
+    idx = _eligible_rows(arrays, board)
+    values = arrays[board.metric]
+    if board.top_n <= 0 or idx.size == 0:
+        return idx[:0]
+    vals = values[idx]
+    nan = np.isnan(vals)
+    ranked, key = idx[~nan], vals[~nan]
+    if not board.ascending:
+        key = -key
+
+    # partial selection: keep everything that sorts at or before the k-th value
+    k = board.top_n
+    if key.size > k:
+        kth = np.partition(key, k - 1)[k - 1]
+        keep = key <= kth
+        ranked, key = ranked[keep], key[keep]
+
+    if board.tie_breaker is not None and board.tie_breaker in arrays:
+        tie = -arrays[board.tie_breaker]
+        order = np.lexsort((tie[ranked], key))  # stable: ties keep frame order, NaN last
+    else:
+        order = np.argsort(key, kind="stable")
+    top = ranked[order][:k]
+
+    if top.size < k and nan.any():
+        rest = idx[nan]
+        if board.tie_breaker is not None and board.tie_breaker in arrays:
+            rest = rest[np.argsort(-arrays[board.tie_breaker][rest], kind="stable")]
+        top = np.concatenate([top, rest[: k - top.size]])
+    return top
+
+
+def _rank_rows_grouped(arrays: ColumnStore, board: Leaderboard) -> tuple:
+    """
+    Row positions of the top_n per group (same ordering as _rank_rows within each group)
+    with their group codes and 0-based ranks. One lexsort over the eligible rows serves all groups.
+    """
+    codes, _ = arrays.groups(board.group_by)
+    idx = _eligible_rows(arrays, board)
+    values = arrays[board.metric]
+    if board.top_n <= 0 or idx.size == 0:
+        return idx[:0], codes[:0], idx[:0]
+    vals = values[idx]
+    nan = np.isnan(vals)
+    key = np.where(nan, 0.0, vals if board.ascending else -vals)
+    sort_keys = [key, nan, codes[idx]]  # lexsort: last key is primary
+    if board.tie_breaker is not None and board.tie_breaker in arrays:
+        sort_keys.insert(0, -arrays[board.tie_breaker][idx])
+    order = np.lexsort(sort_keys)
+    rows, grp = idx[order], codes[idx][order]
+
+    # rank within group = position - first position of the group
+    starts = np.flatnonzero(np.r_[True, grp[1:] != grp[:-1]])
+    rank = np.arange(grp.size) - np.repeat(starts, np.diff(np.r_[starts, grp.size]))
+    keep = rank < board.top_n
+    return rows[keep], grp[keep], rank[keep]
+
+
+def _board_frame(arrays: ColumnStore, board: Leaderboard, rows: np.ndarray) -> pd.DataFrame:
+    df = arrays.df
+    cols = list(board.columns)
+    if board.metric not in cols:
+        cols.append(board.metric)
+    present = [c for c in cols if c in df.columns]
+    out = df.iloc[rows, [df.columns.get_loc(c) for c in present]].reset_index(drop=True)
+    for c in cols:
+        if c not in df.columns and c in DERIVED_COLUMNS and c in arrays:
+            out[c] = arrays[c][rows]
+    return out[[c for c in cols if c in out.columns]]
+
+
+def _compute_board(arrays: ColumnStore, name: str, board: Leaderboard) -> pd.DataFrame:
+    if board.metric not in arrays:
+        logger.warning("Column '%s' not found; skipping leaderboard %s.", board.metric, name)
+        return pd.DataFrame()
+    if board.group_by is None:
+        result = _board_frame(arrays, board, _rank_rows(arrays, board))
+    elif arrays.has_group(board.group_by):
+        rows, grp, rank = _rank_rows_grouped(arrays, board)
+        result = _board_frame(arrays, replace(board, columns=tuple(c for c in board.columns if c != board.group_by)), rows)
+        _, labels = arrays.groups(board.group_by)
+        result.insert(0, board.group_by, labels[grp])
+        result.insert(1, "rank", rank + 1)
+    else:
+        logger.warning("Grouping key '%s' not available; skipping leaderboard %s.", board.group_by, name)
+        return pd.DataFrame()
+    logger.info("Leaderboard %s by %s (asc=%s, group_by=%s) -> %d rows",
+                name, board.metric, board.ascending, board.group_by, len(result))
+    return result
+
+
+def compute_leaderboards(df: pd.DataFrame, boards: dict, workers: int = 1) -> dict:
+    """
+    Compute many leaderboards ({name: Leaderboard}) in one pass over `df` (a frame or its ColumnStore).
+    Columns are converted to numpy once and shared; each board does an O(n) partial
+    selection and materializes only its own top_n rows. With workers > 1 the boards
+    run on a thread pool over the same arrays (a column may be converted twice, never wrongly).
+    """
+    arrays = df if isinstance(df, ColumnStore) else ColumnStore(df)
+    frames = run_concurrently([lambda n=name, b=board: _compute_board(arrays, n, b) for name, board in boards.items()],
+                              workers)
+    return dict(zip(boards, frames))
+
+
+def compute_leaderboard(df: pd.DataFrame, board: Leaderboard) -> pd.DataFrame:
+    return compute_leaderboards(df, {board.metric: board})[board.metric]
+
+
+def grouped_board_specs(specs, group_by) -> list:
+    """One extra MetricSpec per (leaderboard spec, grouping key), named <spec>_by_<key>."""
+    out = []
+    for key in group_by:
+        for spec in specs:
+            if spec.board is None:
+                continue
+            board = replace(spec.board, group_by=key)
+            out.append(replace(
+                spec,
+                name=f"{spec.name}_by_{key}",
+                description=f"{spec.description}, per {key}",
+                compute=lambda df, board=board: compute_leaderboard(df, board),
+                pushdown=None,
+                board=board,
+            ))
+    return out
+
+
 def metric_top_tweets(out: pd.DataFrame, top_n: int = 50) -> pd.DataFrame:
     """Top tweets of the month by engagement rate, then by absolute engagement."""
-    keep = [
-        "tweet_id", "username", "partei_kurz", "created_at", "text", "lang",
-        "like_count", "reply_count", "retweet_count", "quote_count", "bookmark_count",
-        "impression_count", "engagement_total", "engagement_rate",
-        "likes_per_1k_followers", "engagement_per_1k_followers",
-    ]
-    keep = [c for c in keep if c in out.columns]
-    df = out[keep].copy()
-    df = df.sort_values(["engagement_rate", "engagement_total"], ascending=[False, False]).head(top_n).reset_index(drop=True)
-    logger.info("Computed metric_top_tweets with %d rows (top_n=%d)", len(df), top_n)
-    return df
+    return compute_leaderboard(out, board_top_tweets(top_n))
+
+def board_top_tweets(top_n: int = 50) -> Leaderboard:
+    return Leaderboard("engagement_rate", top_n, tie_breaker="engagement_total", columns=TOP_TWEETS_COLUMNS)
 
 def metric_top_tweets_by(out: pd.DataFrame, metric: str, top_n: int = 10, ascending: bool = False) -> pd.DataFrame:
     """Generic helper: top or bottom tweets by a given metric."""
-    if metric not in out.columns:
-        logger.warning("Column '%s' not found; skipping metric_top_tweets_by.", metric)
-        return pd.DataFrame()
-    cols = [
-        "tweet_id", "username", "partei_kurz", "created_at", "text",
-        "like_count", "reply_count", "retweet_count", "quote_count",
-        "impression_count", "engagement_total", "engagement_rate"
-    ]
-    cols = [c for c in cols if c in out.columns]
-    if metric in out.columns and metric not in cols:
-        cols.append(metric)
-    df = out[cols].copy()
+    return compute_leaderboard(out, Leaderboard(metric, top_n, ascending=ascending))
 
-    df = df.sort_values(metric, ascending=ascending).head(top_n).reset_index(drop=True)
-    logger.info("Computed top tweets by %s (%s)", metric, "ascending" if ascending else "descending")
-    return df
+def board_flex(metric: str, top_n: int = 10, ascending: bool = False, min_impressions: int | None = None,
+               max_impressions: int | None = None, dropna: bool = True) -> Leaderboard:
+    return Leaderboard(metric, top_n, ascending=ascending, tie_breaker="engagement_total",
+                       min_impressions=min_impressions, max_impressions=max_impressions,
+                       dropna=dropna, columns=FLEX_BOARD_COLUMNS)
 
 def metric_top_tweets_by_flex(
     out: pd.DataFrame,
@@ -356,31 +894,70 @@ def metric_top_tweets_by_flex(
     min_impressions: int | None = None,
     dropna: bool = True,
 ) -> pd.DataFrame:
-    if metric not in out.columns:
-        logger.warning("Column '%s' not found; skipping.", metric)
-        return pd.DataFrame()
-    df = out.copy()
-    if min_impressions is not None and "impression_count" in df.columns:
-        df = df[df["impression_count"] >= min_impressions]
-    if dropna:
-        df = df[np.isfinite(df[metric])]
-    cols = list(set([
-        "tweet_id","username","partei_kurz","created_at","text","lang",
-        "like_count","reply_count","retweet_count","quote_count","bookmark_count",
-        "impression_count","engagement_total","engagement_rate", metric
-    ]))
-    cols = [c for c in cols if c in df.columns]
-    df = df.sort_values([metric, "engagement_total"], ascending=[ascending, False]).head(top_n)
-    logger.info("Leaderboard by %s (asc=%s, min_impr=%s) -> %d rows",
-                metric, ascending, min_impressions, len(df))
-    return df[cols].reset_index(drop=True)
+    return compute_leaderboard(out, board_flex(metric, top_n, ascending, min_impressions, dropna=dropna))
+
+
+# Board definitions behind the metric_* leaderboard helpers (used directly by the tasks' MetricSpecs)
+def board_bottom_tweets_by_engagement_rate(top_n=10):
+    return Leaderboard("engagement_rate", top_n, ascending=True)
+
+def board_top_tweets_by_likes(top_n=10):
+    return Leaderboard("like_count", top_n)
+
+def board_top_tweets_by_retweets(top_n=10):
+    return Leaderboard("retweet_count", top_n)
+
+def board_top_tweets_by_replies(top_n=10):
+    return Leaderboard("reply_count", top_n)
+
+def board_top_tweets_by_quotes(top_n=10):
+    return Leaderboard("quote_count", top_n)
+
+def board_top_tweets_by_bookmarks(top_n=10):
+    return Leaderboard("bookmark_count", top_n)
+
+def board_top_tweets_by_impressions(top_n=10):
+    return Leaderboard("impression_count", top_n)
+
+def board_top_tweets_by_likes_per_1k(top_n=10):
+    return board_flex("likes_per_1k_followers", top_n)
+
+def board_top_tweets_by_engagement_per_1k(top_n=10):
+    return board_flex("engagement_per_1k_followers", top_n)
+
+def board_bottom_tweets_by_engagement_per_1k(top_n=10, min_impressions=1000):
+    return board_flex("engagement_per_1k_followers", top_n, ascending=True, min_impressions=min_impressions)
+
+def board_most_controversial(top_n=10, min_impressions=1000):
+    return board_flex("controversy_score", top_n, min_impressions=min_impressions)
+
+def board_most_reply_heavy(top_n=10, min_impressions=1000):
+    return board_flex("reply_share", top_n, min_impressions=min_impressions)
+
+def board_most_quote_heavy(top_n=10, min_impressions=1000):
+    return board_flex("quote_share", top_n, min_impressions=min_impressions)
+
+def board_most_amplified_debate(top_n=10, min_impressions=1000):
+    return board_flex("amplification_rate", top_n, min_impressions=min_impressions)
+
+def board_most_controversial_by_like_to_reply(top_n=10, min_impressions=1000):
+    # Smallest like_to_reply = most controversial
+    return board_flex("like_to_reply", top_n, ascending=True, min_impressions=min_impressions)
+
+def board_low_conversion_high_reach(top_n=10, min_impressions=10000):
+    # lowest engagement rate among tweets with large reach
+    return board_flex("engagement_rate", top_n, ascending=True, min_impressions=min_impressions)
+
+def board_silent_hits(top_n=10, max_impressions=5000):
+    # very good conversion with small reach
+    return board_flex("engagement_rate", top_n, max_impressions=max_impressions)
 
 
 def metric_bottom_tweets_by_engagement_rate(out: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
-    return metric_top_tweets_by(out, "engagement_rate", top_n, ascending=True)
+    return compute_leaderboard(out, board_bottom_tweets_by_engagement_rate(top_n))
 
 def metric_top_tweets_by_likes(out: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
-    return metric_top_tweets_by(out, "like_count", top_n)
+    return compute_leaderboard(out, board_top_tweets_by_likes(top_n))
 
 def metric_top_tweets_by_reply_ratio(out: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
     if "like_to_reply" not in out.columns:
@@ -389,73 +966,54 @@ def metric_top_tweets_by_reply_ratio(out: pd.DataFrame, top_n: int = 10) -> pd.D
     return metric_top_tweets_by(out, "like_to_reply", top_n, ascending=True)
 
 def metric_top_tweets_by_retweets(out, top_n=10):
-    return metric_top_tweets_by(out, "retweet_count", top_n)
+    return compute_leaderboard(out, board_top_tweets_by_retweets(top_n))
 
 def metric_top_tweets_by_replies(out, top_n=10):
-    return metric_top_tweets_by(out, "reply_count", top_n)
+    return compute_leaderboard(out, board_top_tweets_by_replies(top_n))
 
 def metric_top_tweets_by_quotes(out, top_n=10):
-    return metric_top_tweets_by(out, "quote_count", top_n)
+    return compute_leaderboard(out, board_top_tweets_by_quotes(top_n))
 
 def metric_top_tweets_by_bookmarks(out, top_n=10):
-    return metric_top_tweets_by(out, "bookmark_count", top_n)
+    return compute_leaderboard(out, board_top_tweets_by_bookmarks(top_n))
 
 def metric_top_tweets_by_impressions(out, top_n=10):
-    return metric_top_tweets_by(out, "impression_count", top_n)
+    return compute_leaderboard(out, board_top_tweets_by_impressions(top_n))
 
 def metric_top_tweets_by_likes_per_1k(out, top_n=10):
-    return metric_top_tweets_by_flex(out, "likes_per_1k_followers", top_n)
+    return compute_leaderboard(out, board_top_tweets_by_likes_per_1k(top_n))
 
 def metric_top_tweets_by_engagement_per_1k(out, top_n=10):
-    return metric_top_tweets_by_flex(out, "engagement_per_1k_followers", top_n)
+    return compute_leaderboard(out, board_top_tweets_by_engagement_per_1k(top_n))
 
 def metric_bottom_tweets_by_engagement_per_1k(out, top_n=10, min_impressions=1000):
-    return metric_top_tweets_by_flex(out, "engagement_per_1k_followers", top_n, ascending=True, min_impressions=min_impressions)
+    return compute_leaderboard(out, board_bottom_tweets_by_engagement_per_1k(top_n, min_impressions))
 
 def metric_most_controversial(out, top_n=10, min_impressions=1000):
-    # (replies + quotes) / max(likes, 1)
-    df = out.copy()
-    likes = df["like_count"].replace(0, np.nan) if "like_count" in df else np.nan
-    num = df.get("reply_count", np.nan) + df.get("quote_count", np.nan)
-    df["controversy_score"] = _safe_div(num, likes)
-    return metric_top_tweets_by_flex(df, "controversy_score", top_n, min_impressions=min_impressions)
+    return compute_leaderboard(out, board_most_controversial(top_n, min_impressions))
 
 def metric_most_reply_heavy(out, top_n=10, min_impressions=1000):
-    # replies / engagement_total
-    df = out.copy()
-    df["reply_share"] = _safe_div(df.get("reply_count", np.nan), df["engagement_total"].replace(0, np.nan))
-    return metric_top_tweets_by_flex(df, "reply_share", top_n, min_impressions=min_impressions)
+    return compute_leaderboard(out, board_most_reply_heavy(top_n, min_impressions))
 
 def metric_most_quote_heavy(out, top_n=10, min_impressions=1000):
-    df = out.copy()
-    df["quote_share"] = _safe_div(df.get("quote_count", np.nan), df["engagement_total"].replace(0, np.nan))
-    return metric_top_tweets_by_flex(df, "quote_share", top_n, min_impressions=min_impressions)
+    return compute_leaderboard(out, board_most_quote_heavy(top_n, min_impressions))
 
 def metric_most_amplified_debate(out, top_n=10, min_impressions=1000):
-    # (retweets + quotes) / impressions
-    df = out.copy()
-    df["amplification_rate"] = _rate(df, numer=None) if False else _safe_div(df.get("retweet_count", np.nan) + df.get("quote_count", np.nan), df.get("impression_count", np.nan))
-    return metric_top_tweets_by_flex(df, "amplification_rate", top_n, min_impressions=min_impressions)
+    return compute_leaderboard(out, board_most_amplified_debate(top_n, min_impressions))
 
 def metric_most_controversial_by_like_to_reply(out, top_n=10, min_impressions=1000):
-    # Smallest like_to_reply = most controversial
-    return metric_top_tweets_by_flex(out, "like_to_reply", top_n, ascending=True, min_impressions=min_impressions)
+    return compute_leaderboard(out, board_most_controversial_by_like_to_reply(top_n, min_impressions))
 
 def metric_low_conversion_high_reach(out, top_n=10, min_impressions=10000):
-    # lowest engagement rate among tweets with large reach
-    return metric_top_tweets_by_flex(out, "engagement_rate", top_n, ascending=True, min_impressions=min_impressions)
+    return compute_leaderboard(out, board_low_conversion_high_reach(top_n, min_impressions))
 
 def metric_silent_hits(out, top_n=10, max_impressions=5000):
-    # very good conversion with small reach
-    df = out.copy()
-    if "impression_count" in df:
-        df = df[df["impression_count"] <= max_impressions]
-    return metric_top_tweets_by_flex(df, "engagement_rate", top_n)
+    return compute_leaderboard(out, board_silent_hits(top_n, max_impressions))
 
 def metric_top_authors_by_avg_engagement_rate(out: pd.DataFrame, top_n: int = 10, min_tweets: int = 5) -> pd.DataFrame:
     if "username" not in out or "engagement_rate" not in out:
         return pd.DataFrame()
-    g = out.groupby(["partei_kurz", "username"], dropna=False)
+    g = out.groupby(["partei_kurz", "username"], dropna=False, observed=True)
     agg = g.agg(n_tweets=("tweet_id", "count"), avg_engagement_rate=("engagement_rate", "mean"),
     impressions_sum=("impression_count", "sum"), engagement_sum=("engagement_total", "sum"))
     agg = agg[agg["n_tweets"] >= min_tweets]
@@ -466,6 +1024,87 @@ def metric_top_authors_by_avg_engagement_rate(out: pd.DataFrame, top_n: int = 10
 def metric_most_active_authors(out: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
     if "username" not in out:
         return pd.DataFrame()
-    g = out.groupby(["partei_kurz", "username"], dropna=False).size().rename("n_tweets").reset_index()
+    g = out.groupby(["partei_kurz", "username"], dropna=False, observed=True).size().rename("n_tweets").reset_index()
     return g.sort_values(["n_tweets"], ascending=False).head(top_n)
 
+
+
+# -------------------------------
+# Posting-time heatmaps
+# -------------------------------
+# Tweets per (group, weekday, hour) in local time. The three are encoded into one integer key,
+# (group * 7 + weekday) * 24 + hour, so the counts and each engagement sum are a single
+# bincount over the dense groups x 7 x 24 grid.
+HEATMAP_TZ = "Europe/Berlin"
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+HEATMAP_SUMS = {
+    "likes_sum": "like_count",
+    "replies_sum": "reply_count",
+    "retweets_sum": "retweet_count",
+    "quotes_sum": "quote_count",
+    "impressions_sum": "impression_count",
+    "engagement_sum": "engagement_total",
+}
+
+
+def weekday_hour(created_at: pd.Series, tz: str = HEATMAP_TZ) -> tuple[np.ndarray, np.ndarray]:
+    """Local weekday (0 = Monday) and hour of UTC timestamps; -1 where missing."""
+    local = pd.to_datetime(created_at, utc=True, errors="coerce").dt.tz_convert(tz)
+    weekday = local.dt.weekday.to_numpy(dtype="float64", na_value=np.nan)
+    hour = local.dt.hour.to_numpy(dtype="float64", na_value=np.nan)
+    missing = np.isnan(weekday)
+    return np.where(missing, -1, weekday).astype(np.int64), np.where(missing, -1, hour).astype(np.int64)
+
+
+def posting_heatmap(df: pd.DataFrame, group_by: str | None = "partei_kurz", tz: str = HEATMAP_TZ,
+                    drop_empty: bool = False) -> pd.DataFrame:
+    """
+    Tidy weekday x hour grid per group (group_by None: over all tweets): tweets, engagement
+    sums, engagement rate and the cell's share of the group's tweets. Empty cells are 0
+    (left out with drop_empty).
+    """
+    if "created_at" not in df or (group_by is not None and group_by not in df and group_by not in LEADERBOARD_GROUP_KEYS):
+        return pd.DataFrame()
+    store = ColumnStore(df)
+    if group_by is None:
+        codes, labels = np.zeros(len(df), dtype=np.int64), np.array([None], dtype=object)
+    else:
+        codes, labels = store.groups(group_by)
+    weekday, hour = weekday_hour(df["created_at"], tz)
+    ok = weekday >= 0
+    key = ((codes.astype(np.int64) * 7 + weekday) * 24 + hour)[ok]
+    n_cells = len(labels) * 7 * 24
+
+    tweets = np.bincount(key, minlength=n_cells)
+    sums = {}
+    for out_col, col in HEATMAP_SUMS.items():
+        if col not in store:
+            continue
+        v = store[col][ok]
+        has = ~np.isnan(v)
+        sums[out_col] = np.bincount(key[has], weights=v[has], minlength=n_cells).astype(np.int64)
+
+    cell = np.arange(n_cells)
+    group, wd = cell // (7 * 24), cell // 24 % 7
+    out = pd.DataFrame({"weekday": wd, "weekday_name": np.asarray(WEEKDAY_NAMES, dtype=object)[wd],
+                        "hour": cell % 24, "tweets": tweets, **sums})
+    if group_by is not None:
+        out.insert(0, group_by, labels[group])
+    if "engagement_sum" in out and "impressions_sum" in out:
+        out["engagement_rate"] = _safe_div(out["engagement_sum"], out["impressions_sum"])
+    out["tweet_share"] = _safe_div(tweets, np.bincount(group, weights=tweets, minlength=len(labels))[group])
+    return out[out["tweets"] > 0].reset_index(drop=True) if drop_empty else out
+
+
+def metric_posting_heatmap_party(out: pd.DataFrame) -> pd.DataFrame:
+    return posting_heatmap(out, "partei_kurz")
+
+
+def metric_posting_heatmap_author(out: pd.DataFrame) -> pd.DataFrame:
+    # 168 cells per author; only those with tweets are written
+    heat = posting_heatmap(out, "username", drop_empty=True)
+    if heat.empty or "partei_kurz" not in out:
+        return heat
+    party = out.drop_duplicates("username").set_index("username")["partei_kurz"]
+    heat.insert(0, "partei_kurz", heat["username"].map(party).to_numpy())
+    return heat
@@ -0,0 +1,183 @@
+# src/xminer/utils/metrics_panel.py
+from __future__ import annotations
+
+import warnings
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# -------------------------------
+# Multi-month panels
+# -------------------------------
+# A panel stacks N monthly aggregate tables (one row per entity, e.g. username or partei_kurz)
+# into one float block values[entity, month, metric], NaN where an entity has no row that month.
+# Lags, deltas, percentage changes, growth rates and rolling stats are array operations along the
+# month axis; each returns a panel again, exported either in the wide layout of the delta CSVs or
+# as a tidy long table.
+ROLLING_STATS = ("mean", "sum", "min", "max", "std", "median")
+
+
+def _span(k: int) -> str:
+    """Name part of a k-month operation: empty for one month (as in the delta CSVs), else '_<k>m'."""
+    if k < 1:
+        raise ValueError(f"Expected a positive number of months, got {k}")
+    return "" if k == 1 else f"_{k}m"
+
+
+class MetricPanel:
+    """Entity x month x metric block with the entity keys, months and metric names along its axes."""
+
+    def __init__(self, values: np.ndarray, keys: pd.Index, months: Sequence[tuple], metrics: Sequence[str],
+                 labels: pd.DataFrame | None = None):
+        self.values = values
+        self.keys = keys  # entity ids, named after the key column
+        self.months = [tuple(ym) for ym in months]  # (year, month), ascending
+        self.metrics = list(metrics)
+        # descriptive columns per entity (e.g. partei_kurz), from the latest month that has them
+        self.labels = labels if labels is not None else pd.DataFrame(index=keys)
+        if values.shape != (len(self.keys), len(self.months), len(self.metrics)):
+            raise ValueError(f"Panel block {values.shape} does not match {len(self.keys)} entities x "
+                             f"{len(self.months)} months x {len(self.metrics)} metrics")
+
+    @classmethod
+    def stack(cls, frames: dict, key: str, metrics: Sequence[str] | None = None,
+              labels: Sequence[str] = ()) -> "MetricPanel":
+        """
+        Stack {(year, month): monthly table} on `key`. `metrics` default to the numeric columns;
+        an entity missing from a month (or a month without a table) is NaN there.
+        """
+        months = sorted(frames)
+        parts = [frames[ym].assign(_month=i) for i, ym in enumerate(months) if not frames[ym].empty]
+        both = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=[key, "_month", *labels])
+        if metrics is None:
+            numeric = both.select_dtypes(include=[np.number]).columns
+            metrics = [c for c in numeric if c not in (key, "_month", *labels)]
+        for c in metrics:
+            if c not in both.columns:
+                both[c] = np.nan
+        codes, uniques = pd.factorize(both[key].astype(object), sort=True)
+        rows = codes >= 0
+        values = np.full((len(uniques), len(months), len(metrics)), np.nan)
+        # one row per entity and month; a duplicated key keeps its last row
+        values[codes[rows], both["_month"].to_numpy(dtype=np.intp)[rows]] = (
+            both.loc[rows, list(metrics)].to_numpy(dtype=float, na_value=np.nan))
+        keys = pd.Index(uniques, name=key)
+        label_cols = [c for c in labels if c in both.columns]
+        latest = both.loc[rows, label_cols].groupby(codes[rows]).last().reindex(range(len(keys)))
+        return cls(values, keys, months, metrics, latest.set_axis(keys, axis=0))
+
+    # ---------- transforms ----------
+    def _derive(self, values: np.ndarray, metrics: Sequence[str]) -> "MetricPanel":
+        return MetricPanel(values, self.keys, self.months, metrics, self.labels)
+
+    def _lagged(self, k: int) -> np.ndarray:
+        out = np.full_like(self.values, np.nan)
+        if k < len(self.months):
+            out[:, k:] = self.values[:, :-k]
+        return out
+
+    def select(self, metrics: Sequence[str]) -> "MetricPanel":
+        pos = [self.metrics.index(m) for m in metrics]
+        return self._derive(self.values[:, :, pos], metrics)
+
+    def shift(self, k: int = 1) -> "MetricPanel":
+        """Value k months earlier (<metric>_prev for one month, <metric>_lag_<k>m otherwise)."""
+        suffix = "_prev" if k == 1 else f"_lag{_span(k)}"
+        return self._derive(self._lagged(k), [f"{m}{suffix}" for m in self.metrics])
+
+    def delta(self, k: int = 1) -> "MetricPanel":
+        """Change against k months earlier (delta_<metric>, delta_<k>m_<metric>)."""
+        span = _span(k)
+        return self._derive(self.values - self._lagged(k), [f"delta{span}_{m}" for m in self.metrics])
+
+    def pct_change(self, k: int = 1) -> "MetricPanel":
+        """Relative change against k months earlier; NaN where the earlier value is 0 or missing."""
+        span, prev = _span(k), self._lagged(k)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = (self.values - prev) / np.where(prev == 0, np.nan, prev)
+        return self._derive(out, [f"pct{span}_{m}" for m in self.metrics])
+
+    def growth_rate(self, k: int = 12, periods_per_year: int = 12) -> "MetricPanel":
+        """Compound annual growth over the last k months (cagr_<k>m_<metric>); NaN unless both values are > 0."""
+        span, prev = _span(k), self._lagged(k)
+        ok = (prev > 0) & (self.values > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = np.where(ok, (self.values / np.where(ok, prev, 1.0)) ** (periods_per_year / k) - 1.0, np.nan)
+        return self._derive(out, [f"cagr{span}_{m}" for m in self.metrics])
+
+    def rolling(self, window: int, stat: str = "mean", min_periods: int | None = None) -> "MetricPanel":
+        """Trailing `window`-month statistic (rolling_<w>m_<stat>_<metric>), NaN with fewer than min_periods values."""
+        if stat not in ROLLING_STATS:
+            raise ValueError(f"Unknown rolling statistic {stat!r}; expected one of {ROLLING_STATS}")
+        _span(window)
+        min_periods = window if min_periods is None else max(int(min_periods), 1)
+        n_ent, _, n_met = self.values.shape
+        padded = np.concatenate([np.full((n_ent, window - 1, n_met), np.nan), self.values], axis=1)
+        win = sliding_window_view(padded, window, axis=1)  # (entity, month, metric, window)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN windows; masked below
+            out = np.nanstd(win, axis=-1, ddof=1) if stat == "std" else getattr(np, f"nan{stat}")(win, axis=-1)
+        out[(~np.isnan(win)).sum(axis=-1) < min_periods] = np.nan
+        return self._derive(out, [f"rolling_{window}m_{stat}_{m}" for m in self.metrics])
+
+    @staticmethod
+    def concat(panels: Sequence["MetricPanel"]) -> "MetricPanel":
+        """Metrics of several panels over the same entities and months, side by side."""
+        first = panels[0]
+        for p in panels[1:]:
+            if not p.keys.equals(first.keys) or p.months != first.months:
+                raise ValueError("Panels must share entities and months to be concatenated")
+        values = np.concatenate([p.values for p in panels], axis=2)
+        return first._derive(values, [m for p in panels for m in p.metrics])
+
+    # ---------- exports ----------
+    def _month_pos(self, month: tuple | None) -> int:
+        return len(self.months) - 1 if month is None else self.months.index(tuple(month))
+
+    def _present(self, t: int) -> np.ndarray:
+        return ~np.isnan(self.values[:, t, :]).all(axis=1)
+
+    def _frame(self, rows: np.ndarray, columns: dict) -> pd.DataFrame:
+        ids = pd.DataFrame({self.keys.name: self.keys[rows]})
+        labels = self.labels.iloc[rows].reset_index(drop=True)
+        return pd.concat([ids, labels, pd.DataFrame(columns)], axis=1)
+
+    def wide(self, month: tuple | None = None) -> pd.DataFrame:
+        """One row per entity with data in `month` (default: the last one): key, labels, one column per metric."""
+        t = self._month_pos(month)
+        rows = np.flatnonzero(self._present(t))
+        return self._frame(rows, {m: self.values[rows, t, j] for j, m in enumerate(self.metrics)})
+
+    def delta_table(self, month: tuple | None = None, k: int = 1) -> pd.DataFrame:
+        """
+        Layout of the delta CSVs for `month` against k months earlier: entities present in both,
+        <metric>_prev / <metric>_curr pairs, then the delta_ and pct_ columns in name order.
+        """
+        t = self._month_pos(month)
+        if t < k:
+            raise ValueError(f"No month {k} month(s) before {self.months[t]} in the panel")
+        rows = np.flatnonzero(self._present(t) & self._present(t - k))
+        prev, curr = self.values[rows, t - k], self.values[rows, t]
+        suffix = "_prev" if k == 1 else f"_lag{_span(k)}"
+        cols = {}
+        for j, m in enumerate(self.metrics):
+            cols[f"{m}{suffix}"], cols[f"{m}_curr"] = prev[:, j], curr[:, j]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            diff = curr - prev
+            pct = diff / np.where(prev == 0, np.nan, prev)
+        span = _span(k)
+        cols.update(sorted((f"delta{span}_{m}", diff[:, j]) for j, m in enumerate(self.metrics)))
+        cols.update(sorted((f"pct{span}_{m}", pct[:, j]) for j, m in enumerate(self.metrics)))
+        return self._frame(rows, cols)
+
+    def long(self) -> pd.DataFrame:
+        """Tidy layout: key, labels, year_month (YYYYMM), metric, value; missing values are left out."""
+        ent, mon, met = np.nonzero(~np.isnan(self.values))
+        year_month = np.array([y * 100 + m for y, m in self.months], dtype=np.int64)
+        return self._frame(ent, {
+            "year_month": year_month[mon],
+            "metric": np.asarray(self.metrics, dtype=object)[met],
+            "value": self.values[ent, mon, met],
+        })
@@ -0,0 +1,292 @@
+# src/xminer/utils/metrics_sql.py
+from __future__ import annotations
+
+import logging
+from datetime import date
+from typing import Callable, Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from ..io.db import engine
+from ..io.loaders import (
+    POSTGRES_LATEST_PROFILES_TMPL,
+    POSTGRES_ROSTER_ATTRIBUTES_TMPL,
+    POSTGRES_TWEETS_MONTH_TMPL,
+    profiles_params,
+    tweet_select_list,
+)
+from .global_helpers import UNION_MAP, month_bounds, politicians_table_name
+from .metrics_cube import AGE_BAND_EDGES, PROFILE_CUBE_AGGS, TWEET_CUBE_AGGS, age_band_labels, cube_dimensions, grouping_label
+from .metrics_helpers import (
+    INDIVIDUAL_MONTH_AGGS,
+    PARTY_MONTH_AGGS,
+    PARTY_SUMMARY_AGGS,
+    TWEET_SUMMARY_COLUMNS,
+    _finalize_individual_month,
+    _finalize_party_month,
+    _finalize_party_summary,
+)
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# Aggregate compiler
+# -------------------------------
+# pandas reduction -> Postgres aggregate, mirroring the pandas semantics:
+# sums of all-NULL groups are 0, means/medians skip NULLs, size counts rows.
+# Means are SUM/COUNT in float8: exact for integer inputs (the same arithmetic pandas does).
+# For float inputs (per-tweet ratios) the float SUM depends on the row order, as pandas'
+# compensated sum does, so those means agree between engines to the last ulp (rel. ~1e-15).
+_AGG_SQL = {
+    "size": "COUNT(*)",
+    "count": "COUNT({c})",
+    "sum": "COALESCE(SUM({c}), 0)::bigint",
+    "mean": "SUM({c})::float8 / NULLIF(COUNT({c}), 0)",
+    "median": "percentile_cont(0.5) WITHIN GROUP (ORDER BY {c})",
+    "max": "MAX({c})",
+    "min": "MIN({c})",
+}
+_FLOAT_AGG_SQL = {**_AGG_SQL, "sum": "COALESCE(SUM({c}), 0)::float8"}
+
+
+def party_sql(col: str) -> str:
+    """SQL equivalent of normalize_party() for one column (NULL becomes 'NONE', CDU/CSU merged)."""
+    norm = f"upper(btrim(COALESCE({col}::text, 'None')))"
+    whens = " ".join(f"WHEN '{k}' THEN '{v}'" for k, v in UNION_MAP.items())
+    return f"CASE {norm} {whens} ELSE {norm} END"
+
+
+def _agg_select_list(aggs: dict, float_columns: Iterable[str] = ()) -> list:
+    float_columns = set(float_columns)
+    select = []
+    for out_col, (col, func) in aggs.items():
+        tmpl = (_FLOAT_AGG_SQL if col in float_columns else _AGG_SQL).get(func)
+        if tmpl is None:
+            raise ValueError(f"Aggregate {func!r} has no SQL push-down")
+        select.append(f"{tmpl.format(c=col)} AS {out_col}")
+    return select
+
+
+def compile_group_agg(source_sql: str, keys: Sequence[str], aggs: dict, float_columns: Iterable[str] = ()) -> str:
+    """
+    Compile an aggregate definition ({out: (col, func)}, as used by the pandas metrics)
+    into one GROUP BY query over `source_sql`. Rows come back in pandas groupby order.
+    """
+    select = list(keys) + _agg_select_list(aggs, float_columns)
+    order = ", ".join(f'{k} COLLATE "C" NULLS LAST' for k in keys)
+    return (
+        f"WITH src AS (\n{source_sql}\n)\n"
+        f"SELECT\n  " + ",\n  ".join(select) + "\n"
+        f"FROM src\nGROUP BY {', '.join(keys)}\nORDER BY {order}"
+    )
+
+
+def grouping_masks(dims: Sequence[str], sets: Sequence[tuple]) -> dict:
+    """{GROUPING(dims...) bitmask: set}: a bit is set for every dimension rolled up (first = highest)."""
+    n = len(dims)
+    return {sum(1 << (n - 1 - i) for i, d in enumerate(dims) if d not in dims_set): dims_set for dims_set in sets}
+
+
+def compile_grouping_sets(source_sql: str, dims: Sequence[str], sets: Sequence[tuple], aggs: dict,
+                          float_columns: Iterable[str] = ()) -> str:
+    """
+    Compile one aggregate definition over several grouping sets of `dims` into a single
+    GROUP BY GROUPING SETS query. `_grouping` holds the GROUPING() bitmask of each row (see
+    grouping_masks); rows come in the order of `sets`, keys ascending, NULL last.
+    """
+    masks = grouping_masks(dims, sets)
+    grouping = f"GROUPING({', '.join(dims)})" if dims else "0"
+    rank = " ".join(f"WHEN {mask} THEN {i}" for i, mask in enumerate(masks))
+    select = [f"{grouping} AS _grouping", *dims] + _agg_select_list(aggs, float_columns)
+    group_sets = ", ".join(f"({', '.join(dims_set)})" for dims_set in sets)
+    order = ", ".join([f"CASE {grouping} {rank} END"] + [f'{d} COLLATE "C" NULLS LAST' for d in dims])
+    return (
+        f"WITH src AS (\n{source_sql}\n)\n"
+        f"SELECT\n  " + ",\n  ".join(select) + "\n"
+        f"FROM src\nGROUP BY GROUPING SETS ({group_sets})\nORDER BY {order}"
+    )
+
+
+def read_group_agg(sql: str, params: dict, aggs: dict, finalize: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+    with engine.begin() as conn:
+        df = pd.read_sql(text(sql), conn, params=params)
+    # all-NULL aggregate columns come back as object
+    for out_col in aggs:
+        if out_col in df.columns:
+            df[out_col] = pd.to_numeric(df[out_col], errors="coerce")
+    return finalize(df)
+
+
+# -------------------------------
+# Sources
+# -------------------------------
+# Per-tweet rows of enrich_with_profiles(), computed in Postgres: month tweets joined to the
+# roster, left-joined to the latest profile per username, plus the derived per-tweet ratios.
+ENRICHED_TWEETS_SOURCE_TMPL = r"""
+WITH t AS (
+{tweets_month}
+), lp AS (
+{latest_profiles}
+), pr AS (
+  SELECT DISTINCT ON (btrim(lp.username))
+    btrim(lp.username) AS username, lp.followers_count, lp.verified, lp.protected
+  FROM lp
+  ORDER BY btrim(lp.username)
+), base AS (
+  SELECT
+    {party} AS partei_kurz,
+    btrim(t.username) AS username,
+    t.tweet_id,
+    t.like_count, t.reply_count, t.retweet_count, t.quote_count, t.bookmark_count, t.impression_count,
+    CASE WHEN COALESCE(t.like_count, t.reply_count, t.retweet_count, t.quote_count, t.bookmark_count) IS NULL THEN NULL
+         ELSE (COALESCE(t.like_count, 0) + COALESCE(t.reply_count, 0) + COALESCE(t.retweet_count, 0)
+               + COALESCE(t.quote_count, 0) + COALESCE(t.bookmark_count, 0))
+    END AS engagement_total,
+    pr.followers_count,
+    pr.verified::int AS verified,
+    pr.protected::int AS protected
+  FROM t
+  LEFT JOIN pr ON pr.username = btrim(t.username)
+)
+SELECT
+  base.*,
+  engagement_total::float8 / NULLIF(impression_count::float8, 0) AS engagement_rate,
+  like_count::float8 / NULLIF(reply_count::float8, 0) AS like_to_reply,
+  retweet_count::float8 / NULLIF(like_count::float8, 0) AS retweet_to_like,
+  like_count::float8 / NULLIF(followers_count::float8 / 1000.0::float8, 0) AS likes_per_1k_followers,
+  engagement_total::float8 / NULLIF(followers_count::float8 / 1000.0::float8, 0) AS engagement_per_1k_followers
+FROM base
+"""
+ENRICHED_FLOAT_COLUMNS = (
+    "engagement_rate", "like_to_reply", "retweet_to_like",
+    "likes_per_1k_followers", "engagement_per_1k_followers",
+)
+
+# latest profile per username (as loaded by the profile metrics), party normalized
+PROFILES_SOURCE_TMPL = r"""
+SELECT
+  {party} AS partei_kurz,
+  btrim(lp.username) AS username,
+  lp.followers_count, lp.following_count, lp.tweet_count, lp.listed_count,
+  lp.verified::int AS verified,
+  lp.protected::int AS protected
+FROM (
+{latest_profiles}
+) lp
+"""
+
+# roster attributes of each row's politician (one roster row per username) and the age band at :ref_date
+CUBE_SOURCE_TMPL = r"""
+SELECT
+  src.*,
+  r.geschlecht, r.wp_wkr_land, r.wp_mandatsart, r.wp_liste,
+  {age_band} AS age_band
+FROM (
+{source}
+) src
+LEFT JOIN (
+{roster}
+) r ON r.user_key = lower(src.username)
+"""
+
+
+def age_band_sql(col: str) -> str:
+    """SQL equivalent of metrics_cube.age_band() for one birth date column (age at :ref_date)."""
+    age = f"date_part('year', age(CAST(:ref_date AS date), {col}::date))"
+    labels = age_band_labels()
+    whens = " ".join(f"WHEN {age} < {edge} THEN '{label}'" for edge, label in zip(AGE_BAND_EDGES, labels))
+    return f"CASE WHEN {col} IS NULL THEN NULL {whens} ELSE '{labels[-1]}' END"
+
+
+def cube_source(source_sql: str, schema: str, year: int, month: int) -> str:
+    roster = POSTGRES_ROSTER_ATTRIBUTES_TMPL.format(schema=schema, politicians=politicians_table_name(month, year))
+    return CUBE_SOURCE_TMPL.format(source=source_sql, roster=roster, age_band=age_band_sql("r.geburtsdatum"))
+
+
+def enriched_tweets_source(schema: str, tweets: str, x_profiles: str, year: int, month: int) -> tuple[str, dict]:
+    politicians = politicians_table_name(month, year)
+    start_ts, end_ts = month_bounds(year, month)
+    sql = ENRICHED_TWEETS_SOURCE_TMPL.format(
+        tweets_month=POSTGRES_TWEETS_MONTH_TMPL.format(
+            schema=schema, tweets=tweets, politicians=politicians, columns=tweet_select_list(TWEET_SUMMARY_COLUMNS)
+        ),
+        latest_profiles=POSTGRES_LATEST_PROFILES_TMPL.format(schema=schema, x_profiles=x_profiles, politicians=politicians),
+        party=party_sql("t.partei_kurz"),
+    )
+    return sql, {"start_ts": start_ts.to_pydatetime(), "end_ts": end_ts.to_pydatetime(), **profiles_params(year, month)}
+
+
+def profiles_source(schema: str, x_profiles: str, year: int, month: int) -> tuple[str, dict]:
+    politicians = politicians_table_name(month, year)
+    sql = PROFILES_SOURCE_TMPL.format(
+        latest_profiles=POSTGRES_LATEST_PROFILES_TMPL.format(schema=schema, x_profiles=x_profiles, politicians=politicians),
+        party=party_sql("lp.partei_kurz"),
+    )
+    return sql, profiles_params(year, month)
+
+
+# -------------------------------
+# Pushed-down metrics (same output as the pandas metric_* functions)
+# -------------------------------
+def sql_individual_month(schema: str, tweets: str, x_profiles: str, year: int, month: int, **_) -> pd.DataFrame:
+    source, params = enriched_tweets_source(schema, tweets, x_profiles, year, month)
+    sql = compile_group_agg(source, ["partei_kurz", "username"], INDIVIDUAL_MONTH_AGGS, ENRICHED_FLOAT_COLUMNS)
+    result = read_group_agg(sql, params, INDIVIDUAL_MONTH_AGGS, _finalize_individual_month)
+    logger.info("Computed metric_individual_month in SQL with %d rows", len(result))
+    return result
+
+
+def sql_party_month(schema: str, tweets: str, x_profiles: str, year: int, month: int, **_) -> pd.DataFrame:
+    source, params = enriched_tweets_source(schema, tweets, x_profiles, year, month)
+    sql = compile_group_agg(source, ["partei_kurz"], PARTY_MONTH_AGGS, ENRICHED_FLOAT_COLUMNS)
+    result = read_group_agg(sql, params, PARTY_MONTH_AGGS, _finalize_party_month)
+    logger.info("Computed metric_party_month in SQL with %d rows", len(result))
+    return result
+
+
+def sql_party_summary(schema: str, x_profiles: str, year: int, month: int, **_) -> pd.DataFrame:
+    source, params = profiles_source(schema, x_profiles, year, month)
+    sql = compile_group_agg(source, ["partei_kurz"], PARTY_SUMMARY_AGGS)
+    result = read_group_agg(sql, params, PARTY_SUMMARY_AGGS, _finalize_party_summary)
+    logger.info("Computed metric_party_summary in SQL with %d rows", len(result))
+    return result
+
+
+
+# -------------------------------
+# Grouping-sets cube (same output as metrics_cube.cube_aggregate)
+# -------------------------------
+def _finalize_cube(dims: Sequence[str], sets: Sequence[tuple]) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    labels = {mask: grouping_label(dims_set) for mask, dims_set in grouping_masks(dims, sets).items()}
+
+    def finalize(df: pd.DataFrame) -> pd.DataFrame:
+        df.insert(0, "grouping", df.pop("_grouping").map(labels))
+        for d in dims:
+            df[d] = df[d].astype(object).where(df[d].notna(), np.nan)
+        return df
+
+    return finalize
+
+
+def _sql_cube(source: str, params: dict, schema: str, year: int, month: int, sets: Sequence[tuple], aggs: dict,
+              float_columns: Iterable[str] = ()) -> pd.DataFrame:
+    dims = cube_dimensions(sets)
+    sql = compile_grouping_sets(cube_source(source, schema, year, month), dims, sets, aggs, float_columns)
+    params = {**params, "ref_date": date(year, month, 1)}
+    return read_group_agg(sql, params, aggs, _finalize_cube(dims, sets))
+
+
+def sql_tweet_cube(schema: str, tweets: str, x_profiles: str, year: int, month: int, sets: Sequence[tuple]) -> pd.DataFrame:
+    source, params = enriched_tweets_source(schema, tweets, x_profiles, year, month)
+    result = _sql_cube(source, params, schema, year, month, sets, TWEET_CUBE_AGGS, ENRICHED_FLOAT_COLUMNS)
+    logger.info("Computed the tweet cube in SQL with %d rows over %d grouping sets", len(result), len(sets))
+    return result
+
+
+def sql_profile_cube(schema: str, x_profiles: str, year: int, month: int, sets: Sequence[tuple]) -> pd.DataFrame:
+    source, params = profiles_source(schema, x_profiles, year, month)
+    result = _sql_cube(source, params, schema, year, month, sets, PROFILE_CUBE_AGGS)
+    logger.info("Computed the profile cube in SQL with %d rows over %d grouping sets", len(result), len(sets))
+    return result
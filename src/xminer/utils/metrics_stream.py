@@ -0,0 +1,227 @@
+# src/xminer/utils/metrics_stream.py
+from __future__ import annotations
+
+import math
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .metrics_helpers import (
+    INDIVIDUAL_MONTH_AGGS,
+    PARTY_MONTH_AGGS,
+    ColumnStore,
+    Leaderboard,
+    _as_float,
+    _compute_board,
+    _finalize_individual_month,
+    _finalize_party_month,
+    _rank_rows,
+    _rank_rows_grouped,
+    _safe_div,
+)
+
+# -------------------------------
+# Streaming (chunked) aggregation
+# -------------------------------
+# Aggregate definitions ({out: (col, func)}, as in metrics_helpers) evaluated chunk by chunk:
+# count/sum/min/max merge exactly, means are merged sum / non-NULL count, and medians come
+# from a mergeable log-bucket sketch (relative error <= MEDIAN_RELATIVE_ACCURACY). State is
+# one row per group (plus sketch buckets), so memory is bounded by the chunk size, not history.
+MEDIAN_RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + MEDIAN_RELATIVE_ACCURACY) / (1 - MEDIAN_RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+STREAM_FUNCS = ("size", "count", "sum", "mean", "min", "max", "median")
+
+# range variants of the monthly tweet aggregates, with medians of the per-tweet counters
+PARTY_RANGE_AGGS = {
+    **PARTY_MONTH_AGGS,
+    "likes_median": ("like_count", "median"),
+    "impressions_median": ("impression_count", "median"),
+    "engagement_median": ("engagement_total", "median"),
+    "engagement_rate_median": ("engagement_rate", "median"),
+}
+INDIVIDUAL_RANGE_AGGS = INDIVIDUAL_MONTH_AGGS
+
+
+def sketch_buckets(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(sign, bucket index) of each finite value; zeros are sign 0 / bucket 0."""
+    sign = np.sign(values).astype(np.int8)
+    with np.errstate(divide="ignore"):
+        bucket = np.ceil(np.log(np.abs(values)) / _LOG_GAMMA)
+    return sign, np.where(sign == 0, 0, bucket).astype(np.int32)
+
+
+def sketch_value(sign: np.ndarray, bucket: np.ndarray) -> np.ndarray:
+    """Representative value of a bucket (within the relative accuracy of every value in it)."""
+    return sign * (2.0 * _GAMMA ** bucket.astype(float) / (_GAMMA + 1.0))
+
+
+class StreamingGroupAgg:
+    """Mergeable grouped aggregation of an aggregate definition over a stream of frames."""
+
+    def __init__(self, keys: Sequence[str], aggs: dict):
+        unknown = {func for _, func in aggs.values()} - set(STREAM_FUNCS)
+        if unknown:
+            raise ValueError(f"Aggregates {sorted(unknown)} cannot be streamed; expected {STREAM_FUNCS}")
+        self.keys = list(keys)
+        self.aggs = aggs
+        self.rows = 0
+        self._state: pd.DataFrame | None = None
+        self._sketch: pd.DataFrame | None = None
+        self._int_inputs: set = set()
+
+    def _inputs(self, func_names: Iterable[str]) -> list:
+        return sorted({col for col, func in self.aggs.values() if func in func_names and col is not None})
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Fold one chunk into the running state."""
+        if chunk.empty:
+            return
+        self.rows += len(chunk)
+        keys = pd.DataFrame({k: chunk[k].astype(object).where(chunk[k].notna(), None).astype(str) for k in self.keys})
+        part = {"_size": np.ones(len(chunk), dtype=np.int64)}
+        for col in self._inputs(("count", "sum", "mean", "min", "max")):
+            if col not in chunk.columns:
+                continue
+            if chunk[col].dtype.kind in "iu":
+                self._int_inputs.add(col)
+            v = _as_float(chunk[col])
+            ok = ~np.isnan(v)
+            part[f"{col}__n"] = ok.astype(np.int64)
+            part[f"{col}__sum"] = np.where(ok, v, 0.0)
+            part[f"{col}__min"] = v
+            part[f"{col}__max"] = v
+        frame = pd.concat([keys, pd.DataFrame(part, index=chunk.index)], axis=1)
+        self._state = self._merge(self._state, frame)
+        self._update_sketch(chunk, keys)
+
+    def _merge(self, state: pd.DataFrame | None, frame: pd.DataFrame) -> pd.DataFrame:
+        both = frame if state is None else pd.concat([state, frame], ignore_index=True)
+        values = [c for c in both.columns if c not in self.keys]
+        g = both.groupby(self.keys, sort=False)
+        merged = pd.concat([
+            g[[c for c in values if c.endswith("__min")]].min(),
+            g[[c for c in values if c.endswith("__max")]].max(),
+            g[[c for c in values if not c.endswith(("__min", "__max"))]].sum(),
+        ], axis=1)
+        return merged[values].reset_index()
+
+    def _update_sketch(self, chunk: pd.DataFrame, keys: pd.DataFrame) -> None:
+        parts = []
+        for col in self._inputs(("median",)):
+            if col not in chunk.columns:
+                continue
+            v = _as_float(chunk[col])
+            ok = ~np.isnan(v)
+            sign, bucket = sketch_buckets(v[ok])
+            parts.append(keys[ok].assign(_col=col, _sign=sign, _bucket=bucket, _n=1))
+        if not parts:
+            return
+        both = parts if self._sketch is None else [self._sketch, *parts]
+        self._sketch = (pd.concat(both, ignore_index=True)
+                        .groupby([*self.keys, "_col", "_sign", "_bucket"], sort=False)["_n"].sum().reset_index())
+
+    def _medians(self) -> pd.DataFrame:
+        """Sketch median per group (columns: keys + one per input), averaging the two middle ranks like pandas."""
+        grp = [*self.keys, "_col"]
+        s = self._sketch.assign(_value=sketch_value(self._sketch["_sign"].to_numpy(), self._sketch["_bucket"].to_numpy()))
+        s = s.sort_values([*grp, "_value"], kind="mergesort")
+        upto = s.groupby(grp, sort=False)["_n"].cumsum()
+        total = s.groupby(grp, sort=False)["_n"].transform("sum")
+        picks = [s[(upto > rank) & (upto - s["_n"] <= rank)] for rank in ((total - 1) // 2, total // 2)]
+        mid = pd.concat(picks).groupby(grp)["_value"].mean()
+        return mid.unstack("_col").reset_index()
+
+    def result(self) -> pd.DataFrame:
+        """Aggregated frame: keys + one column per aggregate, groups in key order."""
+        if self._state is None:
+            return pd.DataFrame(columns=[*self.keys, *self.aggs])
+        st = self._state.sort_values(self.keys, kind="mergesort").reset_index(drop=True)
+        medians = self._medians() if self._sketch is not None else pd.DataFrame(columns=self.keys)
+        medians = st[self.keys].merge(medians, on=self.keys, how="left")
+        out = st[self.keys].copy()
+        for out_col, (col, func) in self.aggs.items():
+            if func == "size":
+                out[out_col] = st["_size"]
+            elif func == "median":
+                if col in medians.columns:
+                    out[out_col] = medians[col].to_numpy(dtype=float)
+            elif f"{col}__n" not in st.columns:
+                continue
+            elif func == "count":
+                out[out_col] = st[f"{col}__n"]
+            elif func == "sum":
+                total = st[f"{col}__sum"]
+                out[out_col] = total.astype("int64") if col in self._int_inputs else total
+            elif func == "mean":
+                out[out_col] = _safe_div(st[f"{col}__sum"], st[f"{col}__n"])
+            else:  # min / max (NaN for groups without values)
+                out[out_col] = st[f"{col}__{func}"].where(st[f"{col}__n"] > 0)
+        return out
+
+
+def individual_range_agg() -> StreamingGroupAgg:
+    """Streaming counterpart of metric_individual_month (per party and politician)."""
+    return StreamingGroupAgg(["partei_kurz", "username"], INDIVIDUAL_RANGE_AGGS)
+
+
+def party_range_agg() -> StreamingGroupAgg:
+    """Streaming counterpart of metric_party_month, plus medians of the per-tweet counters."""
+    return StreamingGroupAgg(["partei_kurz"], PARTY_RANGE_AGGS)
+
+
+def finalize_individual_range(agg: StreamingGroupAgg) -> pd.DataFrame:
+    return _finalize_individual_month(agg.result())
+
+
+def finalize_party_range(agg: StreamingGroupAgg) -> pd.DataFrame:
+    return _finalize_party_month(agg.result())
+
+
+# -------------------------------
+# Streaming leaderboards (exact top-k)
+# -------------------------------
+def _candidate_rows(arrays: ColumnStore, board: Leaderboard) -> np.ndarray:
+    """Positions of the rows a board would output, in frame order."""
+    rows = _rank_rows(arrays, board) if board.group_by is None else _rank_rows_grouped(arrays, board)[0]
+    return np.sort(rows)
+
+
+class StreamingLeaderboards:
+    """
+    Exact top-k leaderboards ({name: Leaderboard}) over a stream of enriched tweet chunks.
+    Each board keeps only its current top_n rows (per group for grouped boards): every chunk
+    is ranked with the same partial selection as compute_leaderboards and merged with the kept
+    rows, so memory is O(top_n) per board and ties still resolve in stream order.
+    """
+
+    def __init__(self, boards: dict):
+        self.boards = boards
+        self.rows = 0
+        self._kept: dict = {name: None for name in boards}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if chunk.empty:
+            return
+        chunk = chunk.reset_index(drop=True)
+        arrays = ColumnStore(chunk)
+        for name, board in self.boards.items():
+            if board.metric not in arrays or (board.group_by is not None and not arrays.has_group(board.group_by)):
+                continue
+            candidates = chunk.iloc[_candidate_rows(arrays, board)]
+            kept = self._kept[name]
+            if kept is not None:
+                # kept rows came earlier in the stream, so concatenation keeps stream order for ties
+                candidates = pd.concat([kept, candidates], ignore_index=True)
+                candidates = candidates.iloc[_candidate_rows(ColumnStore(candidates), board)]
+            self._kept[name] = candidates.reset_index(drop=True)
+        self.rows += len(chunk)
+
+    def result(self) -> dict:
+        """{name: board frame}, identical to compute_leaderboards over the concatenated stream."""
+        out = {}
+        for name, board in self.boards.items():
+            kept = self._kept[name]
+            out[name] = pd.DataFrame() if kept is None else _compute_board(ColumnStore(kept), name, board)
+        return out
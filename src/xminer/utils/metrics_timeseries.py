@@ -0,0 +1,88 @@
+# src/xminer/utils/metrics_timeseries.py
+from __future__ import annotations
+
+import warnings
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# -------------------------------
+# Dense daily series from irregular snapshots
+# -------------------------------
+# Snapshots (series code, time, value) become one (series x day) float array. A day holds the
+# value at the end of that day: the day's last snapshot, otherwise interpolated linearly between
+# the surrounding snapshots ("interpolate") or carried forward from the previous one ("ffill").
+# Days before a series' first snapshot are NaN; after its last one the value is held.
+FILL_METHODS = ("interpolate", "ffill")
+MAD_TO_SIGMA = 1.4826  # MAD of a normal distribution -> standard deviation
+
+
+def _fill_index(has: np.ndarray, reverse: bool = False) -> np.ndarray:
+    """Per cell, the column of the nearest filled cell at or before it (after it with reverse); -1 / n if none."""
+    n = has.shape[1]
+    cols = np.arange(n)
+    if not reverse:
+        return np.maximum.accumulate(np.where(has, cols, -1), axis=1)
+    return np.minimum.accumulate(np.where(has, cols, n)[:, ::-1], axis=1)[:, ::-1]
+
+
+def daily_grid(codes: np.ndarray, times: np.ndarray, values: np.ndarray, n_series: int, start: np.datetime64,
+               n_days: int, method: str = "interpolate") -> tuple[np.ndarray, np.ndarray]:
+    """
+    (values, observed) arrays of shape (n_series, n_days) for the days starting at `start`, from
+    snapshots sorted by time. Snapshots before `start` only anchor the first days.
+    """
+    if method not in FILL_METHODS:
+        raise ValueError(f"Unknown fill method {method!r}; expected one of {FILL_METHODS}")
+    # fractional day position of each snapshot; column 0 holds the last snapshot before `start`
+    pos = (times - start) / np.timedelta64(1, "D")
+    col = np.clip(np.floor(pos).astype(np.int64) + 1, 0, None)
+    keep = (col <= n_days) & ~np.isnan(values)
+    codes, pos, col, values = codes[keep], pos[keep], col[keep], values[keep]
+    # last snapshot per (series, column): unique over the reversed (time-sorted) stream
+    cell = codes.astype(np.int64) * (n_days + 1) + col
+    _, last = np.unique(cell[::-1], return_index=True)
+    last = len(cell) - 1 - last
+
+    shape = (n_series, n_days + 1)
+    val, at = np.full(shape, np.nan), np.full(shape, np.nan)
+    val[codes[last], col[last]] = values[last]
+    at[codes[last], col[last]] = pos[last]
+    has = ~np.isnan(val)
+    rows = np.arange(n_series)[:, None]
+
+    before = _fill_index(has)
+    v0 = np.where(before >= 0, val[rows, np.clip(before, 0, None)], np.nan)
+    if method == "interpolate":
+        after = _fill_index(has, reverse=True)
+        inside = (before >= 0) & (after < shape[1]) & ~has
+        after = np.clip(after, None, shape[1] - 1)
+        p0, p1 = at[rows, np.clip(before, 0, None)], at[rows, after]
+        v1 = val[rows, after]
+        day_end = np.arange(shape[1], dtype=float)  # column c is day c - 1, which ends c days after `start`
+        with np.errstate(divide="ignore", invalid="ignore"):
+            interp = v0 + (v1 - v0) * (day_end - p0) / (p1 - p0)
+        v0 = np.where(inside & (p1 > p0), interp, v0)
+    return v0[:, 1:], has[:, 1:]
+
+
+# -------------------------------
+# Robust anomaly scores
+# -------------------------------
+def rolling_robust_z(x: np.ndarray, window: int, min_periods: int, min_scale: float | np.ndarray = 1.0) -> np.ndarray:
+    """
+    Per cell of a (series x day) array, (x - median) / (1.4826 * MAD) over the previous `window`
+    days of the same series (the day itself excluded). The scale is floored at `min_scale` (scalar
+    or per cell); NaN with fewer than `min_periods` values in the window.
+    """
+    n_series, n_days = x.shape
+    padded = np.concatenate([np.full((n_series, window), np.nan), x[:, :-1]], axis=1)
+    win = sliding_window_view(padded, window, axis=1)[:, :n_days]  # (series, day, window)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN windows; masked below
+        med = np.nanmedian(win, axis=-1)
+        mad = np.nanmedian(np.abs(win - med[..., None]), axis=-1)
+    scale = np.maximum(MAD_TO_SIGMA * mad, min_scale)
+    z = (x - med) / scale
+    z[(~np.isnan(win)).sum(axis=-1) < min_periods] = np.nan
+    return z
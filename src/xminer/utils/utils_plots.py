@@ -9,6 +9,8 @@ implemented directly inside the notebooks:
   (`plot_party_stack_tweets_engagement`)
 - Party pie chart based on percentage + absolute values
   (`plot_party_pie_pct`)
+- Weekday × hour posting heatmap from the ``tweets_heatmap_*`` outputs
+  (`plot_posting_heatmap`)
 
 All functions return a Plotly Figure so you can either `.show()` them
 inline in notebooks or further tweak them before saving.
@@ -526,5 +528,91 @@ def plot_party_pie_pct(
     return fig
 
 
+def plot_posting_heatmap(
+    df_heatmap: pd.DataFrame,
+    value_col: str = "tweets",
+    *,
+    group: str | None = None,
+    group_col: str = "partei_kurz",
+    title: str | None = None,
+    colorscale: str = "Blues",
+    save_name: str | None = None,
+) -> go.Figure:
+    """
+    Weekday × hour heatmap (Europe/Berlin time) of one posting metric.
+
+    Parameters
+    ----------
+    df_heatmap:
+        Tidy table as written by ``tweets_metrics_monthly``
+        (``tweets_heatmap_party_YYYYMM.csv`` / ``tweets_heatmap_author_YYYYMM.csv``):
+        one row per group, ``weekday`` (0 = Monday) and ``hour``.
+    value_col:
+        Cell value, e.g. ``"tweets"``, ``"engagement_sum"`` or ``"engagement_rate"``.
+    group:
+        Only plot this group (e.g. ``"SPD"`` or a username). If omitted, all
+        groups are summed (rates are then recomputed from the sums).
+    group_col:
+        Column with the group labels (``"partei_kurz"`` or ``"username"``).
+    title:
+        Chart title (combined with ``STAND_TEXT`` as subtitle if set).
+    colorscale:
+        Plotly colour scale name.
+    save_name:
+        If provided, save a PNG to ``GRAPHICS_DIR / f"{save_name}.png"``.
+
+    Returns
+    -------
+    plotly.graph_objects.Figure
+    """
+    for col in ("weekday", "hour", value_col):
+        if col not in df_heatmap.columns:
+            raise ValueError(f"{col} not found in DataFrame")
+
+    work = df_heatmap
+    if group is not None:
+        if group_col not in work.columns:
+            raise ValueError(f"{group_col} not found in DataFrame")
+        work = work[work[group_col] == group]
+
+    if value_col == "engagement_rate":
+        sums = work.groupby(["weekday", "hour"])[["engagement_sum", "impressions_sum"]].sum()
+        cells = sums["engagement_sum"] / sums["impressions_sum"].where(sums["impressions_sum"] > 0)
+    else:
+        cells = work.groupby(["weekday", "hour"])[value_col].sum()
+
+    # full 7 × 24 grid (author tables only contain cells with tweets)
+    full = pd.MultiIndex.from_product([range(7), range(24)], names=["weekday", "hour"])
+    grid = cells.reindex(full).unstack("hour")
+    if value_col != "engagement_rate":
+        grid = grid.fillna(0)
+
+    weekdays = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+    title_text, top_margin = _build_title(title)
+
+    fig = go.Figure(
+        go.Heatmap(
+            z=grid.to_numpy(),
+            x=[f"{h:02d}" for h in range(24)],
+            y=weekdays,
+            colorscale=colorscale,
+            colorbar=dict(title=value_col),
+            hovertemplate="%{y} %{x}:00<br>%{z:,.4~f}<extra></extra>",
+        )
+    )
+
+    fig.update_layout(
+        title=dict(text=title_text, x=0.5),
+        xaxis=dict(title="Uhrzeit (Europe/Berlin)", type="category"),
+        yaxis=dict(autorange="reversed", type="category"),
+        height=450,
+        margin=dict(t=top_margin, b=40, l=60, r=20),
+    )
+
+    _save_figure_if_requested(fig, save_name, height=450)
+
+    return fig
+
+
 # Backwards-compatible alias with a slightly shorter name
 plot_party_stack_shares = plot_party_stack_tweets_engagement